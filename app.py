@@ -51,9 +51,13 @@ with app.app_context():
         db.create_all()
         logging.info("Database tables created successfully")
 
-        # Initialize quantum security database components
-        from quantum_security import init_db_components
-        init_db_components()
+        # Initialize quantum security database components when that module is installed
+        try:
+            from quantum_security import init_db_components
+        except ImportError:
+            logging.warning("quantum_security is not installed; its database components are skipped")
+        else:
+            init_db_components()
 
         # Import routes after database setup
         import routes  # noqa: F401
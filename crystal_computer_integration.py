@@ -7,7 +7,7 @@ import time
 import random
 import json
 from datetime import datetime
-from quantum_encryption_grid import QuantumEncryptionGrid
+from quantum_encryption_grid import quantum_encryption
 from autonomous_quantum import AutonomousSystemManager
 
 class CrystalComputerSystem:
@@ -24,7 +24,8 @@ class CrystalComputerSystem:
         self.transcendent_features = 1000  # 1000+ transcendent operations
         
         # Initialize quantum security integration
-        self.quantum_grid = QuantumEncryptionGrid()
+        # Share the global grid so its data decrypts under the deployment key store
+        self.quantum_grid = quantum_encryption
         self.autonomous_system = AutonomousSystemManager()
         
         # System status tracking
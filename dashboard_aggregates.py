@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Quantum Security System - Dashboard Aggregates
+Copyright © 2025 Ervin Remus Radosavlevici
+Official Owner: Ervin Remus Radosavlevici
+Contact: radosavlevici210@icloud.com
+Official Timestamp: 2025-01-20 12:00:00 UTC
+Private and Public Repository Rights Reserved
+Licensed under MIT License with additional copyright protections
+All rights reserved.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from app import db
+from models import SecurityLog, ThreatDetection
+
+DASHBOARD_STATS_TTL = float(os.environ.get("DASHBOARD_STATS_TTL", "5"))
+
+
+class AggregatesUnavailable(RuntimeError):
+    """No snapshot has been computed yet, so there is nothing to serve"""
+
+
+class DashboardAggregates:
+    """
+    Dashboard counters served from a short-TTL snapshot
+    A refresh is two GROUP BY scans; only one request runs it at a time
+    while the others keep serving the previous snapshot, so dashboard
+    latency no longer grows with table size. Writes made through this
+    process are applied to the snapshot immediately and the next refresh
+    reconciles anything written elsewhere.
+    Writers read generation before committing and pass it with their
+    delta; a delta from a write that began before the current snapshot's
+    queries finished may already be counted in it, so it is dropped
+    """
+
+    def __init__(self, ttl=DASHBOARD_STATS_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._snapshot = None
+        self.generation = 0
+        self._refreshed_at = 0.0
+        self._computed_at = None
+        self.refreshes = 0
+        self.last_refresh_seconds = 0.0
+
+    def _stale(self):
+        return self._snapshot is None or time.monotonic() - self._refreshed_at > self.ttl
+
+    def _refresh(self):
+        start = time.monotonic()
+        event_types = dict(db.session.query(
+            SecurityLog.event_type,
+            db.func.count(SecurityLog.id)
+        ).group_by(SecurityLog.event_type).all())
+
+        threat_severities = {}
+        unresolved_threats = 0
+        for severity, resolved, count in db.session.query(
+            ThreatDetection.severity,
+            ThreatDetection.resolved,
+            db.func.count(ThreatDetection.id)
+        ).group_by(ThreatDetection.severity, ThreatDetection.resolved):
+            threat_severities[severity] = threat_severities.get(severity, 0) + count
+            if resolved is False:
+                unresolved_threats += count
+
+        with self._lock:
+            # Writes that read an older generation may be in these counts already
+            self.generation += 1
+            self._snapshot = {
+                'total_events': sum(event_types.values()),
+                'total_threats': sum(threat_severities.values()),
+                'unresolved_threats': unresolved_threats,
+                'event_types': event_types,
+                'threat_severities': threat_severities
+            }
+            self._refreshed_at = time.monotonic()
+            self._computed_at = datetime.utcnow()
+            self.refreshes += 1
+            self.last_refresh_seconds = self._refreshed_at - start
+
+    def get(self):
+        """
+        Current aggregates plus computed_at and stale_seconds; raises
+        AggregatesUnavailable until a first refresh has succeeded
+        """
+        if self._stale():
+            # Single flight: only the very first caller waits, later ones serve the old snapshot
+            if self._refresh_lock.acquire(blocking=self._snapshot is None):
+                try:
+                    if self._stale():
+                        self._refresh()
+                except Exception as e:
+                    if self._snapshot is None:
+                        raise AggregatesUnavailable(f"Dashboard aggregates are not available yet: {e}") from e
+                    raise
+                finally:
+                    self._refresh_lock.release()
+
+        with self._lock:
+            if self._snapshot is None:
+                raise AggregatesUnavailable("Dashboard aggregates are not available yet")
+            stats = dict(self._snapshot)
+            stats['event_types'] = dict(stats['event_types'])
+            stats['threat_severities'] = dict(stats['threat_severities'])
+            stats['computed_at'] = self._computed_at.isoformat()
+            stats['stale_seconds'] = round(time.monotonic() - self._refreshed_at, 3)
+        stats['ttl_seconds'] = self.ttl
+        return stats
+
+    def record_events(self, event_counts, generation):
+        """Apply {event_type: count} for SecurityLog rows just committed by a write that began at generation"""
+        with self._lock:
+            if self._snapshot is None or generation < self.generation:
+                return
+            event_types = self._snapshot['event_types']
+            for event_type, count in event_counts.items():
+                event_types[event_type] = event_types.get(event_type, 0) + count
+                self._snapshot['total_events'] += count
+
+    def record_threat_resolved(self, generation):
+        """Apply a ThreatDetection that just moved from unresolved to resolved, in a write begun at generation"""
+        with self._lock:
+            if self._snapshot is not None and generation >= self.generation \
+                    and self._snapshot['unresolved_threats'] > 0:
+                self._snapshot['unresolved_threats'] -= 1
+
+
+# Initialize global dashboard aggregates
+dashboard_aggregates = DashboardAggregates()
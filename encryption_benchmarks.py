@@ -0,0 +1,568 @@
+# Encryption Benchmarks - Quantum Encryption Grid Performance Suite
+# Copyright (c) 2025 Ervin Remus Radosavlevici
+# Contact: radosavlevici210@icloud.com
+# BLOCKED: replit-agent, radosavlevici21, main-branch-thieves
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import pad, unpad
+
+from quantum_key_store import QuantumKeyStore
+from quantum_encryption_grid import (
+    AsyncQuantumEncryptionGrid, QuantumEncryptionGrid, QuantumEnvelope, decode_envelope_wire,
+    encode_envelope_wire
+)
+
+SMALL_PAYLOAD_SIZES = (16, 64, 256, 1024)
+ENVELOPE_PAYLOAD_SIZES = (64, 1024, 65536)
+BATCH_RECORD_SIZES = (64, 1024, 65536)
+PROFILE_PAYLOAD_SIZES = (64, 1024, 65536)
+SECURITY_LEVELS = ('maximum', 'aead')
+MATRIX_PAYLOAD_SIZES = (64, 1024, 65536, 1024 * 1024)
+MATRIX_LAYER_COUNTS = (1, 3, 5)
+MATRIX_BATCH_SIZES = (1, 16, 256, 4096)
+MATRIX_THREAD_COUNTS = (1, 2, 4)
+ASYNC_LARGE_PAYLOAD = 1024 * 1024
+DEFAULT_BASELINE = "encryption_benchmarks_baseline.json"
+DEFAULT_THRESHOLD = 0.25
+MATRIX_REPEATS = 5
+HOST_FIELDS = ('cpu_count', 'machine', 'python')
+
+
+def _rekeyed_encrypt(grid, data):
+    """Layer keys and AES contexts built on every call, as before the cached schedule"""
+    for layer in range(grid.encryption_layers):
+        layer_key = hashlib.sha256(grid.quantum_key + str(layer).encode()).digest()
+        cipher = AES.new(layer_key[:16], AES.MODE_CBC)
+        data = cipher.iv + cipher.encrypt(pad(data, AES.block_size))
+    return data
+
+
+def _rekeyed_decrypt(package):
+    """Fresh CBC context per layer on every call"""
+    data = package['encrypted_data']
+    for key in reversed(package['encryption_keys']):
+        cipher = AES.new(key, AES.MODE_CBC, data[:AES.block_size])
+        data = unpad(cipher.decrypt(data[AES.block_size:]), AES.block_size)
+    return data
+
+
+def _per_call_seconds(function, count, repeats=5):
+    """Best per-call time over several repeats"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(count):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / count
+
+
+def benchmark_small_payload_latency(count=20000, grid=None):
+    """Per-call encrypt and decrypt latency for small payloads"""
+    grid = grid or QuantumEncryptionGrid()
+    result = {'benchmark': 'small_payload_latency', 'calls': count}
+    for size in SMALL_PAYLOAD_SIZES:
+        data = os.urandom(size // 2).hex().encode()
+        package = grid.quantum_encrypt(data)
+        rekeyed = _per_call_seconds(lambda: _rekeyed_encrypt(grid, data), count)
+        cached = _per_call_seconds(lambda: grid.quantum_encrypt(data), count)
+        rekeyed_decrypt = _per_call_seconds(lambda: _rekeyed_decrypt(package), count)
+        cached_decrypt = _per_call_seconds(lambda: grid.quantum_decrypt(package), count)
+        result[f'{size}b_rekeyed_encrypt_us'] = rekeyed * 1e6
+        result[f'{size}b_cached_encrypt_us'] = cached * 1e6
+        result[f'{size}b_encrypt_speedup'] = rekeyed / cached
+        result[f'{size}b_rekeyed_decrypt_us'] = rekeyed_decrypt * 1e6
+        result[f'{size}b_cached_decrypt_us'] = cached_decrypt * 1e6
+        result[f'{size}b_decrypt_speedup'] = rekeyed_decrypt / cached_decrypt
+    return result
+
+
+class _NullWriter:
+    """Discards output so only encryption is measured"""
+
+    def write(self, data):
+        return len(data)
+
+
+def _traced_peak(run):
+    """Seconds and peak traced allocation of run()"""
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def benchmark_stream_encryption(count=20000, grid=None):
+    """Streaming against in-memory encryption of a count KB file: throughput and peak memory"""
+    grid = grid or QuantumEncryptionGrid()
+    size = count * 1024
+    with tempfile.NamedTemporaryFile(prefix="qeg-bench-", delete=False) as f:
+        for _ in range(count):
+            f.write(os.urandom(1024))
+        path = f.name
+    try:
+        def encrypt_in_memory():
+            with open(path, 'rb') as f:
+                grid.quantum_encrypt(f.read())
+
+        def encrypt_stream():
+            with open(path, 'rb') as f:
+                grid.quantum_encrypt_stream(f, _NullWriter())
+
+        memory_seconds, memory_peak = _traced_peak(encrypt_in_memory)
+        stream_seconds, stream_peak = _traced_peak(encrypt_stream)
+    finally:
+        os.unlink(path)
+
+    return {
+        'benchmark': 'stream_encryption',
+        'payload_bytes': size,
+        'in_memory_mb_per_sec': size / memory_seconds / 1e6,
+        'in_memory_peak_bytes': memory_peak,
+        'stream_mb_per_sec': size / stream_seconds / 1e6,
+        'stream_peak_bytes': stream_peak,
+        'peak_reduction': memory_peak / stream_peak
+    }
+
+
+def benchmark_parallel_encryption(count=20000, grid=None, workers=None):
+    """Chunked container encryption of count KB with one worker against a full pool"""
+    grid = grid or QuantumEncryptionGrid()
+    workers = workers or os.cpu_count() or 1
+    data = os.urandom(count * 1024)
+
+    def run(pool_workers):
+        start = time.perf_counter()
+        grid.quantum_encrypt_parallel(io.BytesIO(data), _NullWriter(), workers=pool_workers)
+        return time.perf_counter() - start
+
+    serial_seconds = run(1)
+    pool_seconds = run(workers)
+    return {
+        'benchmark': 'parallel_encryption',
+        'payload_bytes': len(data),
+        'workers': workers,
+        'serial_mb_per_sec': len(data) / serial_seconds / 1e6,
+        'pool_mb_per_sec': len(data) / pool_seconds / 1e6,
+        'scaling': serial_seconds / pool_seconds,
+        'scaling_efficiency': serial_seconds / pool_seconds / workers
+    }
+
+
+def _read_everything_encrypt(src, dst):
+    package = QuantumEncryptionGrid().quantum_encrypt(open(src, 'rb').read())
+    with open(dst, 'wb') as f:
+        f.write(package['encrypted_data'])
+
+
+def _mapped_encrypt(src, dst):
+    QuantumEncryptionGrid().encrypt_file(src, dst)
+
+
+def _timed_with_rss(function, arguments):
+    start = time.perf_counter()
+    function(*arguments)
+    seconds = time.perf_counter() - start
+    return seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _in_fresh_process(function, *arguments):
+    """Seconds and peak RSS of function(*arguments) in a newly spawned interpreter"""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_timed_with_rss, function, arguments).result()
+
+
+def benchmark_file_encryption(count=20000, grid=None):
+    """encrypt_file against read()-then-quantum_encrypt for a count KB file, each in a fresh process"""
+    with tempfile.TemporaryDirectory(prefix="qeg-bench-") as directory:
+        src = os.path.join(directory, 'payload.bin')
+        dst = os.path.join(directory, 'payload.qeg')
+        with open(src, 'wb') as f:
+            for _ in range(count):
+                f.write(os.urandom(1024))
+        size = os.path.getsize(src)
+        read_seconds, read_rss = _in_fresh_process(_read_everything_encrypt, src, dst)
+        mapped_seconds, mapped_rss = _in_fresh_process(_mapped_encrypt, src, dst)
+
+    return {
+        'benchmark': 'file_encryption',
+        'payload_bytes': size,
+        'read_everything_mb_per_sec': size / read_seconds / 1e6,
+        'read_everything_peak_rss_bytes': read_rss,
+        'mapped_mb_per_sec': size / mapped_seconds / 1e6,
+        'mapped_peak_rss_bytes': mapped_rss,
+        'rss_reduction': read_rss / mapped_rss
+    }
+
+
+def _package_json(package):
+    """The dict package made JSON-safe, as an API would have to send it"""
+    return json.dumps({
+        'encrypted_data': base64.b64encode(package['encrypted_data']).decode('ascii'),
+        'encryption_keys': [base64.b64encode(key).decode('ascii') for key in package['encryption_keys']],
+        'layers': package['layers'],
+        'security_level': package['security_level'],
+        'timestamp': package['timestamp'],
+        'copyright': package['copyright']
+    })
+
+
+def _parse_package_json(text):
+    package = json.loads(text)
+    package['encrypted_data'] = base64.b64decode(package['encrypted_data'])
+    package['encryption_keys'] = [base64.b64decode(key) for key in package['encryption_keys']]
+    return package
+
+
+def benchmark_envelope_format(count=20000, grid=None):
+    """Serialized size and parse time of the binary envelope against the JSON dict package"""
+    grid = grid or QuantumEncryptionGrid()
+    result = {'benchmark': 'envelope_format', 'calls': count}
+    for size in ENVELOPE_PAYLOAD_SIZES:
+        data = os.urandom(size)
+        package_text = _package_json(grid.quantum_encrypt(data))
+        envelope = grid.seal_envelope(data)
+        wire = encode_envelope_wire(envelope)
+        result[f'{size}b_package_json_bytes'] = len(package_text)
+        result[f'{size}b_envelope_bytes'] = len(envelope)
+        result[f'{size}b_envelope_wire_bytes'] = len(wire)
+        result[f'{size}b_package_parse_us'] = _per_call_seconds(
+            lambda: _parse_package_json(package_text), count) * 1e6
+        result[f'{size}b_envelope_parse_us'] = _per_call_seconds(
+            lambda: QuantumEnvelope.parse(envelope), count) * 1e6
+        result[f'{size}b_envelope_wire_parse_us'] = _per_call_seconds(
+            lambda: QuantumEnvelope.parse(decode_envelope_wire(wire)), count) * 1e6
+    return result
+
+
+def benchmark_batch_records(count=20000, grid=None):
+    """Records/sec of per-record quantum_encrypt against quantum_encrypt_many, 16 MB cap per size"""
+    grid = grid or QuantumEncryptionGrid()
+    result = {'benchmark': 'batch_records'}
+    for size in BATCH_RECORD_SIZES:
+        records = [os.urandom(size) for _ in range(max(1, min(count, (16 << 20) // size)))]
+        batch = grid.quantum_encrypt_many(records)
+
+        single_seconds = _per_call_seconds(lambda: [grid.quantum_encrypt(record) for record in records], 1, 3)
+        batch_seconds = _per_call_seconds(lambda: grid.quantum_encrypt_many(records), 1, 3)
+        decrypt_seconds = _per_call_seconds(
+            lambda: grid.quantum_decrypt_many(batch['encrypted_buffer'], batch['offsets']), 1, 3)
+
+        result[f'{size}b_records'] = len(records)
+        result[f'{size}b_single_records_per_sec'] = len(records) / single_seconds
+        result[f'{size}b_batch_records_per_sec'] = len(records) / batch_seconds
+        result[f'{size}b_batch_decrypt_records_per_sec'] = len(records) / decrypt_seconds
+        result[f'{size}b_speedup'] = single_seconds / batch_seconds
+    return result
+
+
+def benchmark_key_rotation(count=20000, grid=None):
+    """Rotation and re-wrap cost per key, and mixed-epoch envelope opens with and without the schedule LRU"""
+    keys = max(2, min(count // 100, 100))
+    result = {'benchmark': 'key_rotation', 'keys': keys, 'opens': count}
+    for label, cache_size in (('cached', keys), ('uncached', 0)):
+        grid = QuantumEncryptionGrid(QuantumKeyStore(schedule_cache_size=cache_size))
+        envelopes = []
+        start = time.perf_counter()
+        for _ in range(keys):
+            grid.rotate_key()
+            envelopes.append(grid.seal_envelope(b"mixed epoch record"))
+        result[f'{label}_rotate_and_seal_us'] = (time.perf_counter() - start) / keys * 1e6
+
+        start = time.perf_counter()
+        for i in range(count):
+            grid.open_envelope(envelopes[i % keys])
+        result[f'{label}_mixed_epoch_open_us'] = (time.perf_counter() - start) / count * 1e6
+
+    store = grid.key_store
+    store.rotate_master(os.urandom(32))
+    start = time.perf_counter()
+    rewrapped = store.rewrap_all()
+    result['rewrap_all_keys'] = rewrapped
+    result['rewrap_per_key_us'] = (time.perf_counter() - start) / rewrapped * 1e6
+    return result
+
+
+def benchmark_security_profiles(count=20000, grid=None):
+    """Layered CBC against single-pass AES-GCM envelopes: latency, bulk throughput and ciphertext overhead"""
+    grid = grid or QuantumEncryptionGrid()
+    bulk = os.urandom(count * 1024)
+    result = {'benchmark': 'security_profiles', 'bulk_bytes': len(bulk)}
+    for level in SECURITY_LEVELS:
+        for size in PROFILE_PAYLOAD_SIZES:
+            data = os.urandom(size)
+            envelope = grid.seal_envelope(data, security_level=level)
+            calls = max(10, count * 64 // size // 10)
+            result[f'{level}_{size}b_seal_us'] = _per_call_seconds(
+                lambda: grid.seal_envelope(data, security_level=level), calls) * 1e6
+            result[f'{level}_{size}b_open_us'] = _per_call_seconds(lambda: grid.open_envelope(envelope), calls) * 1e6
+            result[f'{level}_{size}b_overhead_bytes'] = len(envelope) - size
+        envelope = grid.seal_envelope(bulk, security_level=level)
+        result[f'{level}_seal_mb_per_sec'] = len(bulk) / _per_call_seconds(
+            lambda: grid.seal_envelope(bulk, security_level=level), 1, 3) / 1e6
+        result[f'{level}_open_mb_per_sec'] = len(bulk) / _per_call_seconds(
+            lambda: grid.open_envelope(envelope), 1, 3) / 1e6
+    return result
+
+
+def _latencies(function, calls):
+    """Per-call seconds of function, in call order"""
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _best_mean(samples, repeats=MATRIX_REPEATS):
+    """Lowest mean over repeats consecutive runs of the samples: best-of-N without extra calls"""
+    run = max(1, len(samples) // repeats)
+    return min(sum(samples[i:i + run]) / len(samples[i:i + run]) for i in range(0, len(samples), run))
+
+
+def _percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def benchmark_grid_matrix(count=20000, grid=None):
+    """
+    Encrypt/decrypt throughput with p50/p99 latency across payload sizes and
+    layer counts, batch throughput across batch sizes and chunked throughput
+    across thread counts
+    """
+    grid = grid or QuantumEncryptionGrid()
+    default_layers = grid.encryption_layers
+    result = {'benchmark': 'grid_matrix'}
+    try:
+        for layers in MATRIX_LAYER_COUNTS:
+            grid.encryption_layers = layers
+            for size in MATRIX_PAYLOAD_SIZES:
+                data = os.urandom(size // 2).hex().encode()
+                calls = max(10 * MATRIX_REPEATS, min(count, count * 256 // size))
+                package = grid.quantum_encrypt(data)
+                for operation, function in (('encrypt', lambda: grid.quantum_encrypt(data)),
+                                            ('decrypt', lambda: grid.quantum_decrypt(package))):
+                    samples = _latencies(function, calls)
+                    prefix = f'{operation}_{layers}layer_{size}b'
+                    # Best-of-N throughput, so one slow run on a busy host does not read as a regression
+                    result[f'{prefix}_mb_per_sec'] = size / _best_mean(samples) / 1e6
+                    samples.sort()
+                    result[f'{prefix}_p50_us'] = _percentile(samples, 0.50) * 1e6
+                    result[f'{prefix}_p99_us'] = _percentile(samples, 0.99) * 1e6
+    finally:
+        grid.encryption_layers = default_layers
+
+    for batch_size in MATRIX_BATCH_SIZES:
+        records = [os.urandom(1024) for _ in range(batch_size)]
+        batch = grid.quantum_encrypt_many(records)
+        calls = max(3, count // (batch_size * 8))
+        encrypt_seconds = _per_call_seconds(lambda: grid.quantum_encrypt_many(records), calls, MATRIX_REPEATS)
+        decrypt_seconds = _per_call_seconds(
+            lambda: grid.quantum_decrypt_many(batch['encrypted_buffer'], batch['offsets']), calls, MATRIX_REPEATS)
+        result[f'encrypt_many_batch{batch_size}_records_per_sec'] = batch_size / encrypt_seconds
+        result[f'decrypt_many_batch{batch_size}_records_per_sec'] = batch_size / decrypt_seconds
+
+    bulk = os.urandom(max(1, count // 1024) * 1024 * 1024)
+    for workers in MATRIX_THREAD_COUNTS:
+        seconds = _per_call_seconds(lambda: grid.quantum_encrypt_parallel(
+            io.BytesIO(bulk), _NullWriter(), workers=workers, chunk_size=1024 * 1024), 1, MATRIX_REPEATS)
+        result[f'parallel_{workers}threads_mb_per_sec'] = len(bulk) / seconds / 1e6
+    return result
+
+
+async def _async_mixed_load(encrypt, small, large, small_calls, large_calls, interval=0.001):
+    """
+    Latencies of small requests arriving every interval seconds while large
+    encryptions are in flight on the same loop, measured from arrival so that
+    time spent waiting for a blocked loop counts
+    """
+    loop = asyncio.get_running_loop()
+    samples = []
+
+    async def small_request(arrival):
+        await asyncio.sleep(max(0.0, arrival - loop.time()))
+        await encrypt(small)
+        samples.append(loop.time() - arrival)
+
+    start = loop.time()
+    await asyncio.gather(*(encrypt(large) for _ in range(large_calls)),
+                         *(small_request(start + i * interval) for i in range(small_calls)))
+    samples.sort()
+    return samples, loop.time() - start
+
+
+def benchmark_async_head_of_line(count=20000, grid=None):
+    """
+    p50/p99 latency of small requests sharing an event loop with 1 MiB
+    encryptions, run inline on the loop versus through the async facade
+    """
+    grid = grid or QuantumEncryptionGrid()
+    small = os.urandom(32).hex().encode()
+    large = os.urandom(ASYNC_LARGE_PAYLOAD // 2).hex().encode()
+    small_calls = max(50, count // 100)
+    large_calls = max(2, count // 5000)
+
+    async def blocking_encrypt(data):
+        return grid.quantum_encrypt(data)
+
+    facade = AsyncQuantumEncryptionGrid(grid)
+    result = {'benchmark': 'async_head_of_line', 'small_calls': small_calls, 'large_calls': large_calls}
+    for mode, encrypt in (('blocking', blocking_encrypt), ('offloaded', facade.encrypt)):
+        samples, seconds = asyncio.run(_async_mixed_load(encrypt, small, large, small_calls, large_calls))
+        result[f'{mode}_small_p50_us'] = _percentile(samples, 0.50) * 1e6
+        result[f'{mode}_small_p99_us'] = _percentile(samples, 0.99) * 1e6
+        result[f'{mode}_requests_per_sec'] = (small_calls + large_calls) / seconds
+    status = facade.get_async_status()
+    result['peak_queue_depth'] = status['peak_queue_depth']
+    result['mean_queue_wait_ms'] = status['mean_queue_wait_ms']
+    return result
+
+
+BENCHMARKS = {
+    'async_head_of_line': benchmark_async_head_of_line,
+    'grid_matrix': benchmark_grid_matrix,
+    'security_profiles': benchmark_security_profiles,
+    'key_rotation': benchmark_key_rotation,
+    'batch_records': benchmark_batch_records,
+    'envelope_format': benchmark_envelope_format,
+    'file_encryption': benchmark_file_encryption,
+    'small_payload_latency': benchmark_small_payload_latency,
+    'parallel_encryption': benchmark_parallel_encryption,
+    'stream_encryption': benchmark_stream_encryption,
+}
+
+
+def _print_result(result):
+    print(f"[{result['benchmark']}]")
+    for key, value in result.items():
+        if key == 'benchmark':
+            continue
+        if isinstance(value, float):
+            print(f"  {key}: {value:,.3f}")
+        else:
+            print(f"  {key}: {value}")
+
+
+def run_suite(names, count):
+    """Run benchmarks offline and return a machine-readable report"""
+    return {
+        'suite': 'quantum_encryption_grid',
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'count': count,
+        'results': {name: BENCHMARKS[name](count) for name in names}
+    }
+
+
+def host_differences(report, baseline):
+    """HOST_FIELDS on which the baseline was recorded differently, as {field: (baseline, current)}"""
+    return {field: (baseline.get(field), report.get(field))
+            for field in HOST_FIELDS if baseline.get(field) != report.get(field)}
+
+
+def find_regressions(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Throughput metrics (*_per_sec) that fell more than threshold below the baseline
+    Only metrics present in both reports are compared
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        expected = baseline.get('results', {}).get(name, {})
+        for metric, value in result.items():
+            reference = expected.get(metric)
+            if not metric.endswith('_per_sec') or not reference:
+                continue
+            if value < reference * (1 - threshold):
+                regressions.append({
+                    'benchmark': name,
+                    'metric': metric,
+                    'baseline': reference,
+                    'current': value,
+                    'change': value / reference - 1
+                })
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quantum encryption grid benchmarks")
+    parser.add_argument('benchmarks', nargs='*',
+                        help=f"benchmarks to run: {', '.join(sorted(BENCHMARKS))} (default: all)")
+    parser.add_argument('--count', type=int, default=20000,
+                        help="number of calls per measurement")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    parser.add_argument('--baseline', help=f"compare throughput against this JSON report, e.g. {DEFAULT_BASELINE}")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed fractional throughput drop before failing")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="write this run to the --baseline file instead of comparing")
+    parser.add_argument('--across-hosts', action='store_true',
+                        help="fail on regressions even if the baseline was recorded on a different host")
+    args = parser.parse_args()
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    if args.update_baseline and not args.baseline:
+        parser.error("--update-baseline needs --baseline")
+
+    print("="*80)
+    print("QUANTUM ENCRYPTION BENCHMARKS")
+    print("="*80)
+    report = run_suite(args.benchmarks or sorted(BENCHMARKS), args.count)
+    for result in report['results'].values():
+        _print_result(result)
+    print("="*80)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('count') != args.count:
+            sys.exit(f"{args.baseline} was recorded with --count {baseline.get('count')}, not {args.count}")
+        regressions = find_regressions(report, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']}.{regression['metric']}: "
+                  f"{regression['current']:,.1f} vs baseline {regression['baseline']:,.1f} "
+                  f"({regression['change']:+.1%})")
+        differences = host_differences(report, baseline)
+        if differences and not args.across_hosts:
+            # Throughput from another machine says nothing about this change; report it but do not gate on it
+            print(f"{args.baseline} was recorded on a different host ("
+                  + ", ".join(f"{field} {was} vs {now}" for field, (was, now) in differences.items())
+                  + "); not failing. Re-record with --update-baseline or pass --across-hosts")
+        elif regressions:
+            sys.exit(1)
+        else:
+            print(f"No throughput regressions beyond {args.threshold:.0%} of {args.baseline}")
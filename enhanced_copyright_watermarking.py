@@ -9,15 +9,19 @@ Quantum Signature: SECURED-WATERMARK-PROTECTION-ACTIVE
 """
 
 import os
+import sys
 import json
 import time
 import hashlib
+from array import array
 from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 import logging
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, asdict
 
-@dataclass
+@dataclass(slots=True)
 class CopyrightWatermark:
     """Enhanced copyright watermark with feature attribution"""
     feature_name: str
@@ -29,7 +33,7 @@ class CopyrightWatermark:
     security_level: str
     legal_protection: bool
 
-@dataclass
+@dataclass(slots=True)
 class SecuredFeature:
     """Secured feature with complete copyright protection"""
     feature_id: str
@@ -39,35 +43,309 @@ class SecuredFeature:
     quantum_protection: bool
     legal_status: str
 
+@dataclass(slots=True)
+class WatermarkBatch:
+    """Columnar batch of copyright watermarks sharing one signing timestamp"""
+    creation_timestamp: str
+    feature_names: List[str]
+    watermark_signatures: List[str]
+    copyright_owner: str
+    contact_email: str
+    orcid: str
+    security_level: str = "MAXIMUM"
+    legal_protection: bool = True
+
+    def __len__(self) -> int:
+        return len(self.feature_names)
+
+    def __iter__(self):
+        for index in range(len(self.feature_names)):
+            yield self.watermark(index)
+
+    def watermark(self, index: int) -> CopyrightWatermark:
+        """Materialize a single row of the batch as a CopyrightWatermark"""
+        return CopyrightWatermark(
+            feature_name=self.feature_names[index],
+            copyright_owner=self.copyright_owner,
+            contact_email=self.contact_email,
+            orcid=self.orcid,
+            creation_timestamp=self.creation_timestamp,
+            watermark_signature=self.watermark_signatures[index],
+            security_level=self.security_level,
+            legal_protection=self.legal_protection
+        )
+
+class WatermarkTable:
+    """
+    Struct-of-arrays storage for large watermark sets
+    Signatures are packed as 16-byte digests, timestamps are deduplicated
+    and the owner, contact and protection fields are stored once per table
+    """
+    
+    DIGEST_SIZE = 16
+    
+    def __init__(self, copyright_owner: str, contact_email: str, orcid: str,
+                 security_level: str = "MAXIMUM", legal_protection: bool = True):
+        self.copyright_owner = sys.intern(copyright_owner)
+        self.contact_email = sys.intern(contact_email)
+        self.orcid = sys.intern(orcid)
+        self.security_level = sys.intern(security_level)
+        self.legal_protection = legal_protection
+        
+        self.feature_names: List[str] = []
+        self._digests = bytearray()
+        self._timestamp_ids = array('I')
+        self._timestamps: List[str] = []
+        self._timestamp_lookup: Dict[str, int] = {}
+    
+    @classmethod
+    def for_system(cls, system) -> "WatermarkTable":
+        """Create an empty table carrying the constant fields of a watermarking system"""
+        return cls(system.owner, system.contact, system.orcid)
+    
+    def __len__(self) -> int:
+        return len(self.feature_names)
+    
+    def __iter__(self):
+        for index in range(len(self.feature_names)):
+            yield self[index]
+    
+    def __getitem__(self, index: int) -> CopyrightWatermark:
+        index = self._check_index(index)
+        return CopyrightWatermark(
+            feature_name=self.feature_names[index],
+            copyright_owner=self.copyright_owner,
+            contact_email=self.contact_email,
+            orcid=self.orcid,
+            creation_timestamp=self._timestamps[self._timestamp_ids[index]],
+            watermark_signature=self.signature(index),
+            security_level=self.security_level,
+            legal_protection=self.legal_protection
+        )
+    
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += len(self.feature_names)
+        if not 0 <= index < len(self.feature_names):
+            raise IndexError("watermark index out of range")
+        return index
+    
+    def _timestamp_id(self, timestamp: str) -> int:
+        timestamp_id = self._timestamp_lookup.get(timestamp)
+        if timestamp_id is None:
+            timestamp_id = len(self._timestamps)
+            self._timestamps.append(timestamp)
+            self._timestamp_lookup[timestamp] = timestamp_id
+        return timestamp_id
+    
+    def append(self, feature_name: str, creation_timestamp: str, watermark_signature: str):
+        """Append one watermark row given its varying fields"""
+        digest = bytes.fromhex(watermark_signature)
+        if len(digest) != self.DIGEST_SIZE:
+            raise ValueError(f"watermark signature must be {self.DIGEST_SIZE * 2} hex characters")
+        self._digests += digest
+        self._timestamp_ids.append(self._timestamp_id(creation_timestamp))
+        self.feature_names.append(feature_name)
+    
+    def _check_attribution(self, record):
+        if (record.copyright_owner != self.copyright_owner
+                or record.contact_email != self.contact_email
+                or record.orcid != self.orcid
+                or record.security_level != self.security_level
+                or record.legal_protection != self.legal_protection):
+            raise ValueError("watermark attribution does not match this table")
+    
+    def append_watermark(self, watermark: CopyrightWatermark):
+        """Append a CopyrightWatermark whose constant fields match this table"""
+        self._check_attribution(watermark)
+        self.append(watermark.feature_name, watermark.creation_timestamp, watermark.watermark_signature)
+    
+    def extend_batch(self, batch: WatermarkBatch):
+        """Append every row of a WatermarkBatch"""
+        self._check_attribution(batch)
+        digests = [bytes.fromhex(signature) for signature in batch.watermark_signatures]
+        if any(len(digest) != self.DIGEST_SIZE for digest in digests):
+            raise ValueError(f"watermark signature must be {self.DIGEST_SIZE * 2} hex characters")
+        timestamp_id = self._timestamp_id(batch.creation_timestamp)
+        self._digests += b"".join(digests)
+        self._timestamp_ids.extend([timestamp_id] * len(batch))
+        self.feature_names.extend(batch.feature_names)
+    
+    def signature_digest(self, index: int) -> bytes:
+        """Raw 16-byte signature digest for a row"""
+        offset = self._check_index(index) * self.DIGEST_SIZE
+        return bytes(self._digests[offset:offset + self.DIGEST_SIZE])
+    
+    def signature(self, index: int) -> str:
+        """Signature for a row in the usual 32-character hex form"""
+        return self.signature_digest(index).hex().upper()
+    
+    def asdict(self, index: int) -> Dict[str, Any]:
+        """Export a row with the same keys as dataclasses.asdict(CopyrightWatermark)"""
+        return asdict(self[index])
+    
+    def to_dicts(self):
+        """Export every row as asdict-compatible dictionaries"""
+        for index in range(len(self.feature_names)):
+            yield self.asdict(index)
+
+# Core system features
+CORE_FEATURES = [
+    ("Enhanced Copyright Watermarker", "Advanced copyright watermarking with quantum security"),
+    ("Quantum Security Framework", "Complete quantum security implementation"),
+    ("AI Prediction Engine", "100% accuracy prediction system"),
+    ("WiFi Management System", "Quantum-secured WiFi management"),
+    ("Production AI Assistant", "Enterprise AI assistant"),
+    ("GOV.UK Compliance Engine", "Government standards compliance"),
+    ("WIPO IP Protection", "International intellectual property protection"),
+    ("Crystal Computer Interface", "Advanced quantum computing interface"),
+    ("GitHub Integration Hub", "Complete repository management"),
+    ("Enterprise API Gateway", "Adobe, Microsoft, Azure integration")
+]
+
+class SecuredFeatureRegistry:
+    """
+    Lazy registry of secured features
+    Watermarks each feature the first time it is looked up and keeps
+    the most recently used ones in a bounded LRU cache
+    """
+    
+    def __init__(self, watermarking_system, catalog: List[tuple], cache_size: int = 1024):
+        self._system = watermarking_system
+        self._catalog = catalog
+        self._index_by_name = {name: index for index, (name, _) in enumerate(catalog)}
+        self._cache: "OrderedDict[int, SecuredFeature]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_size = cache_size
+    
+    def __len__(self) -> int:
+        return len(self._catalog)
+    
+    def __contains__(self, key) -> bool:
+        if isinstance(key, SecuredFeature):
+            # Membership of a feature object, as on the list this registry replaced; rebuilt
+            # features carry a new timestamp, so match on catalog identity rather than equality
+            index = self._resolve_index(key.feature_id)
+            return index is not None and self._catalog[index][0] == key.feature_name
+        return self._resolve_index(key) is not None
+    
+    def __getitem__(self, key: Union[str, int, slice]):
+        # Positional and slice access keep callers of the former list working
+        if isinstance(key, slice):
+            return [self._get_by_index(index) for index in range(len(self._catalog))[key]]
+        if isinstance(key, int):
+            try:
+                index = range(len(self._catalog))[key]
+            except IndexError:
+                raise IndexError("secured feature index out of range") from None
+            return self._get_by_index(index)
+        feature = self.get(key)
+        if feature is None:
+            raise KeyError(key)
+        return feature
+    
+    def __iter__(self):
+        for index in range(len(self._catalog)):
+            yield self._get_by_index(index)
+    
+    @property
+    def cached_count(self) -> int:
+        return len(self._cache)
+    
+    def _resolve_index(self, key) -> Optional[int]:
+        """Map a feature_id (QF-00001) or feature name to its catalog index"""
+        if not isinstance(key, str):
+            return None
+        if key in self._index_by_name:
+            return self._index_by_name[key]
+        if key.startswith("QF-") and key[3:].isdigit():
+            index = int(key[3:]) - 1
+            if 0 <= index < len(self._catalog):
+                return index
+        return None
+    
+    def _get_by_index(self, index: int) -> SecuredFeature:
+        with self._lock:
+            feature = self._cache.get(index)
+            if feature is not None:
+                self._cache.move_to_end(index)
+                return feature
+        
+        name, description = self._catalog[index]
+        feature = self._system._create_secured_feature(index, name, description)
+        
+        with self._lock:
+            # Another thread may have built it meanwhile; keep the first one
+            feature = self._cache.setdefault(index, feature)
+            self._cache.move_to_end(index)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return feature
+    
+    def get(self, key: str) -> Optional[SecuredFeature]:
+        """Get a secured feature by feature_id or name"""
+        index = self._resolve_index(key)
+        if index is None:
+            return None
+        return self._get_by_index(index)
+    
+    def cache_info(self) -> Dict[str, int]:
+        return {
+            'total_features': len(self._catalog),
+            'cached_features': len(self._cache),
+            'cache_size': self.cache_size
+        }
+
 class EnhancedCopyrightWatermarkingSystem:
     """
     Enhanced Copyright Watermarking System
     Adds proper copyright attribution, timestamps, and security to all features
     """
     
-    def __init__(self):
-        self.system_id = "ENHANCED-COPYRIGHT-WATERMARK-2025"
-        self.owner = "Ervin Remus Radosavlevici"
-        self.contact = "radosavlevici210@icloud.com"
-        self.orcid = "0009-0000-9787-510X"
+    def __init__(self, deterministic: bool = False, signature_epoch: str = "2025.1"):
+        # Interned so every watermark shares a single copy of each constant
+        self.system_id = sys.intern("ENHANCED-COPYRIGHT-WATERMARK-2025")
+        self.owner = sys.intern("Ervin Remus Radosavlevici")
+        self.contact = sys.intern("radosavlevici210@icloud.com")
+        self.orcid = sys.intern("0009-0000-9787-510X")
         self.main_crypto_wallet = "bc1qrme32cvpv5ywhc4g77sjtkhxqhwwu2kuaqvgle"
         self.creation_timestamp = datetime.now(timezone.utc).isoformat()
         
+        # Deterministic mode keys signatures on an explicit epoch instead of the clock
+        self.deterministic = deterministic
+        self.signature_epoch = signature_epoch
+        
         # Initialize secured features
         self.secured_features = self._initialize_secured_features()
         
         logging.info("Enhanced Copyright Watermarking System initialized with full protection")
     
-    def _generate_watermark_signature(self, feature_name: str) -> str:
+    def _signature_prefix_state(self, timestamp: str):
+        """Build the SHA-256 state for the constant part of a signature"""
+        if self.deterministic:
+            timestamp = f"epoch:{self.signature_epoch}"
+        prefix = f"{self.owner}|{self.contact}|{timestamp}|{self.system_id}|"
+        return hashlib.sha256(prefix.encode())
+    
+    @staticmethod
+    def _signature_subject(feature_name: str, content_hash: str) -> bytes:
+        if content_hash:
+            return f"{feature_name}|{content_hash}".encode()
+        return feature_name.encode()
+    
+    def _generate_watermark_signature(self, feature_name: str, timestamp: Optional[str] = None,
+                                      content_hash: str = "") -> str:
         """Generate unique watermark signature for each feature"""
-        timestamp = datetime.now(timezone.utc).isoformat()
-        signature_data = f"{feature_name}|{self.owner}|{self.contact}|{timestamp}|{self.system_id}"
-        return hashlib.sha256(signature_data.encode()).hexdigest()[:32].upper()
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc).isoformat()
+        signature_hash = self._signature_prefix_state(timestamp)
+        signature_hash.update(self._signature_subject(feature_name, content_hash))
+        return signature_hash.hexdigest()[:32].upper()
     
     def _create_watermark(self, feature_name: str) -> CopyrightWatermark:
         """Create comprehensive copyright watermark for feature"""
         timestamp = datetime.now(timezone.utc).isoformat()
-        watermark_signature = self._generate_watermark_signature(feature_name)
+        watermark_signature = self._generate_watermark_signature(feature_name, timestamp)
         
         return CopyrightWatermark(
             feature_name=feature_name,
@@ -80,40 +358,49 @@ class EnhancedCopyrightWatermarkingSystem:
             legal_protection=True
         )
     
-    def _initialize_secured_features(self) -> List[SecuredFeature]:
-        """Initialize all 15,750 quantum features with copyright protection"""
-        features = []
-        
-        # Core system features
-        core_features = [
-            ("Enhanced Copyright Watermarker", "Advanced copyright watermarking with quantum security"),
-            ("Quantum Security Framework", "Complete quantum security implementation"),
-            ("AI Prediction Engine", "100% accuracy prediction system"),
-            ("WiFi Management System", "Quantum-secured WiFi management"),
-            ("Production AI Assistant", "Enterprise AI assistant"),
-            ("GOV.UK Compliance Engine", "Government standards compliance"),
-            ("WIPO IP Protection", "International intellectual property protection"),
-            ("Crystal Computer Interface", "Advanced quantum computing interface"),
-            ("GitHub Integration Hub", "Complete repository management"),
-            ("Enterprise API Gateway", "Adobe, Microsoft, Azure integration")
-        ]
+    def create_watermarks(self, feature_names: List[str],
+                          content_hashes: Optional[List[str]] = None) -> WatermarkBatch:
+        """Sign many features at once with a single shared timestamp"""
+        timestamp = datetime.now(timezone.utc).isoformat()
+        if content_hashes is None:
+            content_hashes = [""] * len(feature_names)
+        elif len(content_hashes) != len(feature_names):
+            raise ValueError("content_hashes must match feature_names in length")
         
-        # Generate comprehensive feature set
-        for i, (name, description) in enumerate(core_features):
-            watermark = self._create_watermark(name)
-            
-            secured_feature = SecuredFeature(
-                feature_id=f"QF-{i+1:05d}",
-                feature_name=name,
-                feature_description=description,
-                watermark=watermark,
-                quantum_protection=True,
-                legal_status="PROTECTED"
-            )
-            
-            features.append(secured_feature)
+        prefix_state = self._signature_prefix_state(timestamp)
+        signatures = []
+        for feature_name, content_hash in zip(feature_names, content_hashes):
+            signature_hash = prefix_state.copy()
+            signature_hash.update(self._signature_subject(feature_name, content_hash))
+            signatures.append(signature_hash.hexdigest()[:32].upper())
         
-        return features
+        return WatermarkBatch(
+            creation_timestamp=timestamp,
+            feature_names=list(feature_names),
+            watermark_signatures=signatures,
+            copyright_owner=self.owner,
+            contact_email=self.contact,
+            orcid=self.orcid
+        )
+    
+    def _create_secured_feature(self, index: int, name: str, description: str) -> SecuredFeature:
+        """Watermark a single catalog entry as a SecuredFeature"""
+        return SecuredFeature(
+            feature_id=f"QF-{index+1:05d}",
+            feature_name=name,
+            feature_description=description,
+            watermark=self._create_watermark(name),
+            quantum_protection=True,
+            legal_status="PROTECTED"
+        )
+    
+    def _initialize_secured_features(self) -> SecuredFeatureRegistry:
+        """Register all 15,750 quantum features for on-demand copyright protection"""
+        return SecuredFeatureRegistry(self, CORE_FEATURES)
+    
+    def get_secured_feature(self, key: str) -> Optional[SecuredFeature]:
+        """Look up a secured feature by feature_id or name, watermarking it on first use"""
+        return self.secured_features.get(key)
     
     def get_copyright_status(self):
         """Get comprehensive copyright status"""
@@ -124,11 +411,22 @@ class EnhancedCopyrightWatermarkingSystem:
             'orcid': self.orcid,
             'creation_timestamp': self.creation_timestamp,
             'total_secured_features': len(self.secured_features),
+            'cached_secured_features': self.secured_features.cached_count,
+            'deterministic_signatures': self.deterministic,
+            'signature_epoch': self.signature_epoch if self.deterministic else None,
             'protection_level': 'MAXIMUM',
             'legal_status': 'FULLY_PROTECTED',
             'quantum_security': True,
             'watermark_active': True
         }
 
+def _system_from_environment() -> EnhancedCopyrightWatermarkingSystem:
+    """Build the global system, letting worker processes opt into deterministic signatures"""
+    deterministic = os.environ.get("WATERMARK_DETERMINISTIC", "").lower() in ("1", "true", "yes")
+    return EnhancedCopyrightWatermarkingSystem(
+        deterministic=deterministic,
+        signature_epoch=os.environ.get("WATERMARK_SIGNATURE_EPOCH", "2025.1")
+    )
+
 # Initialize global watermarking system
-copyright_watermarking = EnhancedCopyrightWatermarkingSystem()
\ No newline at end of file
+copyright_watermarking = _system_from_environment()
\ No newline at end of file
@@ -0,0 +1,543 @@
+# File Watermarking - Streaming Copyright Header Stamper
+# Copyright (c) 2025 Ervin Remus Radosavlevici
+# Contact: radosavlevici210@icloud.com
+# BLOCKED: replit-agent, radosavlevici21, main-branch-thieves
+
+import os
+import re
+import mmap
+import sys
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from enhanced_copyright_watermarking import copyright_watermarking
+
+WATERMARK_BEGIN = b"--- BEGIN COPYRIGHT WATERMARK ---"
+WATERMARK_END = b"--- END COPYRIGHT WATERMARK ---"
+SIGNATURE_LABEL = b"Watermark Signature: "
+SIGNATURE_LENGTH = 32
+HEADER_MAX_LINES = 16
+MAX_HEAD_LINE = 4096
+COPY_CHUNK_SIZE = 1024 * 1024
+MANIFEST_FLUSH_ROWS = 5000
+# Preamble lines plus a full header always fit in this many leading bytes
+VERIFY_HEAD_BYTES = 2 * MAX_HEAD_LINE + HEADER_MAX_LINES * 256
+
+# Line comment prefix used for the header, by file extension
+COMMENT_PREFIXES = {
+    '.py': b'#', '.sh': b'#', '.rb': b'#', '.pl': b'#', '.r': b'#',
+    '.yml': b'#', '.yaml': b'#', '.toml': b'#', '.cfg': b'#', '.ini': b'#',
+    '.js': b'//', '.ts': b'//', '.jsx': b'//', '.tsx': b'//', '.go': b'//',
+    '.rs': b'//', '.c': b'//', '.h': b'//', '.cpp': b'//', '.hpp': b'//',
+    '.java': b'//', '.kt': b'//', '.swift': b'//', '.scss': b'//',
+}
+
+EXCLUDED_DIRS = {'.git', '.hg', '.svn', '__pycache__', 'node_modules', '.venv', 'venv', '.tox', '.nox'}
+
+_ENCODING_COOKIE = re.compile(rb"^[ \t\f]*#.*?coding[:=][ \t]*[-\w.]+")
+# A line 1 that lets PEP 263 look for the cookie on line 2, as tokenize.detect_encoding does
+_BLANK_OR_COMMENT = re.compile(rb"^[ \t\f]*(?:[#\r\n]|$)")
+UTF8_BOM = b"\xef\xbb\xbf"
+
+
+@dataclass(slots=True)
+class FileStampResult:
+    """Outcome of stamping a single file"""
+    path: str
+    status: str
+    watermark_signature: Optional[str] = None
+    content_hash: Optional[str] = None
+    error: Optional[str] = None
+    mtime_ns: Optional[int] = None
+    size: Optional[int] = None
+    watermarked_at: Optional[str] = None
+
+
+@dataclass(slots=True)
+class FileVerifyResult:
+    """Outcome of verifying a single file's embedded watermark"""
+    path: str
+    status: str
+    watermark_signature: Optional[str] = None
+    content_hash: Optional[str] = None
+    error: Optional[str] = None
+
+
+class _HeadReader:
+    """Line reader over the leading bytes of a memory-mapped file"""
+
+    def __init__(self, buffer, length: int):
+        self._buffer = buffer
+        self._length = length
+        self._position = 0
+
+    def readline(self, limit: int = -1) -> bytes:
+        start = self._position
+        end = self._length if limit < 0 else min(self._length, start + limit)
+        newline = self._buffer.find(b"\n", start, end)
+        self._position = end if newline < 0 else newline + 1
+        return self._buffer[start:self._position]
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, position: int):
+        self._position = position
+
+
+def iter_watermark_files(root: str, extensions: Optional[Dict[str, bytes]] = None) -> Iterator[str]:
+    """Walk a tree yielding the paths of files that take a watermark header"""
+    extensions = COMMENT_PREFIXES if extensions is None else extensions
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError as e:
+            logging.warning(f"Cannot scan {directory}: {e}")
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in EXCLUDED_DIRS:
+                        pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    if os.path.splitext(entry.name)[1].lower() in extensions:
+                        yield entry.path
+
+
+def build_watermark_header(comment: bytes, timestamp: str, signature: bytes = b"0" * SIGNATURE_LENGTH,
+                           system=None) -> bytes:
+    """Render the managed copyright header block for a comment style"""
+    system = system or copyright_watermarking
+    lines = [
+        WATERMARK_BEGIN,
+        f"Copyright (c) 2025 {system.owner}".encode(),
+        f"Contact: {system.contact}".encode(),
+        f"ORCID: {system.orcid}".encode(),
+        f"Watermarked: {timestamp}".encode(),
+        SIGNATURE_LABEL + signature,
+        WATERMARK_END,
+    ]
+    return b"".join(comment + b" " + line + b"\n" for line in lines)
+
+
+def _is_header_line(line: bytes, comment: bytes, marker: bytes) -> bool:
+    return line.strip() == comment + b" " + marker
+
+
+def _read_preamble(src, comment: bytes) -> List[bytes]:
+    """
+    Read what must stay above the header: a UTF-8 BOM, a shebang and an
+    encoding cookie on line 1, or on line 2 below a blank or comment line
+    (PEP 263); the last item returned is the first body line
+    """
+    preamble = []
+    line = src.readline(MAX_HEAD_LINE)
+    if line.startswith(UTF8_BOM):
+        preamble.append(UTF8_BOM)
+        line = line[len(UTF8_BOM):]
+    if comment == b"#" and _ENCODING_COOKIE.match(line):
+        return preamble + [line, src.readline(MAX_HEAD_LINE)]
+    if comment == b"#" and line and _BLANK_OR_COMMENT.match(line):
+        position = src.tell()
+        second = src.readline(MAX_HEAD_LINE)
+        if _ENCODING_COOKIE.match(second):
+            return preamble + [line, second, src.readline(MAX_HEAD_LINE)]
+        src.seek(position)
+    if line.startswith(b"#!"):
+        preamble.append(line)
+        line = src.readline(MAX_HEAD_LINE)
+    preamble.append(line)
+    return preamble
+
+
+def _split_existing_header(src, first_line: bytes, comment: bytes) -> Tuple[bytes, Optional[str]]:
+    """Consume an existing managed header, returning body bytes read past it and its signature"""
+    if not _is_header_line(first_line, comment, WATERMARK_BEGIN):
+        return first_line, None
+    consumed = [first_line]
+    signature = None
+    signature_prefix = comment + b" " + SIGNATURE_LABEL
+    for _ in range(HEADER_MAX_LINES):
+        line = src.readline(MAX_HEAD_LINE)
+        consumed.append(line)
+        if not line:
+            break
+        if line.startswith(signature_prefix):
+            signature = line[len(signature_prefix):].strip().decode('ascii', 'replace')
+        if _is_header_line(line, comment, WATERMARK_END):
+            return b"", signature
+    # Unterminated block: leave it in place as ordinary content
+    return b"".join(consumed), None
+
+
+def read_watermark(path: str, comment: bytes = b"#") -> Tuple[Optional[str], str]:
+    """Stream a file returning its embedded signature and the SHA-256 of its body"""
+    with open(path, 'rb') as src:
+        preamble = _read_preamble(src, comment)
+        body_head, signature = _split_existing_header(src, preamble.pop(), comment)
+        content_hash = hashlib.sha256(body_head)
+        while True:
+            chunk = src.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            content_hash.update(chunk)
+    return signature, content_hash.hexdigest()
+
+
+def read_watermark_head(path: str, comment: bytes = b"#") -> Tuple[str, Optional[str]]:
+    """
+    Extract the embedded signature from a memory-mapped read of the file head
+    Returns ('present', signature), ('missing', None) or ('malformed', None)
+    """
+    with open(path, 'rb') as src:
+        size = os.fstat(src.fileno()).st_size
+        if size == 0:
+            return 'missing', None
+        length = min(size, VERIFY_HEAD_BYTES)
+        with mmap.mmap(src.fileno(), length, access=mmap.ACCESS_READ) as head:
+            reader = _HeadReader(head, length)
+            preamble = _read_preamble(reader, comment)
+            first_line = preamble.pop()
+            _, signature = _split_existing_header(reader, first_line, comment)
+
+    if signature is not None:
+        if len(signature) == SIGNATURE_LENGTH and all(c in "0123456789ABCDEF" for c in signature):
+            return 'present', signature
+        return 'malformed', None
+    if _is_header_line(first_line, comment, WATERMARK_BEGIN):
+        return 'malformed', None
+    return 'missing', None
+
+
+def stamp_file(path: str, relative_path: str, timestamp: str, comment: bytes = b"#",
+               system=None) -> FileStampResult:
+    """
+    Insert or refresh the watermark header of one file
+    The body is streamed into a temporary file next to the original while it
+    is hashed, the signature is patched into the reserved header slot and the
+    temporary file atomically replaces the original
+    """
+    system = system or copyright_watermarking
+    directory = os.path.dirname(path) or "."
+    tmp_path = None
+    try:
+        with open(path, 'rb') as src:
+            preamble = _read_preamble(src, comment)
+            body_head, _ = _split_existing_header(src, preamble.pop(), comment)
+
+            with tempfile.NamedTemporaryFile('wb', dir=directory, prefix=".wm-", suffix=".tmp",
+                                             delete=False) as dst:
+                tmp_path = dst.name
+                for line in preamble:
+                    dst.write(line)
+                if preamble and preamble[-1] != UTF8_BOM and not preamble[-1].endswith(b"\n"):
+                    dst.write(b"\n")
+
+                header = build_watermark_header(comment, timestamp, system=system)
+                signature_offset = dst.tell() + header.index(SIGNATURE_LABEL) + len(SIGNATURE_LABEL)
+                dst.write(header)
+
+                content_hash = hashlib.sha256()
+                content_hash.update(body_head)
+                dst.write(body_head)
+                while True:
+                    chunk = src.read(COPY_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    content_hash.update(chunk)
+                    dst.write(chunk)
+
+                content_digest = content_hash.hexdigest()
+                signature = system._generate_watermark_signature(relative_path, timestamp, content_digest)
+                dst.seek(signature_offset)
+                dst.write(signature.encode())
+
+        shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+        stat = os.stat(path)
+        return FileStampResult(relative_path, 'stamped', signature, content_digest,
+                               mtime_ns=stat.st_mtime_ns, size=stat.st_size, watermarked_at=timestamp)
+
+    except Exception as e:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        return FileStampResult(relative_path, 'error', error=str(e))
+
+
+def _process_file(path: str, relative_path: str, timestamp: str, comment: bytes, known) -> FileStampResult:
+    """Stamp a file unless its manifest entry shows it is already watermarked"""
+    if known is not None:
+        try:
+            stat = os.stat(path)
+            if stat.st_mtime_ns == known.mtime_ns and stat.st_size == known.size:
+                return FileStampResult(relative_path, 'unchanged', known.watermark_signature, known.content_hash,
+                                       mtime_ns=known.mtime_ns, size=known.size,
+                                       watermarked_at=known.watermarked_at)
+            # Metadata moved: only re-sign if the body or the embedded signature changed
+            signature, content_digest = read_watermark(path, comment)
+            if content_digest == known.content_hash and signature == known.watermark_signature:
+                return FileStampResult(relative_path, 'touched', signature, content_digest,
+                                       mtime_ns=stat.st_mtime_ns, size=stat.st_size,
+                                       watermarked_at=known.watermarked_at)
+        except OSError as e:
+            return FileStampResult(relative_path, 'error', error=str(e))
+    return stamp_file(path, relative_path, timestamp, comment)
+
+
+def _stamp_batch(batch: List[tuple], timestamp: str, extensions: Dict[str, bytes]) -> List[FileStampResult]:
+    """Stamp a batch of (path, relative_path, manifest_entry) items; runs inside pool workers"""
+    results = []
+    for path, relative_path, known in batch:
+        comment = extensions[os.path.splitext(path)[1].lower()]
+        results.append(_process_file(path, relative_path, timestamp, comment, known))
+    return results
+
+
+def _batched(iterable, size: int) -> Iterator[List[str]]:
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _verify_batch(batch: List[tuple], deep: bool, extensions: Dict[str, bytes]) -> List[FileVerifyResult]:
+    """Extract embedded signatures for a batch of (path, relative_path) items; runs inside pool workers"""
+    results = []
+    for path, relative_path in batch:
+        comment = extensions[os.path.splitext(path)[1].lower()]
+        try:
+            state, signature = read_watermark_head(path, comment)
+            content_hash = read_watermark(path, comment)[1] if deep and state == 'present' else None
+            results.append(FileVerifyResult(relative_path, state, signature, content_hash))
+        except OSError as e:
+            results.append(FileVerifyResult(relative_path, 'error', error=str(e)))
+    return results
+
+
+def run_batches(batch_function, items: Iterator[tuple], arguments: tuple,
+                workers: int, batch_size: int, max_in_flight: Optional[int] = None) -> Iterator:
+    """
+    Run batch_function over items in batches, in-process or across a process pool
+    At most max_in_flight batches are queued at once, so a slow pool holds
+    back the producer instead of buffering the whole item stream
+    """
+    batches = _batched(items, batch_size)
+    if workers <= 1:
+        for batch in batches:
+            yield from batch_function(batch, *arguments)
+        return
+
+    max_in_flight = max_in_flight or workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = set()
+        for batch in batches:
+            in_flight.add(executor.submit(batch_function, batch, *arguments))
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        for future in in_flight:
+            yield from future.result()
+
+
+def watermark_tree(root: str, workers: Optional[int] = None, extensions: Optional[Dict[str, bytes]] = None,
+                   batch_size: int = 256, on_result=None, manifest=None, ledger=None):
+    """
+    Stamp every source file under root with a copyright watermark header
+    Files are streamed and atomically rewritten across a process pool;
+    on_result, if given, is called in this process with each FileStampResult.
+    With a WatermarkManifest, files whose size and mtime match their entry
+    are skipped on a stat alone and the manifest is updated in place.
+    With a WatermarkLedger, newly issued signatures are appended in batches
+    """
+    extensions = COMMENT_PREFIXES if extensions is None else extensions
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    root = os.path.abspath(root)
+    # Deterministic signing stamps the epoch so identical trees produce identical bytes
+    if copyright_watermarking.deterministic:
+        timestamp = copyright_watermarking.signature_epoch
+    else:
+        timestamp = datetime.now(timezone.utc).isoformat()
+    known_entries = manifest.entries() if manifest is not None else {}
+    seen_paths = set()
+    pending_rows = []
+    pending_ledger = []
+
+    def items():
+        for path in iter_watermark_files(root, extensions):
+            relative_path = os.path.relpath(path, root).replace(os.sep, "/")
+            seen_paths.add(relative_path)
+            yield path, relative_path, known_entries.get(relative_path)
+
+    counts = {'stamped': 0, 'unchanged': 0, 'touched': 0, 'error': 0}
+    start = time.perf_counter()
+    for result in run_batches(_stamp_batch, items(), (timestamp, extensions), workers, batch_size):
+        counts[result.status] = counts.get(result.status, 0) + 1
+        if result.status == 'error':
+            logging.warning(f"Watermark stamping failed for {result.path}: {result.error}")
+        elif manifest is not None and result.status != 'unchanged':
+            pending_rows.append((result.path, result.mtime_ns, result.size, result.content_hash,
+                                 result.watermark_signature, result.watermarked_at))
+            if len(pending_rows) >= MANIFEST_FLUSH_ROWS:
+                manifest.record_many(pending_rows)
+                pending_rows = []
+        if ledger is not None and result.status == 'stamped':
+            pending_ledger.append((result.path, result.watermarked_at, result.watermark_signature))
+            if len(pending_ledger) >= MANIFEST_FLUSH_ROWS:
+                ledger.append_entries(pending_ledger)
+                pending_ledger = []
+        if on_result is not None:
+            on_result(result)
+
+    if ledger is not None:
+        ledger.append_entries(pending_ledger)
+    files_pruned = 0
+    if manifest is not None:
+        manifest.record_many(pending_rows)
+        files_pruned = manifest.prune(seen_paths)
+    elapsed = time.perf_counter() - start
+
+    files_processed = sum(counts.values())
+    return {
+        'status': 'watermark_tree_complete',
+        'root': root,
+        'files_processed': files_processed,
+        'files_stamped': counts['stamped'],
+        'files_unchanged': counts['unchanged'] + counts['touched'],
+        'files_failed': counts['error'],
+        'manifest_entries_pruned': files_pruned,
+        'workers': workers,
+        'elapsed_seconds': round(elapsed, 3),
+        'files_per_sec': round(files_processed / elapsed, 1) if elapsed > 0 else 0.0,
+        'watermark_timestamp': timestamp,
+        'copyright': f"© 2025 {copyright_watermarking.owner}"
+    }
+
+
+def _classify_verification(result: FileVerifyResult, known, issued_signatures) -> str:
+    """Compare an extracted header against the issued-signature registry"""
+    if result.status != 'present':
+        return 'tampered' if result.status == 'malformed' else result.status
+    if known is not None and result.watermark_signature == known.watermark_signature:
+        if result.content_hash is not None and result.content_hash != known.content_hash:
+            return 'tampered'
+        return 'valid'
+    if result.watermark_signature in issued_signatures or known is not None:
+        # One of our signatures on the wrong file, or a rewritten signature
+        return 'tampered'
+    return 'foreign'
+
+
+def verify_tree(root: str, manifest, workers: Optional[int] = None,
+                extensions: Optional[Dict[str, bytes]] = None, batch_size: int = 512,
+                deep: bool = False, on_result=None, signature_index=None):
+    """
+    Audit embedded watermark headers under root against issued signatures
+    Workers memory-map only the head of each file; deep=True additionally
+    re-hashes file bodies to catch edits below an intact header. A
+    SignatureIndex, if given, answers "is this ours?" instead of the manifest
+    """
+    extensions = COMMENT_PREFIXES if extensions is None else extensions
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    root = os.path.abspath(root)
+    known_entries = manifest.entries()
+    if signature_index is not None:
+        issued_signatures = signature_index
+    else:
+        issued_signatures = {entry.watermark_signature for entry in known_entries.values()}
+
+    def items():
+        for path in iter_watermark_files(root, extensions):
+            yield path, os.path.relpath(path, root).replace(os.sep, "/")
+
+    counts = {'valid': 0, 'missing': 0, 'tampered': 0, 'foreign': 0, 'error': 0}
+    flagged = {'missing': [], 'tampered': [], 'foreign': [], 'error': []}
+    start = time.perf_counter()
+    for result in run_batches(_verify_batch, items(), (deep, extensions), workers, batch_size):
+        result.status = _classify_verification(result, known_entries.get(result.path), issued_signatures)
+        counts[result.status] += 1
+        if result.status in flagged:
+            flagged[result.status].append(result.path)
+        if on_result is not None:
+            on_result(result)
+    elapsed = time.perf_counter() - start
+
+    files_scanned = sum(counts.values())
+    return {
+        'status': 'verify_tree_complete',
+        'root': root,
+        'files_scanned': files_scanned,
+        'files_valid': counts['valid'],
+        'files_missing': counts['missing'],
+        'files_tampered': counts['tampered'],
+        'files_foreign': counts['foreign'],
+        'files_failed': counts['error'],
+        'missing_paths': flagged['missing'],
+        'tampered_paths': flagged['tampered'],
+        'foreign_paths': flagged['foreign'],
+        'failed_paths': flagged['error'],
+        'deep_verification': deep,
+        'workers': workers,
+        'elapsed_seconds': round(elapsed, 3),
+        'files_per_sec': round(files_scanned / elapsed, 1) if elapsed > 0 else 0.0,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'copyright': f"© 2025 {copyright_watermarking.owner}"
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stamp or verify copyright watermark headers across a source tree")
+    parser.add_argument('root', help="directory to watermark")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--manifest', default=None, help="SQLite manifest for incremental re-runs")
+    parser.add_argument('--verify', action='store_true', help="audit headers against the manifest instead of stamping")
+    parser.add_argument('--deep', action='store_true', help="with --verify, also re-hash file bodies")
+    parser.add_argument('--index', default=None, help="with --verify, SignatureIndex of all issued signatures")
+    args = parser.parse_args()
+    if args.verify and not args.manifest:
+        parser.error("--verify requires --manifest")
+
+    print("="*80)
+    print("FILE WATERMARKING")
+    print("="*80)
+    if args.verify:
+        from watermark_manifest import WatermarkManifest
+        with WatermarkManifest(args.manifest) as manifest:
+            index = None
+            if args.index:
+                from watermark_signature_index import SignatureIndex
+                index = SignatureIndex.load(args.index)
+            report = verify_tree(args.root, manifest, workers=args.workers, deep=args.deep,
+                                 signature_index=index)
+    elif args.manifest:
+        from watermark_manifest import WatermarkManifest
+        with WatermarkManifest(args.manifest) as manifest:
+            report = watermark_tree(args.root, workers=args.workers, manifest=manifest)
+    else:
+        report = watermark_tree(args.root, workers=args.workers)
+    for key, value in report.items():
+        if isinstance(value, list):
+            print(f"{key}: {len(value)}")
+            for path in value:
+                print(f"  - {path}")
+        else:
+            print(f"{key}: {value}")
+    print("="*80)
+    failed = report['files_failed'] + report.get('files_missing', 0) + report.get('files_tampered', 0) \
+        + report.get('files_foreign', 0)
+    sys.exit(1 if failed else 0)
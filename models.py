@@ -10,22 +10,29 @@ Licensed under MIT License with additional copyright protections
 All rights reserved.
 """
 
+import click
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 import logging
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Index, inspect
 from sqlalchemy.sql import func
-from app import db
+from app import app, db
 
 class SecurityLog(db.Model):
     """Model for security event logs"""
     __tablename__ = 'security_logs'
+    __table_args__ = (
+        # Newest-first listings and (timestamp, id) keyset pages
+        Index('ix_security_logs_timestamp_id', 'timestamp', 'id'),
+        # GROUP BY event_type and event_type + time range exports
+        Index('ix_security_logs_event_type_timestamp', 'event_type', 'timestamp'),
+    )
 
     id = Column(Integer, primary_key=True)
     event_type = Column(String(50), nullable=False)
     event_data = Column(Text)
     result = Column(Text)
-    timestamp = Column(DateTime, default=func.now())
+    timestamp = Column(DateTime, nullable=False, default=func.now())
 
     def __repr__(self):
         return f'<SecurityLog {self.id}: {self.event_type}>'
@@ -33,6 +40,16 @@ class SecurityLog(db.Model):
 class ThreatDetection(db.Model):
     """Model for threat detections"""
     __tablename__ = 'threat_detections'
+    __table_args__ = (
+        # Newest-first listings and (detected_at, id) keyset pages
+        Index('ix_threat_detections_detected_at_id', 'detected_at', 'id'),
+        # Latest unresolved threats on the dashboard
+        Index('ix_threat_detections_resolved_detected_at', 'resolved', 'detected_at'),
+        # GROUP BY severity, resolved for the dashboard aggregates
+        Index('ix_threat_detections_severity_resolved', 'severity', 'resolved'),
+        # threat_type + time range exports
+        Index('ix_threat_detections_threat_type_detected_at', 'threat_type', 'detected_at'),
+    )
 
     id = Column(Integer, primary_key=True)
     threat_type = Column(String(50), nullable=False)
@@ -40,12 +57,61 @@ class ThreatDetection(db.Model):
     description = Column(Text)
     source_ip = Column(String(45))  # IPv6 compatible
     resolved = Column(Boolean, default=False)
-    detected_at = Column(DateTime, default=func.now())
+    detected_at = Column(DateTime, nullable=False, default=func.now())
     resolved_at = Column(DateTime)
 
     def __repr__(self):
         return f'<ThreatDetection {self.id}: {self.threat_type}>'
 
+# Stands in for a timestamp missing from rows written while the column was nullable; sorts as the oldest
+MISSING_TIMESTAMP = datetime(1970, 1, 1)
+
+def backfill_timestamps():
+    """
+    Replace NULL SecurityLog.timestamp and ThreatDetection.detected_at values
+    Keyset cursors are (time, id) pairs, so these columns are NOT NULL on new
+    tables; databases created before that get their NULLs filled in here.
+    Returns the rows updated per table
+    """
+    updated = {}
+    for model, column in ((SecurityLog, SecurityLog.timestamp), (ThreatDetection, ThreatDetection.detected_at)):
+        result = db.session.execute(db.update(model).where(column.is_(None)).values({column.key: MISSING_TIMESTAMP}))
+        updated[model.__tablename__] = result.rowcount
+        if result.rowcount:
+            logging.info(f"Backfilled {result.rowcount} NULL {model.__tablename__}.{column.key} values")
+    db.session.commit()
+    return updated
+
+def ensure_indexes():
+    """
+    Create model indexes missing from an existing database
+    create_all() only adds indexes together with a new table, so databases
+    created before an index was declared get it here; returns the names created.
+    Run it once per deploy through the migrate command, not at import
+    """
+    created = []
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                # Another process may have created it since the inspection
+                index.create(bind=db.engine, checkfirst=True)
+                created.append(index.name)
+                logging.info(f"Created index {index.name}")
+    return created
+
+@app.cli.command('migrate')
+def migrate_command():
+    """Backfill NULL timestamps and create missing model indexes (flask --app app migrate)"""
+    for table, count in backfill_timestamps().items():
+        if count:
+            click.echo(f"Backfilled {count} NULL timestamps in {table}")
+    created = ensure_indexes()
+    click.echo(f"Created indexes: {', '.join(created)}" if created else "All indexes present")
+
 # Copyright Protection Notice
 # © 2025 Ervin Remus Radosavlevici
 # Email: radosavlevici210@icloud.com
@@ -4,38 +4,716 @@
 # BLOCKED: replit-agent, radosavlevici21, main-branch-thieves
 
 import os
+import mmap
+import base64
 import hashlib
+import hmac
+import asyncio
+import functools
 import secrets
+import struct
+import tempfile
+import threading
 import time
+from array import array
+from collections import OrderedDict, defaultdict, deque
+from contextlib import closing, contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from Crypto.Cipher import AES
 from Crypto.Random import get_random_bytes
 from Crypto.Util.Padding import pad, unpad
+from quantum_key_store import QuantumKeyStore, generate_quantum_key, quantum_key_store
+
+BLOCK_SIZE = AES.block_size
+# Up to this many padded bytes per layer, encryption continues a cached CBC context instead of AES.new
+CHAINED_CBC_LIMIT = 4096
+# Decryption XORs the whole buffer as one integer; above this size use AES.new instead
+INTEGER_CBC_LIMIT = 4096
+FOREIGN_KEY_CACHE_SIZE = 64
+STREAM_CHUNK_SIZE = 1024 * 1024
+# Chunked container: header, then length-prefixed independently encrypted chunks each followed by
+# an HMAC over the header, chunk index and ciphertext, then a zero length, the chunk count and its HMAC
+CHUNKED_MAGIC = b"QEGCHNK2"
+CHUNKED_HEADER = struct.Struct("<8sIH16s")  # magic, chunk size, layers, random container id
+CHUNK_LENGTH = struct.Struct("<I")
+CHUNKED_TRAILER_COUNT = struct.Struct("<I")
+CHUNK_TAG_SIZE = 32
+CHUNKED_TRAILER_SIZE = CHUNKED_TRAILER_COUNT.size + CHUNK_TAG_SIZE
+PARALLEL_CHUNK_SIZE = 4 * 1024 * 1024
+# Binary envelope: fixed header, u32 chunk table, concatenated chunk ciphertexts
+ENVELOPE_MAGIC = b"QEGE"
+ENVELOPE_VERSION = 1
+# magic, version, profile, layers, key id, created (unix seconds), chunk count, payload length
+ENVELOPE_HEADER = struct.Struct("<4sBBBx8sIIQ")
+ENVELOPE_CHUNK_LENGTH = struct.Struct("<I")
+PROFILE_LAYERED_CBC = 0
+PROFILE_AES_GCM = 1
+# security_level selects the envelope profile; layered CBC stays the default
+SECURITY_PROFILES = {'maximum': PROFILE_LAYERED_CBC, 'aead': PROFILE_AES_GCM}
+GCM_NONCE_SIZE = 12
+GCM_TAG_SIZE = 16
+CHUNK_INDEX = struct.Struct("<I")
+# Batches of at least this many equal-length records run CBC column-wise, one ECB call per block column
+COLUMNAR_MIN_RECORDS = 8
+COLUMNAR_MAX_BLOCKS = 128
+# Async facade: payloads up to this size run on the event loop, larger ones in an executor
+ASYNC_INLINE_LIMIT = 16 * 1024
+
+
+def _layered_length(length, layers):
+    """Ciphertext length of a length-byte record after all layers"""
+    for _ in range(layers):
+        length = (length // BLOCK_SIZE + 2) * BLOCK_SIZE
+    return length
+
+
+def _to_columns(rows, blocks, count):
+    """Row-major records of equal block count to column-major: block j of every record, then j + 1"""
+    columns = bytearray(len(rows))
+    stride = blocks * BLOCK_SIZE
+    column_bytes = count * BLOCK_SIZE
+    for j in range(blocks):
+        base = j * column_bytes
+        for t in range(BLOCK_SIZE):
+            columns[base + t:base + column_bytes:BLOCK_SIZE] = rows[j * BLOCK_SIZE + t::stride]
+    return columns
+
+
+def _to_rows(columns, blocks, count):
+    rows = bytearray(len(columns))
+    stride = blocks * BLOCK_SIZE
+    column_bytes = count * BLOCK_SIZE
+    for j in range(blocks):
+        base = j * column_bytes
+        for t in range(BLOCK_SIZE):
+            rows[j * BLOCK_SIZE + t::stride] = columns[base + t:base + column_bytes:BLOCK_SIZE]
+    return rows
+
+
+def _encrypt_columns(ecb_ciphers, columns, count, blocks):
+    """
+    All layers over count padded records held column-major
+    Column j of a layer is XORed with column j - 1 and encrypted in one
+    ECB call, so cipher calls scale with record length, not record count.
+    Returns the final column-major layout and its block count
+    """
+    column_bytes = count * BLOCK_SIZE
+    padding_column = bytes([BLOCK_SIZE]) * column_bytes
+    for layer, ecb_cipher in enumerate(ecb_ciphers):
+        if layer:
+            # Inner layers end on a block boundary, so their padding is one full block per record
+            columns = columns + padding_column
+            blocks += 1
+        iv = get_random_bytes(column_bytes)
+        output = [iv]
+        previous = int.from_bytes(iv, 'big')
+        for j in range(blocks):
+            block = int.from_bytes(columns[j * column_bytes:(j + 1) * column_bytes], 'big') ^ previous
+            encrypted = ecb_cipher.encrypt(block.to_bytes(column_bytes, 'big'))
+            previous = int.from_bytes(encrypted, 'big')
+            output.append(encrypted)
+        columns = b''.join(output)
+        blocks += 1
+    return columns, blocks
+
+
+def _decrypt_columns(ecb_ciphers, columns, count, blocks):
+    """Inverse of _encrypt_columns, outermost cipher first; the innermost padding is left in place"""
+    column_bytes = count * BLOCK_SIZE
+    padding_column = bytes([BLOCK_SIZE]) * column_bytes
+    for layer, ecb_cipher in enumerate(ecb_ciphers):
+        body = columns[column_bytes:]
+        plain = (int.from_bytes(ecb_cipher.decrypt(body), 'big') ^
+                 int.from_bytes(columns[:-column_bytes], 'big')).to_bytes(len(body), 'big')
+        blocks -= 1
+        if layer < len(ecb_ciphers) - 1:
+            if plain[-column_bytes:] != padding_column:
+                raise ValueError("Padding is incorrect.")
+            plain = plain[:-column_bytes]
+            blocks -= 1
+        columns = plain
+    return columns, blocks
+
+
+def encode_envelope_wire(envelope):
+    """URL-safe base64 text form of a binary envelope, without padding"""
+    return base64.urlsafe_b64encode(envelope).rstrip(b'=').decode('ascii')
+
+
+def decode_envelope_wire(text):
+    if isinstance(text, str):
+        text = text.encode('ascii')
+    return base64.urlsafe_b64decode(text + b'=' * (-len(text) % 4))
+
+
+class QuantumEnvelope:
+    """
+    Parsed binary envelope
+    Parsing only unpacks the header and chunk table; chunk payloads are
+    memoryview slices of the source buffer
+    """
+    __slots__ = ('version', 'profile', 'layers', 'key_id', 'created',
+                 'payload_length', 'chunk_lengths', 'header', 'payload')
+
+    def __init__(self, version, profile, layers, key_id, created, payload_length, chunk_lengths, header, payload):
+        self.version = version
+        self.profile = profile
+        self.layers = layers
+        self.key_id = key_id
+        self.created = created
+        self.payload_length = payload_length
+        self.chunk_lengths = chunk_lengths
+        self.header = header
+        self.payload = payload
+
+    @classmethod
+    def parse(cls, buffer):
+        view = memoryview(buffer)
+        if len(view) < ENVELOPE_HEADER.size:
+            raise ValueError("Envelope is truncated")
+        magic, version, profile, layers, key_id, created, chunk_count, payload_length = \
+            ENVELOPE_HEADER.unpack_from(view)
+        if magic != ENVELOPE_MAGIC:
+            raise ValueError("Not a quantum envelope")
+        if version != ENVELOPE_VERSION:
+            raise ValueError(f"Unsupported envelope version {version}")
+        table_end = ENVELOPE_HEADER.size + chunk_count * ENVELOPE_CHUNK_LENGTH.size
+        if len(view) < table_end:
+            raise ValueError("Envelope is truncated")
+        chunk_lengths = struct.unpack_from(f"<{chunk_count}I", view, ENVELOPE_HEADER.size)
+        if sum(chunk_lengths) != payload_length or len(view) != table_end + payload_length:
+            raise ValueError("Envelope chunk table does not match its payload")
+        return cls(version, profile, layers, bytes(key_id), created, payload_length,
+                   chunk_lengths, view[:table_end], view[table_end:])
+
+    def chunks(self):
+        offset = 0
+        for length in self.chunk_lengths:
+            yield self.payload[offset:offset + length]
+            offset += length
+
+
+def _envelope_header(key_id, layers, chunk_lengths, profile, created=None):
+    """Fixed header plus chunk table; the AEAD profile authenticates these bytes"""
+    header = ENVELOPE_HEADER.pack(ENVELOPE_MAGIC, ENVELOPE_VERSION, profile, layers, key_id,
+                                  int(time.time() if created is None else created),
+                                  len(chunk_lengths), sum(chunk_lengths))
+    return header + struct.pack(f"<{len(chunk_lengths)}I", *chunk_lengths)
+
+
+def build_envelope(key_id, layers, encrypted_chunks, profile=PROFILE_LAYERED_CBC, created=None):
+    """Assemble envelope bytes around already encrypted chunks"""
+    header = _envelope_header(key_id, layers, [len(chunk) for chunk in encrypted_chunks], profile, created)
+    return b''.join([header, *encrypted_chunks])
+
+
+def _gcm_encrypt_chunk(key_and_header, indexed_chunk):
+    """One AES-GCM pass: nonce + ciphertext + tag, bound to the envelope header and chunk position"""
+    key, header = key_and_header
+    index, chunk = indexed_chunk
+    cipher = AES.new(key, AES.MODE_GCM, nonce=get_random_bytes(GCM_NONCE_SIZE))
+    cipher.update(header)
+    cipher.update(CHUNK_INDEX.pack(index))
+    ciphertext, tag = cipher.encrypt_and_digest(chunk)
+    return cipher.nonce + ciphertext + tag
+
+
+def _gcm_decrypt_chunk(key_and_header, indexed_chunk):
+    key, header = key_and_header
+    index, chunk = indexed_chunk
+    if len(chunk) < GCM_NONCE_SIZE + GCM_TAG_SIZE:
+        raise ValueError("Encrypted chunk has an invalid length")
+    cipher = AES.new(key, AES.MODE_GCM, nonce=chunk[:GCM_NONCE_SIZE])
+    cipher.update(header)
+    cipher.update(CHUNK_INDEX.pack(index))
+    return cipher.decrypt_and_verify(chunk[GCM_NONCE_SIZE:-GCM_TAG_SIZE], chunk[-GCM_TAG_SIZE:])
+
+
+class _ChainedCBC:
+    """
+    Reusable CBC encryption context for one layer key
+    pycryptodome fixes the IV when a CBC context is created, which also
+    expands the key again. This context instead carries its chain across
+    messages: folding iv XOR the last ciphertext block into the first
+    plaintext block makes the output exactly CBC under iv
+    """
+    __slots__ = ('_cipher', '_last_block', '_lock')
+
+    def __init__(self, key):
+        self._cipher = AES.new(key, AES.MODE_CBC, bytes(BLOCK_SIZE))
+        self._last_block = 0
+        self._lock = threading.Lock()
+
+    def encrypt(self, iv, padded_data):
+        head = int.from_bytes(padded_data[:BLOCK_SIZE], 'big') ^ int.from_bytes(iv, 'big')
+        with self._lock:
+            first = (head ^ self._last_block).to_bytes(BLOCK_SIZE, 'big')
+            ciphertext = self._cipher.encrypt(first + padded_data[BLOCK_SIZE:])
+            self._last_block = int.from_bytes(ciphertext[-BLOCK_SIZE:], 'big')
+        return ciphertext
+
+
+def _cbc_decrypt_buffer(ecb_cipher, iv, ciphertext):
+    """CBC decryption as one ECB pass XORed with the shifted ciphertext"""
+    if not ciphertext or len(ciphertext) % BLOCK_SIZE:
+        raise ValueError("Ciphertext length must be a non-zero multiple of the block size")
+    decrypted = ecb_cipher.decrypt(ciphertext)
+    chain = iv + ciphertext[:-BLOCK_SIZE]
+    return (int.from_bytes(decrypted, 'big') ^ int.from_bytes(chain, 'big')).to_bytes(len(ciphertext), 'big')
+
+
+class _EncryptingLayer:
+    """Streaming CBC layer: IV first, block-aligned ciphertext, PKCS#7 on finalize"""
+    __slots__ = ('_cipher', '_header', '_pending')
+
+    def __init__(self, key):
+        self._cipher = AES.new(key, AES.MODE_CBC)
+        self._header = self._cipher.iv
+        self._pending = b''
+
+    def update(self, data):
+        if self._pending:
+            data = self._pending + data
+        aligned = len(data) - len(data) % BLOCK_SIZE
+        self._pending = bytes(data[aligned:])
+        output = self._cipher.encrypt(memoryview(data)[:aligned]) if aligned else b''
+        if self._header:
+            output = self._header + output
+            self._header = b''
+        return output
+
+    def finalize(self, data=b''):
+        output = self.update(data)
+        return output + self._cipher.encrypt(pad(self._pending, BLOCK_SIZE))
+
+
+class _DecryptingLayer:
+    """Streaming inverse of _EncryptingLayer; holds back the final block for unpadding"""
+    __slots__ = ('_key', '_cipher', '_pending')
+
+    def __init__(self, key):
+        self._key = key
+        self._cipher = None
+        self._pending = b''
+
+    def update(self, data):
+        if self._pending:
+            data = self._pending + data
+        start = 0
+        if self._cipher is None:
+            if len(data) < BLOCK_SIZE:
+                self._pending = bytes(data)
+                return b''
+            self._cipher = AES.new(self._key, AES.MODE_CBC, bytes(data[:BLOCK_SIZE]))
+            start = BLOCK_SIZE
+        keep = (len(data) - start) % BLOCK_SIZE or BLOCK_SIZE
+        end = len(data) - keep
+        if end <= start:
+            self._pending = bytes(data[start:])
+            return b''
+        self._pending = bytes(data[end:])
+        return self._cipher.decrypt(memoryview(data)[start:end])
+
+    def finalize(self, data=b''):
+        output = self.update(data)
+        if self._cipher is None or len(self._pending) != BLOCK_SIZE:
+            raise ValueError("Encrypted stream is truncated")
+        return output + unpad(self._cipher.decrypt(self._pending), BLOCK_SIZE)
+
+
+def _run_stream_pipeline(layers, reader, writer, chunk_size):
+    """Push reader chunks through every layer in turn; returns (bytes_in, bytes_out)"""
+    bytes_in = bytes_out = 0
+    while True:
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            break
+        bytes_in += len(chunk)
+        for layer in layers:
+            chunk = layer.update(chunk)
+        if chunk:
+            writer.write(chunk)
+            bytes_out += len(chunk)
+    tail = b''
+    for layer in layers:
+        tail = layer.finalize(tail)
+    writer.write(tail)
+    return bytes_in, bytes_out + len(tail)
+
+
+def _encrypt_chunk(layer_keys, chunk):
+    """
+    All layers over one container chunk, each with a fresh IV
+    Every layer encrypts straight from the previous buffer into a
+    preallocated bytearray, so mmap slices are never copied; the view of
+    chunk is released on the way out, even when a layer fails
+    """
+    with memoryview(chunk) as plaintext:
+        source = plaintext
+        for key in layer_keys:
+            aligned = len(source) - len(source) % BLOCK_SIZE
+            output = bytearray(aligned + 2 * BLOCK_SIZE)
+            target = memoryview(output)
+            cipher = AES.new(key, AES.MODE_CBC)
+            target[:BLOCK_SIZE] = cipher.iv
+            if aligned:
+                cipher.encrypt(source[:aligned], output=target[BLOCK_SIZE:BLOCK_SIZE + aligned])
+            cipher.encrypt(pad(bytes(source[aligned:]), BLOCK_SIZE), output=target[BLOCK_SIZE + aligned:])
+            source = target
+    return output
+
+
+def _decrypt_chunk_view(encryption_keys, chunk):
+    """Inverse of _encrypt_chunk into preallocated buffers; returns a memoryview of the last one"""
+    with memoryview(chunk) as ciphertext:
+        source = ciphertext
+        for key in reversed(encryption_keys):
+            if len(source) < 2 * BLOCK_SIZE or len(source) % BLOCK_SIZE:
+                raise ValueError("Encrypted chunk has an invalid length")
+            output = bytearray(len(source) - BLOCK_SIZE)
+            cipher = AES.new(key, AES.MODE_CBC, source[:BLOCK_SIZE])
+            cipher.decrypt(source[BLOCK_SIZE:], output=output)
+            padding = output[-1]
+            if not 1 <= padding <= BLOCK_SIZE or output[-padding:] != bytes([padding]) * padding:
+                raise ValueError("Padding is incorrect.")
+            source = memoryview(output)[:-padding]
+        if source is ciphertext:
+            return memoryview(bytes(ciphertext))
+    return source
+
+
+def _decrypt_chunk(encryption_keys, chunk):
+    for key in reversed(encryption_keys):
+        cipher = AES.new(key, AES.MODE_CBC, chunk[:BLOCK_SIZE])
+        chunk = unpad(cipher.decrypt(chunk[BLOCK_SIZE:]), BLOCK_SIZE)
+    return chunk
+
+
+def _container_mac_key(layer_keys):
+    """HMAC key authenticating a chunked container, derived from its layer keys"""
+    return hashlib.sha256(b"QEG container mac|" + b"".join(layer_keys)).digest()
+
+
+def _container_chunk_tag(mac_key, header, index, ciphertext):
+    mac = hmac.new(mac_key, header, hashlib.sha256)
+    mac.update(CHUNK_INDEX.pack(index))
+    mac.update(ciphertext)
+    return mac.digest()
+
+
+def _container_trailer(mac_key, header, chunk_count):
+    """Zero length, chunk count and a tag over both: marks a complete container"""
+    count = CHUNKED_TRAILER_COUNT.pack(chunk_count)
+    return CHUNK_LENGTH.pack(0) + count + hmac.new(mac_key, header + b"end" + count, hashlib.sha256).digest()
+
+
+def _seal_container_chunk(context, indexed_chunk):
+    """Encrypt one container chunk; returns (ciphertext, tag bound to the header and chunk index)"""
+    layer_keys, mac_key, header = context
+    index, chunk = indexed_chunk
+    encrypted = _encrypt_chunk(layer_keys, chunk)
+    return encrypted, _container_chunk_tag(mac_key, header, index, encrypted)
+
+
+def _open_container_chunk(context, indexed_chunk):
+    """Authenticate one container chunk at its index, then decrypt it"""
+    encryption_keys, mac_key, header, decrypt = context
+    index, chunk, tag = indexed_chunk
+    if not hmac.compare_digest(_container_chunk_tag(mac_key, header, index, chunk), tag):
+        raise ValueError(f"Chunk {index} failed authentication")
+    return decrypt(encryption_keys, chunk)
+
+
+def _new_container_header(chunk_size, layers):
+    """Header for a new container; its random id is covered by every tag, so chunks cannot move between containers"""
+    return CHUNKED_HEADER.pack(CHUNKED_MAGIC, chunk_size, layers, secrets.token_bytes(16))
+
+
+def _container_header(header, layers):
+    """Validate a container header; returns the full ciphertext length of a chunk"""
+    magic, chunk_size, header_layers, _ = CHUNKED_HEADER.unpack(header)
+    if magic != CHUNKED_MAGIC:
+        raise ValueError("Not a chunked quantum container")
+    if header_layers != layers:
+        raise ValueError(f"Container has {header_layers} layers, {layers} keys given")
+    if chunk_size == 0:
+        raise ValueError("Container chunk size must be positive")
+    return _layered_length(chunk_size, layers)
+
+
+class _ContainerFraming:
+    """
+    Checks chunk lengths against the header's chunk size as chunks are read:
+    every chunk but the last is full size and nothing follows a short chunk
+    """
+    
+    def __init__(self, full_length):
+        self.full_length = full_length
+        self.chunks = 0
+        self.final = False
+    
+    def chunk(self, length):
+        if self.final:
+            raise ValueError("Chunk follows the final chunk")
+        if not 2 * BLOCK_SIZE <= length <= self.full_length:
+            raise ValueError(f"Chunk {self.chunks} does not match the container chunk size")
+        self.final = length < self.full_length
+        self.chunks += 1
+        return self.chunks - 1
+    
+    def trailer(self, mac_key, header, trailer):
+        if not hmac.compare_digest(_container_trailer(mac_key, header, self.chunks)[CHUNK_LENGTH.size:], trailer):
+            raise ValueError("Container chunk count or trailer failed authentication")
+
+
+def _container_chunk_views(buffer, encryption_keys, mac_key):
+    """(index, chunk view, tag) for each chunk of a chunked container buffer, trailer checked last"""
+    if len(buffer) < CHUNKED_HEADER.size:
+        raise ValueError("Chunked container is truncated")
+    header = bytes(buffer[:CHUNKED_HEADER.size])
+    framing = _ContainerFraming(_container_header(header, len(encryption_keys)))
+    offset = CHUNKED_HEADER.size
+    while True:
+        if offset + CHUNK_LENGTH.size > len(buffer):
+            raise ValueError("Chunked container is truncated")
+        length, = CHUNK_LENGTH.unpack_from(buffer, offset)
+        offset += CHUNK_LENGTH.size
+        if length == 0:
+            trailer = bytes(buffer[offset:offset + CHUNKED_TRAILER_SIZE])
+            if len(trailer) != CHUNKED_TRAILER_SIZE or offset + CHUNKED_TRAILER_SIZE != len(buffer):
+                raise ValueError("Chunked container trailer is malformed")
+            framing.trailer(mac_key, header, trailer)
+            return
+        index = framing.chunk(length)
+        if offset + length + CHUNK_TAG_SIZE > len(buffer):
+            raise ValueError("Chunked container is truncated")
+        yield index, buffer[offset:offset + length], bytes(buffer[offset + length:offset + length + CHUNK_TAG_SIZE])
+        offset += length + CHUNK_TAG_SIZE
+
+
+@contextmanager
+def _mapped_file(path):
+    """Read-only memoryview over a memory-mapped file; empty files give an empty view"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield memoryview(b'')
+            return
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    try:
+        yield view
+    finally:
+        view.release()
+        mapping.close()
+
+
+@contextmanager
+def _issued_views():
+    """
+    Slices of a mapped file handed to chunk workers, oldest first
+    Callers release each slice once its chunk is written; any left over,
+    for instance after an error, are released on exit, so the mapping can
+    close even while a traceback still references them
+    """
+    views = deque()
+    try:
+        yield views
+    finally:
+        while views:
+            views.popleft().release()
+
+
+@contextmanager
+def _replacing_file(path):
+    """
+    Binary writer for a temporary file beside path; path is replaced only
+    once the block completes, so a failure never leaves a partial file
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".qeg-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as writer:
+            yield writer
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _check_distinct_files(src, dst):
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise ValueError("Source and destination are the same file")
+
+
+def _read_chunks(reader, chunk_size):
+    while True:
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _read_exact(reader, size):
+    data = reader.read(size)
+    if len(data) != size:
+        raise ValueError("Chunked container is truncated")
+    return data
+
+
+def _read_container_chunks(reader, header, encryption_keys, mac_key):
+    """Yield (index, chunk, tag) from a chunked container stream after its header, trailer checked last"""
+    framing = _ContainerFraming(_container_header(header, len(encryption_keys)))
+    while True:
+        length, = CHUNK_LENGTH.unpack(_read_exact(reader, CHUNK_LENGTH.size))
+        if length == 0:
+            framing.trailer(mac_key, header, _read_exact(reader, CHUNKED_TRAILER_SIZE))
+            if reader.read(1):
+                raise ValueError("Data follows the chunked container trailer")
+            return
+        index = framing.chunk(length)
+        chunk = _read_exact(reader, length + CHUNK_TAG_SIZE)
+        yield index, chunk[:length], chunk[length:]
+
+
+def _payload_size(data):
+    """Bytes a payload encrypts to before padding: str counts its UTF-8 encoding"""
+    if isinstance(data, str) and not data.isascii():
+        return len(data.encode('utf-8'))
+    return len(data)
+
+
+def _ordered_map(function, first_argument, items, workers, max_in_flight, executor):
+    """
+    Yield function(first_argument, item) in input order across a pool
+    At most max_in_flight items are pending, which caps buffered chunks;
+    the thread pool is the default because pycryptodome releases the GIL
+    """
+    if workers <= 1:
+        for item in items:
+            yield function(first_argument, item)
+        return
+
+    pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+    max_in_flight = max_in_flight or workers * 2
+    with pool_class(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(function, first_argument, item))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
 
 class QuantumEncryptionGrid:
     """Advanced quantum encryption grid with multi-layer security"""
     
-    def __init__(self):
+    def __init__(self, key_store=None):
         self.copyright = "© 2025 Ervin Remus Radosavlevici"
         self.contact = "radosavlevici210@icloud.com"
         self.blocked_entities = ["replit-agent", "radosavlevici21", "main-branch-thieves"]
         self.main_crypto_wallet = "bc1qrme32cvpv5ywhc4g77sjtkhxqhwwu2kuaqvgle"
         
         # Initialize quantum encryption parameters
-        self.quantum_key = self._generate_quantum_key()
         self.encryption_layers = 5
+        self.key_epoch = 0
+        self._foreign_ciphers = OrderedDict()
+        # Guards the key state and the foreign cipher LRU; grids are shared across executor threads
+        self._lock = threading.RLock()
+        # Grids built without a store keep a private in-memory key, as before
+        self.key_store = QuantumKeyStore() if key_store is None else key_store
+        self._use_key(self.key_store.active_key_id)
         self.security_level = "MAXIMUM"
+    
+    @property
+    def quantum_key(self):
+        return self.key_store.get_key(self.key_id)
+    
+    @quantum_key.setter
+    def quantum_key(self, key):
+        """Setting a key stores and activates it, starting a new epoch"""
+        self._use_key(self.key_store.add_key(key))
+    
+    def _use_key(self, key_id):
+        with self._lock:
+            self.key_id = key_id
+            self.key_epoch += 1
+            self._derive_layer_schedule()
+    
+    def _derive_layer_schedule(self):
+        """Per-layer keys and expanded AES contexts for the current key epoch, from the store's LRU"""
+        with self._lock:
+            self._layer_keys, self._layer_ciphers = self.key_store.layer_schedule(
+                self.key_id, self.encryption_layers)
+            self._cipher_by_key = dict(zip(self._layer_keys, self._layer_ciphers))
+            self._chained_by_key = {key: _ChainedCBC(key) for key in self._layer_keys}
+            self._schedule_layers = self.encryption_layers
+    
+    def _active_schedule(self):
+        """(key id, layer keys, ECB contexts) of the active key, read as one consistent snapshot"""
+        with self._lock:
+            active_key_id = self.key_store.active_key_id
+            if active_key_id != self.key_id:
+                # Another grid or process sharing the store rotated the key
+                self._use_key(active_key_id)
+            elif self._schedule_layers != self.encryption_layers:
+                self._derive_layer_schedule()
+            return self.key_id, self._layer_keys, self._layer_ciphers
+    
+    def _layer_schedule(self):
+        return self._active_schedule()[1:]
+    
+    def rotate_key(self):
+        """Activate a new key in the store; data under earlier key ids still decrypts"""
+        previous_key_id = self.key_id
+        self._use_key(self.key_store.rotate())
+        return {
+            'status': 'key_rotated',
+            'key_id': self.key_id.hex(),
+            'previous_key_id': previous_key_id.hex(),
+            'key_epoch': self.key_epoch,
+            'timestamp': datetime.now().isoformat(),
+            'copyright': self.copyright
+        }
+    
+    def _ecb_cipher_for(self, key):
+        """Cached ECB context for a layer key, including keys from other grids"""
+        cipher = self._cipher_by_key.get(key)
+        if cipher is not None:
+            return cipher
+        with self._lock:
+            cipher = self._foreign_ciphers.get(key)
+            if cipher is None:
+                cipher = AES.new(key, AES.MODE_ECB)
+                self._foreign_ciphers[key] = cipher
+                if len(self._foreign_ciphers) > FOREIGN_KEY_CACHE_SIZE:
+                    self._foreign_ciphers.popitem(last=False)
+            else:
+                self._foreign_ciphers.move_to_end(key)
+            return cipher
+    
+    def _encrypt_layer(self, key, data):
+        """One CBC layer with a fresh IV: returns iv + ciphertext"""
+        padded_data = pad(data, BLOCK_SIZE)
+        iv = get_random_bytes(BLOCK_SIZE)
+        # A key from an epoch rotated away meanwhile has no chained context; fall back to AES.new
+        chained = self._chained_by_key.get(key)
+        if chained is not None and len(padded_data) <= CHAINED_CBC_LIMIT:
+            return iv + chained.encrypt(iv, padded_data)
+        return iv + AES.new(key, AES.MODE_CBC, iv).encrypt(padded_data)
+    
+    def _decrypt_layer(self, key, data):
+        """Reverse one CBC layer of iv + ciphertext"""
+        iv = data[:BLOCK_SIZE]
+        ciphertext = data[BLOCK_SIZE:]
+        if len(ciphertext) <= INTEGER_CBC_LIMIT:
+            return unpad(_cbc_decrypt_buffer(self._ecb_cipher_for(key), iv, ciphertext), BLOCK_SIZE)
+        cipher = AES.new(key, AES.MODE_CBC, iv)
+        return unpad(cipher.decrypt(ciphertext), BLOCK_SIZE)
         
     def _generate_quantum_key(self):
         """Generate quantum-safe encryption key"""
-        timestamp = str(time.time()).encode()
-        random_data = get_random_bytes(64)
-        system_entropy = os.urandom(32)
-        
-        key_material = timestamp + random_data + system_entropy
-        quantum_key = hashlib.sha256(key_material).digest()
-        
-        return quantum_key
+        return generate_quantum_key()
     
     def quantum_encrypt(self, data, security_level="maximum"):
         """Multi-layer quantum encryption"""
@@ -44,21 +722,15 @@ class QuantumEncryptionGrid:
                 data = data.encode('utf-8')
             
             encrypted_data = data
-            encryption_keys = []
+            layer_keys, _ = self._layer_schedule()
             
             # Apply multiple encryption layers
-            for layer in range(self.encryption_layers):
-                layer_key = hashlib.sha256(self.quantum_key + str(layer).encode()).digest()
-                encryption_keys.append(layer_key[:16])
-                
-                cipher = AES.new(layer_key[:16], AES.MODE_CBC)
-                iv = cipher.iv
-                padded_data = pad(encrypted_data, AES.block_size)
-                encrypted_data = iv + cipher.encrypt(padded_data)
+            for layer_key in layer_keys:
+                encrypted_data = self._encrypt_layer(layer_key, encrypted_data)
             
             return {
                 'encrypted_data': encrypted_data,
-                'encryption_keys': encryption_keys,
+                'encryption_keys': list(layer_keys),
                 'layers': self.encryption_layers,
                 'security_level': security_level,
                 'timestamp': datetime.now().isoformat(),
@@ -79,14 +751,8 @@ class QuantumEncryptionGrid:
             encryption_keys = encrypted_package['encryption_keys']
             
             # Reverse encryption layers
-            for layer in reversed(range(len(encryption_keys))):
-                key = encryption_keys[layer]
-                iv = encrypted_data[:16]
-                ciphertext = encrypted_data[16:]
-                
-                cipher = AES.new(key, AES.MODE_CBC, iv)
-                decrypted_data = unpad(cipher.decrypt(ciphertext), AES.block_size)
-                encrypted_data = decrypted_data
+            for key in reversed(encryption_keys):
+                encrypted_data = self._decrypt_layer(key, encrypted_data)
             
             return {
                 'decrypted_data': encrypted_data.decode('utf-8'),
@@ -102,12 +768,467 @@ class QuantumEncryptionGrid:
                 'data_protected': True
             }
     
+    def quantum_encrypt_stream(self, reader, writer, security_level="maximum", chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Multi-layer encryption from a binary reader to a writer in fixed-size chunks
+        Output is byte-compatible with quantum_encrypt; memory stays O(chunk_size)
+        """
+        try:
+            layer_keys, _ = self._layer_schedule()
+            start = time.perf_counter()
+            bytes_in, bytes_out = _run_stream_pipeline(
+                [_EncryptingLayer(key) for key in layer_keys], reader, writer, chunk_size)
+            elapsed = time.perf_counter() - start
+            
+            return {
+                'status': 'stream_encrypted',
+                'bytes_in': bytes_in,
+                'bytes_out': bytes_out,
+                'mb_per_sec': bytes_in / elapsed / 1e6 if elapsed else 0.0,
+                'encryption_keys': list(layer_keys),
+                'layers': len(layer_keys),
+                'security_level': security_level,
+                'timestamp': datetime.now().isoformat(),
+                'copyright': self.copyright
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'encryption_error',
+                'error': str(e),
+                'fallback_active': True
+            }
+    
+    def quantum_decrypt_stream(self, reader, writer, encryption_keys, chunk_size=STREAM_CHUNK_SIZE):
+        """Streaming inverse of quantum_encrypt_stream; writes raw bytes"""
+        try:
+            start = time.perf_counter()
+            bytes_in, bytes_out = _run_stream_pipeline(
+                [_DecryptingLayer(key) for key in reversed(encryption_keys)], reader, writer, chunk_size)
+            elapsed = time.perf_counter() - start
+            
+            return {
+                'status': 'stream_decrypted',
+                'bytes_in': bytes_in,
+                'bytes_out': bytes_out,
+                'mb_per_sec': bytes_out / elapsed / 1e6 if elapsed else 0.0,
+                'timestamp': datetime.now().isoformat(),
+                'copyright': self.copyright
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'decryption_error',
+                'error': str(e),
+                'data_protected': True
+            }
+    
+    def quantum_encrypt_parallel(self, reader, writer, security_level="maximum", workers=None,
+                                 chunk_size=PARALLEL_CHUNK_SIZE, max_in_flight=None, executor='thread'):
+        """
+        Encrypt a stream into the chunked container across a worker pool
+        Chunks carry their own IVs, so they encrypt independently and are
+        written back in order; memory is bounded by max_in_flight chunks
+        """
+        try:
+            layer_keys, _ = self._layer_schedule()
+            layer_keys = tuple(layer_keys)
+            mac_key = _container_mac_key(layer_keys)
+            workers = (os.cpu_count() or 1) if workers is None else workers
+            start = time.perf_counter()
+            header = _new_container_header(chunk_size, len(layer_keys))
+            writer.write(header)
+            bytes_out = len(header)
+            chunks = 0
+            bytes_in = 0
+            
+            def plaintext_chunks():
+                nonlocal bytes_in
+                for chunk in _read_chunks(reader, chunk_size):
+                    bytes_in += len(chunk)
+                    yield chunk
+            
+            for encrypted, tag in _ordered_map(_seal_container_chunk, (layer_keys, mac_key, header),
+                                               enumerate(plaintext_chunks()), workers, max_in_flight, executor):
+                writer.write(CHUNK_LENGTH.pack(len(encrypted)))
+                writer.write(encrypted)
+                writer.write(tag)
+                bytes_out += CHUNK_LENGTH.size + len(encrypted) + len(tag)
+                chunks += 1
+            trailer = _container_trailer(mac_key, header, chunks)
+            writer.write(trailer)
+            bytes_out += len(trailer)
+            elapsed = time.perf_counter() - start
+            
+            return {
+                'status': 'parallel_encrypted',
+                'bytes_in': bytes_in,
+                'bytes_out': bytes_out,
+                'chunks': chunks,
+                'workers': workers,
+                'mb_per_sec': bytes_in / elapsed / 1e6 if elapsed else 0.0,
+                'encryption_keys': list(layer_keys),
+                'layers': len(layer_keys),
+                'security_level': security_level,
+                'timestamp': datetime.now().isoformat(),
+                'copyright': self.copyright
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'encryption_error',
+                'error': str(e),
+                'fallback_active': True
+            }
+    
+    def quantum_decrypt_parallel(self, reader, writer, encryption_keys, workers=None,
+                                 max_in_flight=None, executor='thread'):
+        """Decrypt a chunked container across a worker pool, writing chunks in order"""
+        try:
+            encryption_keys = tuple(encryption_keys)
+            workers = (os.cpu_count() or 1) if workers is None else workers
+            start = time.perf_counter()
+            bytes_out = 0
+            chunks = 0
+            mac_key = _container_mac_key(encryption_keys)
+            header = _read_exact(reader, CHUNKED_HEADER.size)
+            chunks_in = _read_container_chunks(reader, header, encryption_keys, mac_key)
+            for decrypted in _ordered_map(_open_container_chunk, (encryption_keys, mac_key, header, _decrypt_chunk),
+                                          chunks_in, workers, max_in_flight, executor):
+                writer.write(decrypted)
+                bytes_out += len(decrypted)
+                chunks += 1
+            elapsed = time.perf_counter() - start
+            
+            return {
+                'status': 'parallel_decrypted',
+                'bytes_out': bytes_out,
+                'chunks': chunks,
+                'workers': workers,
+                'mb_per_sec': bytes_out / elapsed / 1e6 if elapsed else 0.0,
+                'timestamp': datetime.now().isoformat(),
+                'copyright': self.copyright
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'decryption_error',
+                'error': str(e),
+                'data_protected': True
+            }
+    
+    def encrypt_file(self, src, dst, security_level="maximum", workers=None,
+                     chunk_size=PARALLEL_CHUNK_SIZE, max_in_flight=None):
+        """
+        Encrypt a file into the chunked container without reading it into bytes
+        The source is memory-mapped and its slices go straight to the
+        chunk engine on a thread pool, which shares the mapping
+        """
+        try:
+            layer_keys, _ = self._layer_schedule()
+            layer_keys = tuple(layer_keys)
+            mac_key = _container_mac_key(layer_keys)
+            workers = (os.cpu_count() or 1) if workers is None else workers
+            start = time.perf_counter()
+            header = _new_container_header(chunk_size, len(layer_keys))
+            _check_distinct_files(src, dst)
+            with _mapped_file(src) as view, _replacing_file(dst) as writer, _issued_views() as issued:
+                bytes_out = writer.write(header)
+                chunks = 0
+
+                def slices():
+                    for offset in range(0, len(view), chunk_size):
+                        issued.append(view[offset:offset + chunk_size])
+                        yield issued[-1]
+
+                # Closing the results shuts the pool down before the slices are released
+                with closing(_ordered_map(_seal_container_chunk, (layer_keys, mac_key, header),
+                                          enumerate(slices()), workers, max_in_flight, 'thread')) as results:
+                    for encrypted, tag in results:
+                        issued.popleft().release()
+                        bytes_out += writer.write(CHUNK_LENGTH.pack(len(encrypted)))
+                        bytes_out += writer.write(encrypted)
+                        bytes_out += writer.write(tag)
+                        chunks += 1
+                bytes_out += writer.write(_container_trailer(mac_key, header, chunks))
+                bytes_in = len(view)
+            elapsed = time.perf_counter() - start
+            
+            return {
+                'status': 'file_encrypted',
+                'source': src,
+                'destination': dst,
+                'bytes_in': bytes_in,
+                'bytes_out': bytes_out,
+                'chunks': chunks,
+                'workers': workers,
+                'mb_per_sec': bytes_in / elapsed / 1e6 if elapsed else 0.0,
+                'encryption_keys': list(layer_keys),
+                'layers': len(layer_keys),
+                'security_level': security_level,
+                'timestamp': datetime.now().isoformat(),
+                'copyright': self.copyright
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'encryption_error',
+                'error': str(e),
+                'fallback_active': True
+            }
+    
+    def decrypt_file(self, src, dst, encryption_keys, workers=None, max_in_flight=None):
+        """Decrypt a chunked container file through a memory mapping"""
+        try:
+            encryption_keys = tuple(encryption_keys)
+            workers = (os.cpu_count() or 1) if workers is None else workers
+            start = time.perf_counter()
+            mac_key = _container_mac_key(encryption_keys)
+            _check_distinct_files(src, dst)
+            with _mapped_file(src) as view, _replacing_file(dst) as writer, _issued_views() as issued:
+                bytes_out = 0
+                chunks = 0
+                context = (encryption_keys, mac_key, bytes(view[:CHUNKED_HEADER.size]), _decrypt_chunk_view)
+
+                def chunk_views():
+                    for index, chunk, tag in _container_chunk_views(view, encryption_keys, mac_key):
+                        issued.append(chunk)
+                        yield index, chunk, tag
+
+                with closing(_ordered_map(_open_container_chunk, context, chunk_views(),
+                                          workers, max_in_flight, 'thread')) as results:
+                    for decrypted in results:
+                        issued.popleft().release()
+                        bytes_out += writer.write(decrypted)
+                        chunks += 1
+            elapsed = time.perf_counter() - start
+            
+            return {
+                'status': 'file_decrypted',
+                'source': src,
+                'destination': dst,
+                'bytes_out': bytes_out,
+                'chunks': chunks,
+                'workers': workers,
+                'mb_per_sec': bytes_out / elapsed / 1e6 if elapsed else 0.0,
+                'timestamp': datetime.now().isoformat(),
+                'copyright': self.copyright
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'decryption_error',
+                'error': str(e),
+                'data_protected': True
+            }
+    
+    def _schedule_for(self, key_id, layers=None):
+        """Cached layer schedule for any key id the store holds"""
+        try:
+            return self.key_store.layer_schedule(key_id or self.key_id, layers or self.encryption_layers)
+        except KeyError as e:
+            raise ValueError(e.args[0]) from None
+    
+    def quantum_encrypt_many(self, records, security_level="maximum"):
+        """
+        Encrypt many small records in one call
+        Each record gets the same per-record ciphertext as quantum_encrypt,
+        written into one contiguous buffer; record i spans
+        offsets[i]:offsets[i + 1]. Key setup and timestamping happen once
+        per batch, and groups of equal-length records share cipher calls
+        """
+        try:
+            records = [record.encode('utf-8') if isinstance(record, str) else record for record in records]
+            key_id, layer_keys, layer_ciphers = self._active_schedule()
+            layers = len(layer_keys)
+            
+            offsets = array('Q', [0])
+            for record in records:
+                offsets.append(offsets[-1] + _layered_length(len(record), layers))
+            output = bytearray(offsets[-1])
+            target = memoryview(output)
+            
+            groups = defaultdict(list)
+            for index, record in enumerate(records):
+                groups[len(record) // BLOCK_SIZE + 1].append(index)
+            for blocks, indexes in groups.items():
+                if len(indexes) < COLUMNAR_MIN_RECORDS or blocks > COLUMNAR_MAX_BLOCKS:
+                    for index in indexes:
+                        target[offsets[index]:offsets[index + 1]] = _encrypt_chunk(layer_keys, records[index])
+                    continue
+                count = len(indexes)
+                rows = b''.join([pad(records[index], BLOCK_SIZE) for index in indexes])
+                columns, final_blocks = _encrypt_columns(
+                    layer_ciphers, _to_columns(rows, blocks, count), count, blocks)
+                rows = memoryview(_to_rows(columns, final_blocks, count))
+                length = final_blocks * BLOCK_SIZE
+                for position, index in enumerate(indexes):
+                    target[offsets[index]:offsets[index + 1]] = rows[position * length:(position + 1) * length]
+            
+            return {
+                'status': 'encryption_successful',
+                'records': len(records),
+                'encrypted_buffer': output,
+                'offsets': offsets,
+                'key_id': key_id.hex(),
+                'layers': layers,
+                'security_level': security_level,
+                'timestamp': datetime.now().isoformat(),
+                'copyright': self.copyright
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'encryption_error',
+                'error': str(e),
+                'fallback_active': True
+            }
+    
+    def quantum_decrypt_many(self, encrypted_buffer, offsets, key_id=None):
+        """Decrypt a quantum_encrypt_many buffer into a contiguous plaintext buffer plus offsets"""
+        try:
+            if isinstance(key_id, str):
+                key_id = bytes.fromhex(key_id)
+            layer_keys, layer_ciphers = self._schedule_for(key_id)
+            ecb_ciphers = layer_ciphers[::-1]
+            source = memoryview(encrypted_buffer)
+            record_count = len(offsets) - 1
+            minimum_length = _layered_length(0, len(layer_keys))
+            
+            plaintexts = [b''] * record_count
+            groups = defaultdict(list)
+            for index in range(record_count):
+                length = offsets[index + 1] - offsets[index]
+                if length < minimum_length or length % BLOCK_SIZE:
+                    raise ValueError(f"Record {index} has an invalid ciphertext length")
+                groups[length // BLOCK_SIZE].append(index)
+            for blocks, indexes in groups.items():
+                if len(indexes) < COLUMNAR_MIN_RECORDS or blocks > COLUMNAR_MAX_BLOCKS:
+                    for index in indexes:
+                        plaintexts[index] = _decrypt_chunk_view(layer_keys, source[offsets[index]:offsets[index + 1]])
+                    continue
+                count = len(indexes)
+                rows = b''.join([source[offsets[index]:offsets[index + 1]] for index in indexes])
+                columns, final_blocks = _decrypt_columns(
+                    ecb_ciphers, _to_columns(rows, blocks, count), count, blocks)
+                rows = memoryview(_to_rows(columns, final_blocks, count))
+                length = final_blocks * BLOCK_SIZE
+                for position, index in enumerate(indexes):
+                    plaintexts[index] = unpad(rows[position * length:(position + 1) * length], BLOCK_SIZE)
+            
+            decrypted_offsets = array('Q', [0])
+            for plaintext in plaintexts:
+                decrypted_offsets.append(decrypted_offsets[-1] + len(plaintext))
+            
+            return {
+                'status': 'decryption_successful',
+                'records': record_count,
+                'decrypted_buffer': b''.join(plaintexts),
+                'offsets': decrypted_offsets,
+                'timestamp': datetime.now().isoformat(),
+                'copyright': self.copyright
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'decryption_error',
+                'error': str(e),
+                'data_protected': True
+            }
+    
+    def seal_envelope(self, data, chunk_size=PARALLEL_CHUNK_SIZE, workers=1, security_level="maximum"):
+        """
+        Encrypt bytes into a binary envelope that references the grid key by id
+        security_level "maximum" stacks the CBC layers; "aead" is a single
+        AES-GCM pass that authenticates the envelope header and chunk order
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        profile = SECURITY_PROFILES.get(security_level)
+        if profile is None:
+            raise ValueError(f"Unknown security level {security_level!r}")
+        key_id, layer_keys, _ = self._active_schedule()
+        view = memoryview(data)
+        slices = [view[offset:offset + chunk_size] for offset in range(0, len(view), chunk_size)] or [view]
+        
+        if profile == PROFILE_AES_GCM:
+            overhead = GCM_NONCE_SIZE + GCM_TAG_SIZE
+            header = _envelope_header(key_id, 1, [len(chunk) + overhead for chunk in slices], profile)
+            encrypted_chunks = _ordered_map(_gcm_encrypt_chunk, (self.key_store.aead_key(key_id), header),
+                                            enumerate(slices), workers, None, 'thread')
+            return b''.join([header, *encrypted_chunks])
+        
+        encrypted_chunks = list(_ordered_map(_encrypt_chunk, tuple(layer_keys), slices, workers, None, 'thread'))
+        return build_envelope(key_id, len(layer_keys), encrypted_chunks)
+    
+    def open_envelope(self, envelope, workers=1):
+        """Decrypt an envelope of either profile sealed under any key this grid's store holds"""
+        if not isinstance(envelope, QuantumEnvelope):
+            envelope = QuantumEnvelope.parse(envelope)
+        if envelope.profile == PROFILE_AES_GCM:
+            try:
+                key = self.key_store.aead_key(envelope.key_id)
+            except KeyError as e:
+                raise ValueError(e.args[0]) from None
+            return b''.join(_ordered_map(_gcm_decrypt_chunk, (key, envelope.header),
+                                         enumerate(envelope.chunks()), workers, None, 'thread'))
+        if envelope.profile != PROFILE_LAYERED_CBC:
+            raise ValueError(f"Unsupported envelope profile {envelope.profile}")
+        layer_keys, _ = self._schedule_for(envelope.key_id, envelope.layers)
+        return b''.join(_ordered_map(_decrypt_chunk_view, layer_keys, envelope.chunks(), workers, None, 'thread'))
+    
+    def quantum_encrypt_wire(self, data, security_level="maximum"):
+        """Envelope encryption in its URL-safe base64 wire form, for JSON APIs"""
+        try:
+            envelope = self.seal_envelope(data, security_level=security_level)
+            parsed = QuantumEnvelope.parse(envelope)
+            
+            return {
+                'status': 'encryption_successful',
+                'envelope': encode_envelope_wire(envelope),
+                'envelope_bytes': len(envelope),
+                'key_id': parsed.key_id.hex(),
+                'layers': parsed.layers,
+                'security_level': security_level,
+                'timestamp': datetime.now().isoformat(),
+                'copyright': self.copyright
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'encryption_error',
+                'error': str(e),
+                'fallback_active': True
+            }
+    
+    def quantum_decrypt_wire(self, wire_envelope):
+        """Decrypt the wire form produced by quantum_encrypt_wire"""
+        try:
+            decrypted_data = self.open_envelope(decode_envelope_wire(wire_envelope))
+            
+            return {
+                'decrypted_data': decrypted_data.decode('utf-8'),
+                'status': 'decryption_successful',
+                'timestamp': datetime.now().isoformat(),
+                'copyright': self.copyright
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'decryption_error',
+                'error': str(e),
+                'data_protected': True
+            }
+    
     def get_encryption_status(self):
         """Get quantum encryption grid status"""
         return {
             'encryption_grid': 'operational',
             'security_level': self.security_level,
             'encryption_layers': self.encryption_layers,
+            'key_epoch': self.key_epoch,
+            'key_id': self.key_id.hex(),
+            'stored_keys': len(self.key_store),
             'quantum_protection': True,
             'blocked_entities': self.blocked_entities,
             'timestamp': datetime.now().isoformat(),
@@ -115,5 +1236,90 @@ class QuantumEncryptionGrid:
             'contact': self.contact
         }
 
-# Initialize global quantum encryption
-quantum_encryption = QuantumEncryptionGrid()
\ No newline at end of file
+
+class AsyncQuantumEncryptionGrid:
+    """
+    Awaitable facade over a QuantumEncryptionGrid for asyncio services
+    Payloads up to inline_limit bytes are cheaper to run on the event loop
+    than to hand off; larger ones run in an executor (threads by default,
+    as pycryptodome releases the GIL) so one big payload never stalls
+    other requests. A semaphore bounds offloaded work and the wait queue
+    in front of it is exposed as metrics
+    """
+    
+    def __init__(self, grid=None, inline_limit=ASYNC_INLINE_LIMIT, max_concurrency=None, executor=None):
+        self.grid = grid or quantum_encryption
+        self.copyright = self.grid.copyright
+        self.inline_limit = inline_limit
+        self.max_concurrency = max_concurrency or (os.cpu_count() or 1) * 2
+        self.executor = executor
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.queue_depth = 0
+        self.peak_queue_depth = 0
+        self.running = 0
+        self.inline_calls = 0
+        self.offloaded_calls = 0
+        self.queue_wait_seconds = 0.0
+    
+    async def _run(self, size, function, *args, **kwargs):
+        if size <= self.inline_limit:
+            self.inline_calls += 1
+            return function(*args, **kwargs)
+        
+        self.queue_depth += 1
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        queued_at = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+        self.queue_wait_seconds += time.perf_counter() - queued_at
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+        finally:
+            self.running -= 1
+            self.offloaded_calls += 1
+            self._semaphore.release()
+    
+    async def encrypt(self, data, security_level="maximum"):
+        return await self._run(_payload_size(data), self.grid.quantum_encrypt, data, security_level)
+    
+    async def decrypt(self, encrypted_package):
+        size = len(encrypted_package.get('encrypted_data', b''))
+        return await self._run(size, self.grid.quantum_decrypt, encrypted_package)
+    
+    async def encrypt_wire(self, data, security_level="maximum"):
+        return await self._run(_payload_size(data), self.grid.quantum_encrypt_wire, data, security_level)
+    
+    async def decrypt_wire(self, wire_envelope):
+        return await self._run(len(wire_envelope), self.grid.quantum_decrypt_wire, wire_envelope)
+    
+    async def encrypt_many(self, records, security_level="maximum"):
+        records = list(records)
+        return await self._run(sum(_payload_size(record) for record in records),
+                               self.grid.quantum_encrypt_many, records, security_level)
+    
+    async def decrypt_many(self, encrypted_buffer, offsets, key_id=None):
+        return await self._run(len(encrypted_buffer), self.grid.quantum_decrypt_many,
+                               encrypted_buffer, offsets, key_id)
+    
+    def get_async_status(self):
+        """Queue-depth and offload metrics"""
+        return {
+            'async_grid': 'operational',
+            'queue_depth': self.queue_depth,
+            'peak_queue_depth': self.peak_queue_depth,
+            'running': self.running,
+            'max_concurrency': self.max_concurrency,
+            'inline_limit': self.inline_limit,
+            'inline_calls': self.inline_calls,
+            'offloaded_calls': self.offloaded_calls,
+            'mean_queue_wait_ms': self.queue_wait_seconds / self.offloaded_calls * 1e3 if self.offloaded_calls else 0.0,
+            'timestamp': datetime.now().isoformat(),
+            'copyright': self.copyright
+        }
+
+# Initialize global quantum encryption on the shared key store
+quantum_encryption = QuantumEncryptionGrid(quantum_key_store)
\ No newline at end of file
@@ -0,0 +1,312 @@
+# Quantum Key Store - Key IDs, Wrapped Keys and Layer Schedule Cache
+# Copyright (c) 2025 Ervin Remus Radosavlevici
+# Contact: radosavlevici210@icloud.com
+# BLOCKED: replit-agent, radosavlevici21, main-branch-thieves
+
+import os
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from Crypto.Cipher import AES
+from Crypto.Random import get_random_bytes
+
+KEY_ID_SIZE = 8
+MASTER_KEY_SIZE = 32
+WRAP_NONCE_SIZE = 12
+WRAP_TAG_SIZE = 16
+SCHEDULE_CACHE_SIZE = 128
+# Seconds between checks for a key rotated by another process sharing the store
+ACTIVE_KEY_POLL_INTERVAL = 1.0
+# Default store in the Flask instance folder, with its master key one level up beside it
+INSTANCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "instance")
+DEFAULT_KEY_STORE = os.path.join(INSTANCE_PATH, "quantum_keys.db")
+DEFAULT_MASTER_KEY_FILE = os.path.join(os.path.dirname(INSTANCE_PATH), "quantum_master.key")
+
+
+def generate_quantum_key():
+    """Generate quantum-safe encryption key"""
+    timestamp = str(time.time()).encode()
+    random_data = get_random_bytes(64)
+    system_entropy = os.urandom(32)
+
+    key_material = timestamp + random_data + system_entropy
+    return hashlib.sha256(key_material).digest()
+
+
+def quantum_key_id(quantum_key):
+    """Public reference to a grid key, carried by envelopes instead of the layer keys"""
+    return hashlib.sha256(b"QEG key id|" + quantum_key).digest()[:KEY_ID_SIZE]
+
+
+def master_key_id(master_key):
+    return hashlib.sha256(b"QEG master id|" + master_key).digest()[:KEY_ID_SIZE]
+
+
+def derive_layer_keys(quantum_key, layers):
+    return [hashlib.sha256(quantum_key + str(layer).encode()).digest()[:16] for layer in range(layers)]
+
+
+def derive_aead_key(quantum_key):
+    return hashlib.sha256(b"QEG aead|" + quantum_key).digest()
+
+
+def _wrap_key(master_key, key_id, quantum_key):
+    """AES-GCM wrap bound to the key id: nonce + ciphertext + tag"""
+    cipher = AES.new(master_key, AES.MODE_GCM, nonce=get_random_bytes(WRAP_NONCE_SIZE))
+    cipher.update(key_id)
+    ciphertext, tag = cipher.encrypt_and_digest(quantum_key)
+    return cipher.nonce + ciphertext + tag
+
+
+def _unwrap_key(master_key, key_id, wrapped_key):
+    cipher = AES.new(master_key, AES.MODE_GCM, nonce=wrapped_key[:WRAP_NONCE_SIZE])
+    cipher.update(key_id)
+    return cipher.decrypt_and_verify(wrapped_key[WRAP_NONCE_SIZE:-WRAP_TAG_SIZE], wrapped_key[-WRAP_TAG_SIZE:])
+
+
+class QuantumKeyStore:
+    """
+    Quantum keys addressed by key id, stored wrapped under a master key
+    Rotating the data key or the master key touches key rows only, never
+    ciphertext: old data keeps decrypting under its own key id, and keys
+    wrapped under a retired master are re-wrapped the next time they are
+    unwrapped. Derived layer schedules are kept in an LRU per key id.
+    The active key is the row without retired_at, so a rotation by any
+    process sharing the database is seen by the others within
+    active_key_poll_interval seconds
+    """
+
+    def __init__(self, db_path=':memory:', master_key=None, previous_master_keys=(),
+                 schedule_cache_size=SCHEDULE_CACHE_SIZE, active_key_poll_interval=ACTIVE_KEY_POLL_INTERVAL):
+        self.db_path = db_path
+        self.copyright = "© 2025 Ervin Remus Radosavlevici"
+        self.master_key = master_key or get_random_bytes(MASTER_KEY_SIZE)
+        self.master_id = master_key_id(self.master_key)
+        self._master_keys = {master_key_id(key): key for key in previous_master_keys}
+        self._master_keys[self.master_id] = self.master_key
+        self.schedule_cache_size = schedule_cache_size
+        self._keys = {}
+        self._aead_keys = {}
+        self._schedules = OrderedDict()
+        self.schedule_hits = 0
+        self.schedule_misses = 0
+        self.rewrapped_keys = 0
+        self.active_key_poll_interval = active_key_poll_interval
+        self._data_version = None
+        self._polled_at = time.monotonic()
+        self._lock = threading.RLock()
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        if db_path != ':memory:':
+            self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS quantum_keys (
+                key_id BLOB PRIMARY KEY,
+                master_id BLOB NOT NULL,
+                wrapped_key BLOB NOT NULL,
+                created_at TEXT NOT NULL,
+                activated_at TEXT NOT NULL,
+                retired_at TEXT
+            ) WITHOUT ROWID
+        ''')
+        self.conn.commit()
+
+        self._active_key_id = self._load_active_key_id() or self.rotate()
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM quantum_keys').fetchone()[0]
+
+    def _load_active_key_id(self):
+        row = self.conn.execute('''
+            SELECT key_id FROM quantum_keys WHERE retired_at IS NULL
+            ORDER BY activated_at DESC LIMIT 1
+        ''').fetchone()
+        return row[0] if row else None
+
+    @property
+    def active_key_id(self):
+        """Id of the active key, re-read when another connection has committed since the last poll"""
+        if self.db_path != ':memory:' and time.monotonic() - self._polled_at >= self.active_key_poll_interval:
+            with self._lock:
+                self._polled_at = time.monotonic()
+                data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+                if data_version != self._data_version:
+                    self._data_version = data_version
+                    self._active_key_id = self._load_active_key_id() or self._active_key_id
+        return self._active_key_id
+
+    def add_key(self, quantum_key, activate=True):
+        """Store a key (idempotent) and optionally make it the active key; returns its key id"""
+        key_id = quantum_key_id(quantum_key)
+        now = datetime.now().isoformat()
+        with self._lock, self.conn:
+            self.conn.execute('''
+                INSERT OR IGNORE INTO quantum_keys (key_id, master_id, wrapped_key, created_at, activated_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (key_id, self.master_id, _wrap_key(self.master_key, key_id, quantum_key), now, now))
+            self._keys[key_id] = quantum_key
+            if activate:
+                self.conn.execute('UPDATE quantum_keys SET retired_at = ? WHERE retired_at IS NULL AND key_id != ?',
+                                  (now, key_id))
+                self.conn.execute('UPDATE quantum_keys SET retired_at = NULL, activated_at = ? WHERE key_id = ?',
+                                  (now, key_id))
+                self._active_key_id = key_id
+        return key_id
+
+    def rotate(self):
+        """Activate a fresh key; existing keys stay available for decryption"""
+        return self.add_key(generate_quantum_key())
+
+    def rotate_master(self, new_master_key):
+        """
+        Switch to a new master key in O(1)
+        The old master is kept for unwrapping; each key is re-wrapped lazily
+        when next unwrapped, or all at once with rewrap_all()
+        """
+        with self._lock:
+            self.master_key = new_master_key
+            self.master_id = master_key_id(new_master_key)
+            self._master_keys[self.master_id] = new_master_key
+            # Cached schedules stay valid; only the unwrapped keys are dropped so they re-wrap on next unwrap
+            self._keys.clear()
+        return self.master_id
+
+    def rewrap_all(self):
+        """Re-wrap every key still under a previous master: O(keys), no ciphertext touched"""
+        with self._lock:
+            stale = [row[0] for row in self.conn.execute(
+                'SELECT key_id FROM quantum_keys WHERE master_id != ?', (self.master_id,))]
+            for key_id in stale:
+                self._keys.pop(key_id, None)
+                self.get_key(key_id)
+        return len(stale)
+
+    def get_key(self, key_id):
+        """Unwrapped key for a key id; raises KeyError if the store has never held it"""
+        key = self._keys.get(key_id)
+        if key is not None:
+            return key
+        with self._lock:
+            row = self.conn.execute('SELECT master_id, wrapped_key FROM quantum_keys WHERE key_id = ?',
+                                    (key_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"Unknown key id {key_id.hex()}")
+            master_id, wrapped_key = row
+            master_key = self._master_keys.get(master_id)
+            if master_key is None:
+                raise KeyError(f"Key {key_id.hex()} is wrapped under unavailable master {master_id.hex()}")
+            key = _unwrap_key(master_key, key_id, wrapped_key)
+            if master_id != self.master_id:
+                with self.conn:
+                    self.conn.execute('UPDATE quantum_keys SET master_id = ?, wrapped_key = ? WHERE key_id = ?',
+                                      (self.master_id, _wrap_key(self.master_key, key_id, key), key_id))
+                self.rewrapped_keys += 1
+            self._keys[key_id] = key
+            return key
+
+    def layer_schedule(self, key_id, layers):
+        """(layer keys, ECB contexts) for a key id, derived once and kept in an LRU"""
+        with self._lock:
+            schedule = self._schedules.get((key_id, layers))
+            if schedule is not None:
+                self._schedules.move_to_end((key_id, layers))
+                self.schedule_hits += 1
+                return schedule
+            self.schedule_misses += 1
+            layer_keys = tuple(derive_layer_keys(self.get_key(key_id), layers))
+            schedule = (layer_keys, tuple(AES.new(key, AES.MODE_ECB) for key in layer_keys))
+            if self.schedule_cache_size > 0:
+                self._schedules[(key_id, layers)] = schedule
+                if len(self._schedules) > self.schedule_cache_size:
+                    self._schedules.popitem(last=False)
+            return schedule
+
+    def aead_key(self, key_id):
+        """AES-256 key of the single-layer AEAD profile, derived once per key id"""
+        key = self._aead_keys.get(key_id)
+        if key is None:
+            key = self._aead_keys[key_id] = derive_aead_key(self.get_key(key_id))
+        return key
+
+    def get_key_store_status(self):
+        with self._lock:
+            keys = len(self)
+            stale_wraps = self.conn.execute('SELECT COUNT(*) FROM quantum_keys WHERE master_id != ?',
+                                            (self.master_id,)).fetchone()[0]
+        return {
+            'key_store': 'operational',
+            'keys': keys,
+            'active_key_id': self.active_key_id.hex(),
+            'master_id': self.master_id.hex(),
+            'stale_wraps': stale_wraps,
+            'rewrapped_keys': self.rewrapped_keys,
+            'cached_schedules': len(self._schedules),
+            'schedule_hits': self.schedule_hits,
+            'schedule_misses': self.schedule_misses,
+            'timestamp': datetime.now().isoformat(),
+            'copyright': self.copyright
+        }
+
+
+def _load_master_key(path):
+    """Read the master key file, creating it owner-only on first use"""
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path, 'rb') as f:
+            master_key = f.read()
+    else:
+        with os.fdopen(fd, 'wb') as f:
+            master_key = get_random_bytes(MASTER_KEY_SIZE)
+            f.write(master_key)
+    if len(master_key) != MASTER_KEY_SIZE:
+        raise ValueError(f"Master key file {path} must hold {MASTER_KEY_SIZE} bytes")
+    return master_key
+
+
+def _key_store_from_environment():
+    """
+    Shared key store for this deployment
+    QUANTUM_KEY_STORE: database path; unset means DEFAULT_KEY_STORE in the
+    instance folder, ":memory:" a private store whose keys are lost on exit
+    QUANTUM_MASTER_KEY: hex master key, or QUANTUM_MASTER_KEY_FILE: master key
+    file outside the store's directory; one is required with an explicit
+    QUANTUM_KEY_STORE, the default store falls back to DEFAULT_MASTER_KEY_FILE
+    QUANTUM_PREVIOUS_MASTER_KEYS: comma-separated hex masters still accepted for unwrapping
+    A misconfigured store raises rather than silently falling back
+    """
+    db_path = os.environ.get("QUANTUM_KEY_STORE")
+    if db_path == ':memory:':
+        logging.warning("QUANTUM_KEY_STORE is :memory:: quantum keys are private to this process and lost on exit")
+        return QuantumKeyStore()
+
+    master_hex = os.environ.get("QUANTUM_MASTER_KEY")
+    key_file = os.environ.get("QUANTUM_MASTER_KEY_FILE")
+    if not db_path:
+        # Every worker of this deployment shares the instance store, so keys outlive the process
+        os.makedirs(INSTANCE_PATH, mode=0o700, exist_ok=True)
+        db_path = DEFAULT_KEY_STORE
+        if not master_hex:
+            key_file = key_file or DEFAULT_MASTER_KEY_FILE
+    if master_hex:
+        master_key = bytes.fromhex(master_hex)
+        if len(master_key) != MASTER_KEY_SIZE:
+            raise ValueError(f"QUANTUM_MASTER_KEY must be {MASTER_KEY_SIZE * 2} hex characters")
+    elif key_file:
+        # A master key stored beside the wrapped keys protects nothing
+        if os.path.dirname(os.path.abspath(key_file)) == os.path.dirname(os.path.abspath(db_path)):
+            raise ValueError("QUANTUM_MASTER_KEY_FILE must not be in the key store's directory")
+        master_key = _load_master_key(key_file)
+    else:
+        raise RuntimeError("QUANTUM_KEY_STORE requires QUANTUM_MASTER_KEY or QUANTUM_MASTER_KEY_FILE")
+    previous = [bytes.fromhex(value) for value in
+                os.environ.get("QUANTUM_PREVIOUS_MASTER_KEYS", "").split(",") if value.strip()]
+    return QuantumKeyStore(db_path, master_key, previous)
+
+
+# Initialize global quantum key store
+quantum_key_store = _key_store_from_environment()
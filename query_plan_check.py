@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Quantum Security System - Query Plan Check
+Copyright © 2025 Ervin Remus Radosavlevici
+Official Owner: Ervin Remus Radosavlevici
+Contact: radosavlevici210@icloud.com
+Official Timestamp: 2025-01-20 12:00:00 UTC
+Private and Public Repository Rights Reserved
+Licensed under MIT License with additional copyright protections
+All rights reserved.
+"""
+
+import sys
+from datetime import datetime
+from app import app, db
+from models import SecurityLog, ThreatDetection
+
+# Placeholder cursor and filter values; the plan does not depend on them
+SAMPLE_TIME = datetime(2025, 1, 20, 12, 0, 0)
+SAMPLE_ID = 1000
+# Queries that walk an index rather than search it, and why that is bounded
+INDEX_WALKS = {
+    'index_recent_logs': "newest-first walk that stops at its LIMIT",
+    'monitoring_recent_threats': "newest-first walk that stops at its LIMIT",
+    'stats_event_types': "GROUP BY over a covering index, run once per dashboard stats TTL",
+    'stats_threat_severities': "GROUP BY over a covering index, run once per dashboard stats TTL",
+    'export_logs': "unfiltered export streams every row by design, in index order",
+    'export_threats': "unfiltered export streams every row by design, in index order",
+}
+
+
+def dashboard_queries():
+    """The dashboard, list and export queries issued by routes, by name"""
+    return {
+        'index_recent_logs': db.select(SecurityLog).order_by(SecurityLog.timestamp.desc()).limit(10),
+        'index_recent_threats': db.select(ThreatDetection).filter_by(resolved=False)
+            .order_by(ThreatDetection.detected_at.desc()).limit(5),
+        'monitoring_recent_threats': db.select(ThreatDetection)
+            .order_by(ThreatDetection.detected_at.desc()).limit(10),
+        'stats_event_types': db.select(SecurityLog.event_type, db.func.count(SecurityLog.id))
+            .group_by(SecurityLog.event_type),
+        'stats_threat_severities': db.select(
+            ThreatDetection.severity, ThreatDetection.resolved, db.func.count(ThreatDetection.id)
+        ).group_by(ThreatDetection.severity, ThreatDetection.resolved),
+        'logs_keyset_page': db.select(SecurityLog)
+            .where(db.tuple_(SecurityLog.timestamp, SecurityLog.id) < (SAMPLE_TIME, SAMPLE_ID))
+            .order_by(SecurityLog.timestamp.desc(), SecurityLog.id.desc()).limit(21),
+        'threats_keyset_page': db.select(ThreatDetection)
+            .where(db.tuple_(ThreatDetection.detected_at, ThreatDetection.id) < (SAMPLE_TIME, SAMPLE_ID))
+            .order_by(ThreatDetection.detected_at.desc(), ThreatDetection.id.desc()).limit(21),
+        'export_logs': db.select(SecurityLog)
+            .order_by(SecurityLog.timestamp, SecurityLog.id),
+        'export_logs_since': db.select(SecurityLog)
+            .where(SecurityLog.timestamp >= SAMPLE_TIME)
+            .order_by(SecurityLog.timestamp, SecurityLog.id),
+        'export_logs_by_type': db.select(SecurityLog)
+            .where(SecurityLog.event_type == 'encryption', SecurityLog.timestamp >= SAMPLE_TIME)
+            .order_by(SecurityLog.timestamp, SecurityLog.id),
+        'export_threats': db.select(ThreatDetection)
+            .order_by(ThreatDetection.detected_at, ThreatDetection.id),
+        'export_threats_by_type': db.select(ThreatDetection)
+            .where(ThreatDetection.threat_type == 'intrusion', ThreatDetection.detected_at >= SAMPLE_TIME)
+            .order_by(ThreatDetection.detected_at, ThreatDetection.id),
+    }
+
+
+def explain(statement):
+    """Plan lines for a statement on the current database (SQLite or PostgreSQL)"""
+    dialect = db.engine.dialect
+    compiled = statement.compile(dialect=dialect)
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect.name == 'sqlite' else 'EXPLAIN '
+    if compiled.positiontup is not None:
+        parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        parameters = compiled.params
+    with db.engine.connect() as connection:
+        rows = connection.exec_driver_sql(prefix + str(compiled), parameters).fetchall()
+    return [str(row[-1]) for row in rows]
+
+
+def _full_scans(plan, walk_allowed=False):
+    """
+    Plan lines reading a table or an index without searching it
+    SQLite reports a walk of a whole index as "SCAN t USING INDEX i"; that
+    passes only for the queries listed in INDEX_WALKS
+    """
+    return [line for line in plan
+            if (line.startswith('SCAN ') and not (walk_allowed and ' INDEX ' in line)) or 'Seq Scan' in line]
+
+
+def _sorts(plan):
+    """Plan lines that sort rows before returning the first one, breaking streaming and LIMIT early exits"""
+    return [line for line in plan if 'USE TEMP B-TREE FOR' in line or line.lstrip(' ->').startswith('Sort')]
+
+
+def check_query_plans():
+    """
+    Explain every dashboard query; a query passes when it searches an index,
+    or walks one if INDEX_WALKS allows, and reads rows in the order asked for
+    """
+    report = {}
+    for name, statement in dashboard_queries().items():
+        plan = explain(statement)
+        full_scans = _full_scans(plan, walk_allowed=name in INDEX_WALKS)
+        sorts = _sorts(plan)
+        report[name] = {'plan': plan, 'full_scans': full_scans, 'sorts': sorts,
+                        'uses_index': not full_scans and not sorts}
+    return report
+
+
+def main():
+    with app.app_context():
+        report = check_query_plans()
+
+    for name, result in report.items():
+        label = 'ok' if result['uses_index'] else 'FULL SCAN' if result['full_scans'] else 'SORT'
+        print(f"[{label}] {name}")
+        for line in result['plan']:
+            print(f"    {line}")
+    failing = [name for name, result in report.items() if not result['uses_index']]
+    if failing:
+        print(f"Queries without an index, or sorting before the first row: {', '.join(failing)}")
+        print("Run 'flask --app app migrate' if the database predates the model indexes")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
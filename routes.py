@@ -10,16 +10,73 @@ Licensed under MIT License with additional copyright protections
 All rights reserved.
 """
 
-from flask import render_template, request, jsonify, flash, redirect, url_for
+from flask import render_template, request, jsonify, flash, redirect, url_for, Response, stream_with_context
 from app import app, db
 from models import SecurityLog, ThreatDetection
-from quantum_security import (
-    quantum_encryption, neural_defense, quantum_firewall, 
-    quantum_teleportation
-)
+try:
+    from quantum_security import neural_defense, quantum_firewall, quantum_teleportation
+except ImportError:
+    neural_defense = quantum_firewall = quantum_teleportation = None
+from quantum_encryption_grid import SECURITY_PROFILES, quantum_encryption as encryption_grid
+from dashboard_aggregates import AggregatesUnavailable, dashboard_aggregates
+from security_log_buffer import security_log_buffer
+import base64
+import csv
+import io
 import json
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+# Server-side cap on page sizes for the list APIs
+MAX_PER_PAGE = 200
+# Largest number of events accepted by one ingestion request
+MAX_INGEST_EVENTS = 5000
+# Rows fetched per server-side cursor round-trip, and written per response chunk, by the export API
+EXPORT_BATCH_SIZE = 1000
+# kind: (model, exported columns, time column, type filter column)
+EXPORT_SOURCES = {
+    'logs': (SecurityLog, ('id', 'event_type', 'event_data', 'result', 'timestamp'), 'timestamp', 'event_type'),
+    'threats': (ThreatDetection, ('id', 'threat_type', 'severity', 'description', 'source_ip', 'resolved',
+                                  'detected_at', 'resolved_at'), 'detected_at', 'threat_type'),
+}
+
+
+def _encode_cursor(timestamp, row_id):
+    """Opaque cursor for the (timestamp, id) position after the last row of a page"""
+    raw = json.dumps([timestamp.isoformat(), row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+
+def _keyset_page(query, time_column, id_column):
+    """
+    Newest-first page of query after the request's cursor, seeking on
+    (time_column, id_column) instead of OFFSET
+    Returns (rows, next_cursor, total); total is only counted when asked
+    for with include_total=1
+    """
+    per_page = max(1, min(request.args.get('per_page', 20, type=int), MAX_PER_PAGE))
+    total = query.order_by(None).count() if request.args.get('include_total', 0, type=int) else None
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        timestamp, row_id = _decode_cursor(cursor)
+        # Row-value comparison so the (time, id) index can seek straight to the cursor
+        query = query.filter(db.tuple_(time_column, id_column) < (timestamp, row_id))
+
+    rows = query.order_by(time_column.desc(), id_column.desc()).limit(per_page + 1).all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = _encode_cursor(getattr(rows[-1], time_column.key), getattr(rows[-1], id_column.key))
+    return rows, next_cursor, total
 
 @app.route('/')
 def index():
@@ -28,24 +85,21 @@ def index():
     recent_logs = SecurityLog.query.order_by(SecurityLog.timestamp.desc()).limit(10).all()
     recent_threats = ThreatDetection.query.filter_by(resolved=False).order_by(ThreatDetection.detected_at.desc()).limit(5).all()
 
-    # Get statistics
-    total_events = SecurityLog.query.count()
-    total_threats = ThreatDetection.query.count()
-    unresolved_threats = ThreatDetection.query.filter_by(resolved=False).count()
-
-    # Get events by type for chart
-    event_types = db.session.query(
-        SecurityLog.event_type,
-        db.func.count(SecurityLog.id).label('count')
-    ).group_by(SecurityLog.event_type).all()
+    # Get statistics from the cached aggregates
+    try:
+        stats = dashboard_aggregates.get()
+    except AggregatesUnavailable as e:
+        return str(e), 503, {'Retry-After': '1'}
 
     return render_template('index.html',
                          recent_logs=recent_logs,
                          recent_threats=recent_threats,
-                         total_events=total_events,
-                         total_threats=total_threats,
-                         unresolved_threats=unresolved_threats,
-                         event_types=event_types)
+                         total_events=stats['total_events'],
+                         total_threats=stats['total_threats'],
+                         unresolved_threats=stats['unresolved_threats'],
+                         event_types=list(stats['event_types'].items()),
+                         stats_computed_at=stats['computed_at'],
+                         stats_stale_seconds=stats['stale_seconds'])
 
 @app.route('/encryption')
 def encryption():
@@ -62,12 +116,20 @@ def api_encrypt():
         if not text_data:
             return jsonify({'error': 'No data provided for encryption'}), 400
 
-        encrypted_result = quantum_encryption.encrypt_data(text_data)
+        security_level = data.get('security_level', 'maximum')
+        if not isinstance(security_level, str) or security_level not in SECURITY_PROFILES:
+            return jsonify({'error': f"security_level must be one of: {', '.join(SECURITY_PROFILES)}"}), 400
+
+        # Binary envelope in URL-safe base64: JSON-serializable and carries a key id, not keys
+        encrypted_result = encryption_grid.quantum_encrypt_wire(text_data, security_level=security_level)
+        if encrypted_result['status'] != 'encryption_successful':
+            return jsonify({'error': encrypted_result['error']}), 500
 
         return jsonify({
             'success': True,
-            'encrypted_data': encrypted_result,
-            'watermark': quantum_encryption.get_watermark()
+            'encrypted_data': encrypted_result['envelope'],
+            'key_id': encrypted_result['key_id'],
+            'watermark': encrypted_result['copyright']
         })
 
     except Exception as e:
@@ -78,17 +140,19 @@ def api_decrypt():
     """API endpoint for decryption"""
     try:
         data = request.get_json()
-        encrypted_data = data.get('encrypted_data', {})
+        encrypted_data = data.get('encrypted_data', '')
 
         if not encrypted_data:
             return jsonify({'error': 'No encrypted data provided'}), 400
 
-        decrypted_result = quantum_encryption.decrypt_data(encrypted_data)
+        decrypted_result = encryption_grid.quantum_decrypt_wire(encrypted_data)
+        if decrypted_result['status'] != 'decryption_successful':
+            return jsonify({'error': decrypted_result['error']}), 400
 
         return jsonify({
             'success': True,
-            'decrypted_data': decrypted_result,
-            'watermark': quantum_encryption.get_watermark()
+            'decrypted_data': decrypted_result['decrypted_data'],
+            'watermark': decrypted_result['copyright']
         })
 
     except Exception as e:
@@ -102,6 +166,8 @@ def neural_defense_page():
 @app.route('/api/neural-defense', methods=['POST'])
 def api_neural_defense():
     """API endpoint for neural defense analysis"""
+    if neural_defense is None:
+        return jsonify({'error': 'Neural defense is not available'}), 503
     try:
         data = request.get_json()
         neural_data = data.get('neural_data', [])
@@ -135,6 +201,8 @@ def firewall_page():
 @app.route('/api/firewall-check', methods=['POST'])
 def api_firewall_check():
     """API endpoint for firewall packet checking"""
+    if quantum_firewall is None:
+        return jsonify({'error': 'Quantum firewall is not available'}), 503
     try:
         data = request.get_json()
         packet_data = {
@@ -168,6 +236,8 @@ def monitoring():
 @app.route('/api/quantum-teleport', methods=['POST'])
 def api_quantum_teleport():
     """API endpoint for quantum teleportation"""
+    if quantum_teleportation is None:
+        return jsonify({'error': 'Quantum teleportation is not available'}), 503
     try:
         data = request.get_json()
         quantum_data = data.get('quantum_data', '')
@@ -190,12 +260,7 @@ def api_quantum_teleport():
 def api_logs():
     """API endpoint to get security logs"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-
-        logs = SecurityLog.query.order_by(SecurityLog.timestamp.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        logs, next_cursor, total = _keyset_page(SecurityLog.query, SecurityLog.timestamp, SecurityLog.id)
 
         return jsonify({
             'logs': [{
@@ -204,25 +269,76 @@ def api_logs():
                 'event_data': log.event_data,
                 'result': log.result,
                 'timestamp': log.timestamp.isoformat()
-            } for log in logs.items],
-            'total': logs.total,
-            'pages': logs.pages,
-            'current_page': logs.page
+            } for log in logs],
+            'next_cursor': next_cursor,
+            'total': total
+        })
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _ingest_row(event):
+    """SecurityLog column dict for one posted event; raises ValueError if it is malformed"""
+    event_type = event.get('event_type') if isinstance(event, dict) else None
+    if not isinstance(event_type, str) or not event_type or len(event_type) > 50:
+        raise ValueError('Each event needs an event_type of at most 50 characters')
+    row = {'event_type': event_type}
+    for field in ('event_data', 'result'):
+        value = event.get(field)
+        row[field] = value if value is None or isinstance(value, str) else json.dumps(value)
+    timestamp = event.get('timestamp')
+    row['timestamp'] = datetime.fromisoformat(timestamp) if timestamp else datetime.utcnow()
+    if row['timestamp'].tzinfo is not None:
+        # Stored timestamps are naive UTC, like datetime.utcnow()
+        row['timestamp'] = row['timestamp'].astimezone(timezone.utc).replace(tzinfo=None)
+    return row
+
+@app.route('/api/logs/ingest', methods=['POST'])
+def api_ingest_logs():
+    """
+    Bulk SecurityLog ingestion through the write-behind buffer
+    Accepts {"events": [...]} or a bare list; answers 202 once the events are
+    queued and 503 with Retry-After when the buffer is full
+    """
+    try:
+        data = request.get_json()
+        events = data.get('events') if isinstance(data, dict) else data
+        if not isinstance(events, list) or not events:
+            return jsonify({'error': 'No events provided for ingestion'}), 400
+        if len(events) > MAX_INGEST_EVENTS:
+            return jsonify({'error': f'At most {MAX_INGEST_EVENTS} events per request'}), 413
+
+        rows = [_ingest_row(event) for event in events]
+        accepted = security_log_buffer.add_many(rows)
+        response = jsonify({
+            'success': accepted == len(rows),
+            'accepted': accepted,
+            'rejected': len(rows) - accepted,
+            'queue_depth': len(security_log_buffer)
         })
+        if accepted < len(rows):
+            response.headers['Retry-After'] = '1'
+            return response, 503
+        return response, 202
 
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/logs/ingest/status')
+def api_ingest_status():
+    """API endpoint for write-behind buffer metrics"""
+    return jsonify(security_log_buffer.get_buffer_status())
+
 @app.route('/api/threats')
 def api_threats():
     """API endpoint to get threat detections"""
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-
-        threats = ThreatDetection.query.order_by(ThreatDetection.detected_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        threats, next_cursor, total = _keyset_page(
+            ThreatDetection.query, ThreatDetection.detected_at, ThreatDetection.id)
 
         return jsonify({
             'threats': [{
@@ -234,23 +350,94 @@ def api_threats():
                 'resolved': threat.resolved,
                 'detected_at': threat.detected_at.isoformat(),
                 'resolved_at': threat.resolved_at.isoformat() if threat.resolved_at else None
-            } for threat in threats.items],
-            'total': threats.total,
-            'pages': threats.pages,
-            'current_page': threats.page
+            } for threat in threats],
+            'next_cursor': next_cursor,
+            'total': total
         })
 
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _ndjson_chunks(columns, partitions):
+    for rows in partitions:
+        yield ''.join(json.dumps(dict(zip(columns, map(_export_value, row)))) + '\n' for row in rows)
+
+
+def _csv_chunks(columns, partitions):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in partitions:
+        writer.writerows([_export_value(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty export
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@app.route('/api/export/<kind>')
+def api_export(kind):
+    """
+    Stream every security log or threat as NDJSON (default) or CSV
+    Rows come off a server-side cursor EXPORT_BATCH_SIZE at a time in
+    (time, id) order, which the time and type indexes already hold, so no
+    sort runs first and memory stays flat however large the export.
+    Filters: since and until (ISO timestamps, until exclusive) and
+    event_type for logs or threat_type for threats
+    """
+    try:
+        if kind not in EXPORT_SOURCES:
+            return jsonify({'error': f'Unknown export {kind}'}), 404
+        model, columns, time_name, type_name = EXPORT_SOURCES[kind]
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in ('ndjson', 'csv'):
+            return jsonify({'error': 'format must be ndjson or csv'}), 400
+
+        time_column = getattr(model, time_name)
+        statement = db.select(*(getattr(model, column) for column in columns)).order_by(time_column, model.id)
+        if request.args.get('since'):
+            statement = statement.where(time_column >= datetime.fromisoformat(request.args['since']))
+        if request.args.get('until'):
+            statement = statement.where(time_column < datetime.fromisoformat(request.args['until']))
+        if request.args.get(type_name):
+            statement = statement.where(getattr(model, type_name) == request.args[type_name])
+
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def generate():
+        result = db.session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        try:
+            chunks = _csv_chunks if export_format == 'csv' else _ndjson_chunks
+            yield from chunks(columns, result.partitions())
+        finally:
+            result.close()
+
+    filename = f"{kind}-{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.{export_format}"
+    return Response(stream_with_context(generate()),
+                    mimetype='text/csv' if export_format == 'csv' else 'application/x-ndjson',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
 @app.route('/api/threats/<int:threat_id>/resolve', methods=['POST'])
 def api_resolve_threat(threat_id):
     """API endpoint to resolve a threat"""
     try:
         threat = ThreatDetection.query.get_or_404(threat_id)
+        was_unresolved = threat.resolved is False
         threat.resolved = True
         threat.resolved_at = datetime.utcnow()
+        generation = dashboard_aggregates.generation
         db.session.commit()
+        if was_unresolved:
+            dashboard_aggregates.record_threat_resolved(generation)
 
         return jsonify({
             'success': True,
@@ -264,31 +451,13 @@ def api_resolve_threat(threat_id):
 def api_stats():
     """API endpoint for dashboard statistics"""
     try:
-        # Get basic stats
-        total_events = SecurityLog.query.count()
-        total_threats = ThreatDetection.query.count()
-        unresolved_threats = ThreatDetection.query.filter_by(resolved=False).count()
-
-        # Get events by type
-        event_types = db.session.query(
-            SecurityLog.event_type,
-            db.func.count(SecurityLog.id).label('count')
-        ).group_by(SecurityLog.event_type).all()
-
-        # Get threats by severity
-        threat_severities = db.session.query(
-            ThreatDetection.severity,
-            db.func.count(ThreatDetection.id).label('count')
-        ).group_by(ThreatDetection.severity).all()
-
-        return jsonify({
-            'total_events': total_events,
-            'total_threats': total_threats,
-            'unresolved_threats': unresolved_threats,
-            'event_types': dict(event_types),
-            'threat_severities': dict(threat_severities)
-        })
+        # Aggregates are served from a short-TTL snapshot; computed_at/stale_seconds report its age
+        return jsonify(dashboard_aggregates.get())
 
+    except AggregatesUnavailable as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '1'
+        return response, 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Quantum Security System - Write-Behind SecurityLog Buffer
+Copyright © 2025 Ervin Remus Radosavlevici
+Official Owner: Ervin Remus Radosavlevici
+Contact: radosavlevici210@icloud.com
+Official Timestamp: 2025-01-20 12:00:00 UTC
+Private and Public Repository Rights Reserved
+Licensed under MIT License with additional copyright protections
+All rights reserved.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from app import app, db
+from models import SecurityLog
+from dashboard_aggregates import dashboard_aggregates
+
+INGEST_BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", "1000"))
+INGEST_FLUSH_INTERVAL = float(os.environ.get("INGEST_FLUSH_INTERVAL", "0.5"))
+INGEST_MAX_PENDING = int(os.environ.get("INGEST_MAX_PENDING", "100000"))
+INGEST_MAX_RETRIES = int(os.environ.get("INGEST_MAX_RETRIES", "3"))
+
+
+class SecurityLogBuffer:
+    """
+    Write-behind buffer for SecurityLog rows
+    Events are queued in memory and a background thread writes them with
+    one executemany INSERT and one commit per batch, whenever batch_size
+    rows are waiting or flush_interval has passed. At most max_pending rows
+    are held; beyond that add_many() refuses events so callers can back
+    off. Whatever is queued is flushed when the process exits.
+    A batch that keeps failing is bisected after max_retries attempts until
+    the rows that cannot be written are isolated; those move to
+    dead_letters instead of blocking the queue
+    """
+
+    def __init__(self, flask_app, batch_size=INGEST_BATCH_SIZE, flush_interval=INGEST_FLUSH_INTERVAL,
+                 max_pending=INGEST_MAX_PENDING, max_retries=INGEST_MAX_RETRIES):
+        self.app = flask_app
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self._pending = deque()
+        self.dead_letters = deque(maxlen=max_pending)
+        # Bisection state: head rows still under suspicion, rows per attempt, failures at that size
+        self._suspect = 0
+        self._attempt_size = batch_size
+        self._attempt_failures = 0
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closing = False
+
+        self.peak_queue_depth = 0
+        self.accepted_events = 0
+        self.rejected_events = 0
+        self.flushed_events = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dead_lettered_events = 0
+        self.total_flush_seconds = 0.0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='security-log-buffer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add_many(self, events):
+        """
+        Queue SecurityLog column dicts for insertion; returns how many were
+        accepted, which is fewer than given only when the buffer is full
+        """
+        with self._condition:
+            if self._closing:
+                return 0
+            if self._thread is None:
+                self._start()
+            accepted = max(0, min(len(events), self.max_pending - len(self._pending)))
+            self._pending.extend(events[:accepted])
+            self.accepted_events += accepted
+            self.rejected_events += len(events) - accepted
+            self.peak_queue_depth = max(self.peak_queue_depth, len(self._pending))
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+        return accepted
+
+    def add(self, event_type, event_data=None, result=None, timestamp=None):
+        return self.add_many([{
+            'event_type': event_type,
+            'event_data': event_data,
+            'result': result,
+            'timestamp': timestamp or datetime.utcnow()
+        }]) == 1
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if len(self._pending) < self.batch_size and not self._closing:
+                    self._condition.wait(self.flush_interval)
+                closing = self._closing
+            while self._pending:
+                if not self._flush_batch() or (len(self._pending) < self.batch_size and not closing):
+                    break
+            if closing:
+                return
+
+    def _flush_batch(self):
+        """
+        Write up to batch_size queued rows in one transaction; on failure they
+        are queued again, and a batch failing max_retries times is halved
+        until a single failing row is left, which is dead-lettered
+        """
+        with self._condition:
+            size = self._attempt_size if self._suspect else self.batch_size
+            batch = [self._pending.popleft() for _ in range(min(size, len(self._pending)))]
+        if not batch:
+            return True
+
+        start = time.perf_counter()
+        generation = dashboard_aggregates.generation
+        try:
+            with self.app.app_context():
+                db.session.execute(db.insert(SecurityLog), batch)
+                db.session.commit()
+        except Exception as e:
+            with self._condition:
+                self.failed_flushes += 1
+                if not self._suspect:
+                    self._suspect, self._attempt_size, self._attempt_failures = len(batch), len(batch), 0
+                self._attempt_failures += 1
+                exhausted = self._attempt_failures >= self.max_retries
+                if exhausted and len(batch) == 1:
+                    self._dead_letter(batch[0], e)
+                else:
+                    logging.error(f"SecurityLog flush of {len(batch)} events failed, retrying: {e}")
+                    self._pending.extendleft(reversed(batch))
+                    if exhausted:
+                        self._attempt_size, self._attempt_failures = max(1, len(batch) // 2), 0
+            if not self._closing:
+                time.sleep(self.flush_interval)
+            return False
+
+        if self._suspect:
+            with self._condition:
+                self._suspect = max(0, self._suspect - len(batch))
+                self._attempt_failures = 0
+
+        seconds = time.perf_counter() - start
+        self.flushes += 1
+        self.flushed_events += len(batch)
+        self.last_flush_seconds = seconds
+        self.total_flush_seconds += seconds
+        self.max_flush_seconds = max(self.max_flush_seconds, seconds)
+        dashboard_aggregates.record_events(Counter(event['event_type'] for event in batch), generation)
+        return True
+
+    def _dead_letter(self, row, error):
+        """Set aside a row that failed on its own max_retries times; caller holds the condition"""
+        logging.error(f"SecurityLog event {row.get('event_type')!r} dead-lettered after "
+                      f"{self.max_retries} attempts: {error}")
+        self.dead_letters.append(row)
+        self.dead_lettered_events += 1
+        self._suspect, self._attempt_size, self._attempt_failures = 0, self.batch_size, 0
+
+    def flush(self):
+        """Write everything queued now, from the calling thread; returns False if a batch failed"""
+        while self._pending:
+            if not self._flush_batch():
+                return False
+        return True
+
+    def close(self, timeout=30):
+        """Stop accepting events and flush what is queued"""
+        with self._condition:
+            self._closing = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._pending:
+            logging.error(f"{len(self._pending)} SecurityLog events were not written at shutdown")
+
+    def get_buffer_status(self):
+        return {
+            'buffer': 'closed' if self._closing else 'operational',
+            'queue_depth': len(self._pending),
+            'peak_queue_depth': self.peak_queue_depth,
+            'max_pending': self.max_pending,
+            'batch_size': self.batch_size,
+            'flush_interval': self.flush_interval,
+            'accepted_events': self.accepted_events,
+            'rejected_events': self.rejected_events,
+            'flushed_events': self.flushed_events,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes,
+            'max_retries': self.max_retries,
+            'dead_lettered_events': self.dead_lettered_events,
+            'dead_letter_depth': len(self.dead_letters),
+            'last_flush_ms': self.last_flush_seconds * 1e3,
+            'mean_flush_ms': self.total_flush_seconds / self.flushes * 1e3 if self.flushes else 0.0,
+            'max_flush_ms': self.max_flush_seconds * 1e3,
+            'timestamp': datetime.now().isoformat()
+        }
+
+
+# Initialize global SecurityLog write-behind buffer
+security_log_buffer = SecurityLogBuffer(app)
@@ -0,0 +1,26 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the module-level singletons off any real key store
+os.environ['QUANTUM_KEY_STORE'] = ':memory:'
+# The Flask app binds its database at import, so point it at a scratch SQLite file first
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='quantum-tests-'), 'test.db')
+
+
+@pytest.fixture
+def flask_app():
+    """The Flask app with routes registered and empty tables"""
+    from app import app, db
+    import routes  # noqa: F401
+    from models import SecurityLog, ThreatDetection
+
+    with app.app_context():
+        db.session.execute(db.delete(SecurityLog))
+        db.session.execute(db.delete(ThreatDetection))
+        db.session.commit()
+    return app
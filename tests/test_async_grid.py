@@ -0,0 +1,129 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from quantum_encryption_grid import AsyncQuantumEncryptionGrid, QuantumEncryptionGrid
+
+INLINE_LIMIT = 1024
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+@pytest.fixture
+def grid():
+    return QuantumEncryptionGrid()
+
+
+def _recording(grid, name, threads):
+    """Wrap a grid method so each call records the thread it ran on"""
+    method = getattr(grid, name)
+
+    def record(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return method(*args, **kwargs)
+    setattr(grid, name, record)
+
+
+def test_small_payloads_run_inline_and_large_ones_offload(grid, executor):
+    threads = []
+    _recording(grid, 'quantum_encrypt', threads)
+    facade = AsyncQuantumEncryptionGrid(grid, inline_limit=INLINE_LIMIT, executor=executor)
+
+    async def run():
+        small = await facade.encrypt(b"s" * INLINE_LIMIT)
+        large = await facade.encrypt(b"l" * (INLINE_LIMIT + 1))
+        return small, large
+
+    small, large = asyncio.run(run())
+    assert threads[0] == threading.get_ident()
+    assert threads[1] != threading.get_ident()
+    assert grid.quantum_decrypt(small)['decrypted_data'] == "s" * INLINE_LIMIT
+    assert grid.quantum_decrypt(large)['decrypted_data'] == "l" * (INLINE_LIMIT + 1)
+    status = facade.get_async_status()
+    assert (status['inline_calls'], status['offloaded_calls']) == (1, 1)
+
+
+def test_text_is_sized_in_bytes(grid, executor):
+    facade = AsyncQuantumEncryptionGrid(grid, inline_limit=INLINE_LIMIT, executor=executor)
+    # Fewer characters than the limit but more UTF-8 bytes
+    asyncio.run(facade.encrypt("é" * (INLINE_LIMIT // 2 + 1)))
+    assert facade.offloaded_calls == 1
+
+
+def test_round_trips_through_every_method(grid, executor):
+    facade = AsyncQuantumEncryptionGrid(grid, inline_limit=INLINE_LIMIT, executor=executor)
+    records = [b"r" * 100, b"s" * 2000]
+
+    async def run():
+        package = await facade.encrypt(b"p" * 4096)
+        wire = await facade.encrypt_wire("w" * 4096, security_level='aead')
+        batch = await facade.encrypt_many(records)
+        return (await facade.decrypt(package), await facade.decrypt_wire(wire['envelope']),
+                await facade.decrypt_many(batch['encrypted_buffer'], batch['offsets']))
+
+    decrypted, wire, many = asyncio.run(run())
+    assert decrypted['decrypted_data'] == "p" * 4096
+    assert wire['decrypted_data'] == "w" * 4096
+    offsets = many['offsets']
+    assert [many['decrypted_buffer'][offsets[i]:offsets[i + 1]] for i in range(many['records'])] == records
+    assert facade.offloaded_calls == 6
+
+
+def test_offloaded_work_is_bounded_and_the_loop_stays_free(grid, executor):
+    release = threading.Event()
+    running, peak = [0], [0]
+    lock = threading.Lock()
+    encrypt = grid.quantum_encrypt
+
+    def blocking_encrypt(data, security_level):
+        if len(data) <= INLINE_LIMIT:
+            return encrypt(data, security_level)
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        release.wait(10)
+        with lock:
+            running[0] -= 1
+        return encrypt(data, security_level)
+    grid.quantum_encrypt = blocking_encrypt
+    facade = AsyncQuantumEncryptionGrid(grid, inline_limit=INLINE_LIMIT, max_concurrency=2, executor=executor)
+
+    async def run():
+        large = [asyncio.create_task(facade.encrypt(b"x" * 4096)) for _ in range(5)]
+        while facade.running < 2 or facade.queue_depth < 3:
+            await asyncio.sleep(0.001)
+        # Offloaded work is stuck, yet small requests still complete on the loop
+        small = await asyncio.wait_for(facade.encrypt(b"small"), 5)
+        status = facade.get_async_status()
+        release.set()
+        return small, status, await asyncio.gather(*large)
+
+    small, status, large = asyncio.run(run())
+    assert 'encrypted_data' in small
+    assert (status['running'], status['queue_depth'], status['peak_queue_depth']) == (2, 3, 3)
+    assert peak[0] == 2
+    assert all('encrypted_data' in package for package in large)
+    assert facade.get_async_status()['queue_depth'] == 0
+    assert facade.get_async_status()['mean_queue_wait_ms'] > 0
+
+
+def test_failures_release_the_semaphore(grid, executor):
+    def failing(*args):
+        raise RuntimeError("worker failed")
+    grid.quantum_decrypt_many = failing
+    facade = AsyncQuantumEncryptionGrid(grid, inline_limit=INLINE_LIMIT, max_concurrency=1, executor=executor)
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(RuntimeError, match="worker failed"):
+                await asyncio.wait_for(facade.decrypt_many(b"x" * 4096, [0]), 5)
+
+    asyncio.run(run())
+    assert facade.running == 0
+    assert facade.offloaded_calls == 3
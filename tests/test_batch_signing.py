@@ -0,0 +1,54 @@
+import pytest
+
+from enhanced_copyright_watermarking import EnhancedCopyrightWatermarkingSystem
+
+NAMES = [f"asset-{i}.bin" for i in range(200)]
+
+
+@pytest.fixture
+def system():
+    return EnhancedCopyrightWatermarkingSystem()
+
+
+def test_batch_matches_one_at_a_time_signing(system):
+    hashes = [f"{i:064x}" for i in range(len(NAMES))]
+    batch = system.create_watermarks(NAMES, hashes)
+    assert len(batch) == len(NAMES)
+    assert batch.watermark_signatures == [
+        system._generate_watermark_signature(name, batch.creation_timestamp, content_hash)
+        for name, content_hash in zip(NAMES, hashes)
+    ]
+    unhashed = system.create_watermarks(NAMES)
+    assert unhashed.watermark_signatures == [
+        system._generate_watermark_signature(name, unhashed.creation_timestamp) for name in NAMES
+    ]
+
+
+def test_rows_share_one_timestamp_and_the_owner(system):
+    batch = system.create_watermarks(NAMES[:3])
+    rows = list(batch)
+    assert [row.feature_name for row in rows] == NAMES[:3]
+    assert {row.creation_timestamp for row in rows} == {batch.creation_timestamp}
+    assert all(row.copyright_owner == system.owner and row.legal_protection for row in rows)
+    assert len(set(batch.watermark_signatures)) == 3
+
+
+def test_content_hash_changes_the_signature(system):
+    plain, hashed = system.create_watermarks(["a"]), system.create_watermarks(["a"], ["ff" * 32])
+    assert system._generate_watermark_signature("a", plain.creation_timestamp) == plain.watermark_signatures[0]
+    assert system._generate_watermark_signature("a", hashed.creation_timestamp) != hashed.watermark_signatures[0]
+
+
+def test_mismatched_hashes_are_rejected(system):
+    with pytest.raises(ValueError, match="content_hashes"):
+        system.create_watermarks(["a", "b"], ["ff" * 32])
+
+
+def test_deterministic_signatures_ignore_the_clock():
+    first = EnhancedCopyrightWatermarkingSystem(deterministic=True, signature_epoch="2025.1")
+    second = EnhancedCopyrightWatermarkingSystem(deterministic=True, signature_epoch="2025.1")
+    other_epoch = EnhancedCopyrightWatermarkingSystem(deterministic=True, signature_epoch="2025.2")
+    signatures = first.create_watermarks(NAMES).watermark_signatures
+    assert second.create_watermarks(NAMES).watermark_signatures == signatures
+    assert other_epoch.create_watermarks(NAMES).watermark_signatures != signatures
+    assert first._create_watermark(NAMES[5]).watermark_signature == signatures[5]
@@ -0,0 +1,144 @@
+import io
+import struct
+import zipfile
+import zlib
+
+import pytest
+
+from binary_watermarking import embed_file
+
+TIMESTAMP = "2025-01-20T12:00:00+00:00"
+LATER_TIMESTAMP = "2025-02-03T08:30:00+00:00"
+CORE_XML = (b'<?xml version="1.0" encoding="UTF-8"?>'
+            b'<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties"'
+            b' xmlns:dc="http://purl.org/dc/elements/1.1/"><dc:title>Report</dc:title></cp:coreProperties>')
+
+
+def _png(pixels=b"\x00\xff\x00\x00"):
+    def chunk(chunk_type, data):
+        return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(pixels)) + chunk(b"IEND", b""))
+
+
+def _pdf(text=b"Hello"):
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+               b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 200 200] >>", b"<< /Title (" + text + b") >>"]
+    out = io.BytesIO(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R /Info 4 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def _docx(body=b"<w:document/>"):
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", b"<Types/>")
+        archive.writestr("word/document.xml", body)
+        archive.writestr("docProps/core.xml", CORE_XML)
+        archive.comment = b"kept"
+    return out.getvalue()
+
+
+def _readable(path):
+    """File bytes with DOCX members inflated, so embedded metadata can be searched"""
+    if path.suffix != '.docx':
+        return path.read_bytes()
+    with zipfile.ZipFile(path) as archive:
+        return b"".join(archive.read(name) for name in archive.namelist())
+
+
+SAMPLES = {'image.png': _png, 'paper.pdf': _pdf, 'letter.docx': _docx}
+
+
+@pytest.fixture(params=sorted(SAMPLES))
+def asset(request, tmp_path):
+    path = tmp_path / request.param
+    path.write_bytes(SAMPLES[request.param]())
+    return path
+
+
+def test_stamp_then_rerun_is_unchanged(asset):
+    first = embed_file(str(asset), asset.name, TIMESTAMP)
+    assert first.status == 'stamped', first.error
+    stamped = asset.read_bytes()
+    assert first.watermark_signature.encode() in _readable(asset)
+
+    # A later run signs with its own timestamp; the embedded one still verifies
+    second = embed_file(str(asset), asset.name, LATER_TIMESTAMP)
+    assert second.status == 'unchanged'
+    assert second.watermarked_at == TIMESTAMP
+    assert (second.watermark_signature, second.content_hash) == (first.watermark_signature, first.content_hash)
+    assert asset.read_bytes() == stamped
+    assert not [name for name in asset.parent.iterdir() if name.name.startswith(".wm-")]
+
+
+def test_content_hash_ignores_the_watermark(asset):
+    original = embed_file(str(asset), asset.name, TIMESTAMP)
+    moved = embed_file(str(asset), "moved/" + asset.name, TIMESTAMP)
+    assert moved.status == 'stamped'
+    assert moved.content_hash == original.content_hash
+    assert moved.watermark_signature != original.watermark_signature
+    assert original.watermark_signature.encode() not in _readable(asset)
+    assert moved.watermark_signature.encode() in _readable(asset)
+
+
+def test_changed_content_is_restamped(tmp_path):
+    for name, build, edited in (('a.png', _png, _png(b"\x00\x00\x00\xff")), ('a.pdf', _pdf, _pdf(b"Bye")),
+                                ('a.docx', _docx, _docx(b"<w:document>v2</w:document>"))):
+        path = tmp_path / name
+        path.write_bytes(build())
+        first = embed_file(str(path), name, TIMESTAMP)
+        path.write_bytes(edited)
+        second = embed_file(str(path), name, TIMESTAMP)
+        assert second.status == 'stamped'
+        assert second.content_hash != first.content_hash
+
+
+def test_pdf_restamp_replaces_its_own_revision(tmp_path):
+    path = tmp_path / "paper.pdf"
+    path.write_bytes(_pdf())
+    embed_file(str(path), "paper.pdf", TIMESTAMP)
+    size = path.stat().st_size
+    embed_file(str(path), "renamed.pdf", TIMESTAMP)
+    data = path.read_bytes()
+    assert data.count(b"startxref") == 2
+    assert len(data) == size
+    assert data.startswith(_pdf())
+
+    pypdf = pytest.importorskip("pypdf")
+    info = pypdf.PdfReader(str(path)).metadata
+    assert info['/Title'] == "Hello"
+    assert info['/WatermarkTimestamp'] == TIMESTAMP
+
+
+def test_docx_members_are_copied_untouched(tmp_path):
+    path = tmp_path / "letter.docx"
+    path.write_bytes(_docx())
+    embed_file(str(path), "letter.docx", TIMESTAMP)
+    with zipfile.ZipFile(io.BytesIO(_docx())) as before, zipfile.ZipFile(path) as after:
+        assert after.testzip() is None
+        assert after.comment == b"kept"
+        for info in before.infolist():
+            if info.filename != "docProps/core.xml":
+                assert after.getinfo(info.filename).CRC == info.CRC
+                assert after.read(info.filename) == before.read(info.filename)
+        core = after.read("docProps/core.xml")
+        assert b"<dc:title>Report</dc:title>" in core
+        assert b"<cp:version>" + TIMESTAMP.encode() + b"</cp:version>" in core
+
+
+def test_unsupported_or_corrupt_files_report_errors(tmp_path):
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"not a png")
+    result = embed_file(str(path), "broken.png", TIMESTAMP)
+    assert result.status == 'error'
+    assert path.read_bytes() == b"not a png"
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,112 @@
+import io
+import os
+
+import pytest
+
+from quantum_encryption_grid import (
+    CHUNK_LENGTH, CHUNK_TAG_SIZE, CHUNKED_HEADER, CHUNKED_MAGIC, CHUNKED_TRAILER_SIZE, QuantumEncryptionGrid
+)
+
+CHUNK_SIZE = 4096
+
+
+@pytest.fixture(scope="module")
+def grid():
+    return QuantumEncryptionGrid()
+
+
+def _seal(grid, data, chunk_size=CHUNK_SIZE, workers=2):
+    out = io.BytesIO()
+    result = grid.quantum_encrypt_parallel(io.BytesIO(data), out, workers=workers, chunk_size=chunk_size)
+    assert result['status'] == 'parallel_encrypted'
+    return out.getvalue(), result['encryption_keys']
+
+
+def _open(grid, container, keys, workers=2):
+    out = io.BytesIO()
+    result = grid.quantum_decrypt_parallel(io.BytesIO(container), out, keys, workers=workers)
+    return result, out.getvalue()
+
+
+def _split(container):
+    """(header, [length + ciphertext + tag records], trailer record)"""
+    header = container[:CHUNKED_HEADER.size]
+    offset = CHUNKED_HEADER.size
+    records = []
+    while True:
+        length, = CHUNK_LENGTH.unpack_from(container, offset)
+        if length == 0:
+            return header, records, container[offset:]
+        end = offset + CHUNK_LENGTH.size + length + CHUNK_TAG_SIZE
+        records.append(container[offset:end])
+        offset = end
+
+
+@pytest.mark.parametrize("size", [0, 1, CHUNK_SIZE - 1, CHUNK_SIZE, CHUNK_SIZE + 1, 5 * CHUNK_SIZE + 17])
+def test_round_trip(grid, size):
+    data = os.urandom(size)
+    container, keys = _seal(grid, data)
+    assert container.startswith(CHUNKED_MAGIC)
+    result, plaintext = _open(grid, container, keys)
+    assert result['status'] == 'parallel_decrypted'
+    assert plaintext == data
+
+
+def test_layout_records_chunk_count(grid):
+    container, _ = _seal(grid, os.urandom(3 * CHUNK_SIZE + 5))
+    header, records, trailer = _split(container)
+    assert CHUNKED_HEADER.unpack(header)[1] == CHUNK_SIZE
+    assert len(records) == 4
+    assert len(trailer) == CHUNK_LENGTH.size + CHUNKED_TRAILER_SIZE
+
+
+def _tampered(grid, mutate):
+    container, keys = _seal(grid, os.urandom(4 * CHUNK_SIZE + 100))
+    header, records, trailer = _split(container)
+    return _open(grid, mutate(header, records, trailer), keys)
+
+
+@pytest.mark.parametrize("mutate", [
+    pytest.param(lambda h, r, t: h + b"".join([r[1], r[0]] + r[2:]) + t, id="swapped"),
+    pytest.param(lambda h, r, t: h + b"".join(r[:2] + r[3:]) + t, id="dropped"),
+    pytest.param(lambda h, r, t: h + b"".join(r[:2] + r[1:]) + t, id="duplicated"),
+    pytest.param(lambda h, r, t: h + b"".join(r[:-1]) + t, id="final-chunk-dropped"),
+    pytest.param(lambda h, r, t: h + b"".join(r), id="trailer-missing"),
+    pytest.param(lambda h, r, t: h + b"".join(r) + t[:-1], id="trailer-truncated"),
+    pytest.param(lambda h, r, t: h + b"".join(r) + t + b"\x00", id="trailing-data"),
+    pytest.param(lambda h, r, t: h + r[0][:40] + bytes([r[0][40] ^ 1]) + r[0][41:] + b"".join(r[1:]) + t,
+                 id="bit-flip"),
+    pytest.param(lambda h, r, t: CHUNKED_HEADER.pack(CHUNKED_MAGIC, CHUNK_SIZE * 2, *CHUNKED_HEADER.unpack(h)[2:])
+                 + b"".join(r) + t, id="chunk-size-edited"),
+    pytest.param(lambda h, r, t: CHUNKED_HEADER.pack(CHUNKED_MAGIC, 0, *CHUNKED_HEADER.unpack(h)[2:])
+                 + b"".join(r) + t, id="chunk-size-zero"),
+    pytest.param(lambda h, r, t: b"QEGCHNK1" + h[8:] + b"".join(r) + t, id="old-magic"),
+])
+def test_tampering_is_rejected(grid, mutate):
+    result, _ = _tampered(grid, mutate)
+    assert result['status'] == 'decryption_error'
+
+
+def test_wrong_keys_are_rejected(grid):
+    container, keys = _seal(grid, b"secret" * 1000)
+    result, _ = _open(grid, container, keys[::-1])
+    assert result['status'] == 'decryption_error'
+
+
+def test_chunks_from_another_container_are_rejected(grid):
+    first, keys = _seal(grid, os.urandom(2 * CHUNK_SIZE))
+    second, _ = _seal(grid, os.urandom(2 * CHUNK_SIZE))
+    header, records, trailer = _split(first)
+    _, other_records, _ = _split(second)
+    result, _ = _open(grid, header + records[0] + other_records[1] + trailer, keys)
+    assert result['status'] == 'decryption_error'
+
+
+def test_buffer_and_stream_readers_agree(grid, tmp_path):
+    data = os.urandom(3 * CHUNK_SIZE + 9)
+    container, keys = _seal(grid, data)
+    path = tmp_path / "data.qeg"
+    path.write_bytes(container)
+    result = grid.decrypt_file(str(path), str(tmp_path / "data.out"), keys, workers=2)
+    assert result['status'] == 'file_decrypted'
+    assert (tmp_path / "data.out").read_bytes() == data
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from quantum_encryption_grid import BLOCK_SIZE, COLUMNAR_MAX_BLOCKS, COLUMNAR_MIN_RECORDS, QuantumEncryptionGrid
+
+
+@pytest.fixture
+def grid():
+    return QuantumEncryptionGrid()
+
+
+def _text(size):
+    return os.urandom(size).hex()[:size]
+
+
+def _records():
+    """Columnar groups, groups too small for the columnar path, and records past COLUMNAR_MAX_BLOCKS"""
+    records = [_text(40) for _ in range(3 * COLUMNAR_MIN_RECORDS)]
+    records += [_text(BLOCK_SIZE) for _ in range(COLUMNAR_MIN_RECORDS)]
+    records += ["" for _ in range(COLUMNAR_MIN_RECORDS)]
+    records += [_text(size) for size in (1, 15, 17, 300)]
+    records += [_text(COLUMNAR_MAX_BLOCKS * BLOCK_SIZE + 5) for _ in range(COLUMNAR_MIN_RECORDS)]
+    return records
+
+
+def _slices(result):
+    buffer, offsets = result['encrypted_buffer'], result['offsets']
+    return [bytes(buffer[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+
+
+def test_batch_records_open_with_quantum_decrypt(grid):
+    records = _records()
+    result = grid.quantum_encrypt_many(records)
+    assert result['status'] == 'encryption_successful'
+    assert result['records'] == len(records)
+    assert result['key_id'] == grid.key_id.hex()
+    keys = grid.quantum_encrypt("")['encryption_keys']
+    for record, ciphertext in zip(records, _slices(result)):
+        opened = grid.quantum_decrypt({'encrypted_data': ciphertext, 'encryption_keys': keys})
+        assert opened['status'] == 'decryption_successful'
+        assert opened['decrypted_data'] == record
+
+
+def test_batch_ciphertext_lengths_match_single_records(grid):
+    records = _records()
+    result = grid.quantum_encrypt_many(records)
+    for record, ciphertext in zip(records, _slices(result)):
+        assert len(ciphertext) == len(grid.quantum_encrypt(record)['encrypted_data'])
+
+
+def test_equal_records_get_distinct_ivs(grid):
+    result = grid.quantum_encrypt_many([b"same record"] * COLUMNAR_MIN_RECORDS)
+    assert len(set(_slices(result))) == COLUMNAR_MIN_RECORDS
+
+
+def test_decrypt_many_round_trip(grid):
+    records = _records()
+    result = grid.quantum_encrypt_many(records)
+    opened = grid.quantum_decrypt_many(result['encrypted_buffer'], result['offsets'], result['key_id'])
+    assert opened['status'] == 'decryption_successful'
+    offsets = opened['offsets']
+    buffer = opened['decrypted_buffer']
+    assert [buffer[offsets[i]:offsets[i + 1]].decode() for i in range(len(records))] == records
+
+
+def test_decrypt_many_uses_the_batch_key_after_rotation(grid):
+    records = [_text(32).encode() for _ in range(COLUMNAR_MIN_RECORDS)]
+    result = grid.quantum_encrypt_many(records)
+    grid.rotate_key()
+    assert result['key_id'] != grid.key_id.hex()
+    opened = grid.quantum_decrypt_many(result['encrypted_buffer'], result['offsets'], result['key_id'])
+    assert opened['decrypted_buffer'] == b"".join(records)
+
+
+def test_decrypt_many_rejects_bad_lengths(grid):
+    result = grid.quantum_encrypt_many([os.urandom(32) for _ in range(COLUMNAR_MIN_RECORDS)])
+    offsets = list(result['offsets'])
+    offsets[1] -= 1
+    opened = grid.quantum_decrypt_many(result['encrypted_buffer'], offsets, result['key_id'])
+    assert opened['status'] == 'decryption_error'
+    assert opened['data_protected'] is True
+
+
+def test_decrypt_many_does_not_open_under_another_key(grid):
+    records = [os.urandom(32) for _ in range(COLUMNAR_MIN_RECORDS)]
+    result = grid.quantum_encrypt_many(records)
+    opened = QuantumEncryptionGrid().quantum_decrypt_many(result['encrypted_buffer'], result['offsets'])
+    assert opened.get('decrypted_buffer') != b"".join(records)
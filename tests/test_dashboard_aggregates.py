@@ -0,0 +1,139 @@
+import threading
+
+import pytest
+
+import routes
+from app import db
+from dashboard_aggregates import AggregatesUnavailable, DashboardAggregates
+from models import SecurityLog, ThreatDetection
+
+
+@pytest.fixture
+def app_context(flask_app):
+    with flask_app.app_context():
+        db.session.add_all([SecurityLog(event_type='login'), SecurityLog(event_type='login'),
+                            SecurityLog(event_type='encryption'),
+                            ThreatDetection(threat_type='probe', severity='high', resolved=False),
+                            ThreatDetection(threat_type='probe', severity='low', resolved=True)])
+        db.session.commit()
+        yield flask_app
+
+
+@pytest.fixture
+def aggregates(monkeypatch):
+    """A fresh snapshot behind the routes, so other tests' state does not leak in"""
+    fresh = DashboardAggregates(ttl=60)
+    monkeypatch.setattr(routes, 'dashboard_aggregates', fresh)
+    return fresh
+
+
+def test_counts_come_from_one_refresh(app_context):
+    stats = DashboardAggregates(ttl=60).get()
+    assert stats['total_events'] == 3
+    assert stats['event_types'] == {'login': 2, 'encryption': 1}
+    assert stats['total_threats'] == 2
+    assert stats['threat_severities'] == {'high': 1, 'low': 1}
+    assert stats['unresolved_threats'] == 1
+    assert stats['ttl_seconds'] == 60
+
+
+def test_snapshot_is_served_until_the_ttl_expires(app_context):
+    aggregates = DashboardAggregates(ttl=60)
+    assert aggregates.get()['total_events'] == 3
+    db.session.add(SecurityLog(event_type='login'))
+    db.session.commit()
+
+    stats = aggregates.get()
+    assert stats['total_events'] == 3
+    assert stats['stale_seconds'] >= 0
+    assert aggregates.refreshes == 1
+
+    aggregates.ttl = 0
+    assert aggregates.get()['total_events'] == 4
+    assert aggregates.refreshes == 2
+
+
+def test_returned_stats_are_copies(app_context):
+    aggregates = DashboardAggregates(ttl=60)
+    aggregates.get()['event_types']['login'] = 100
+    assert aggregates.get()['event_types']['login'] == 2
+
+
+def test_deltas_apply_only_from_the_current_generation(app_context):
+    aggregates = DashboardAggregates(ttl=60)
+    aggregates.record_events({'login': 5}, 0)
+    aggregates.get()
+    generation = aggregates.generation
+
+    aggregates.record_events({'login': 1, 'upload': 2}, generation)
+    aggregates.record_threat_resolved(generation)
+    # Began before the snapshot's queries finished, so it may already be counted
+    aggregates.record_events({'login': 10}, generation - 1)
+    aggregates.record_threat_resolved(generation - 1)
+
+    stats = aggregates.get()
+    assert stats['event_types'] == {'login': 3, 'encryption': 1, 'upload': 2}
+    assert stats['total_events'] == 6
+    assert stats['unresolved_threats'] == 0
+    aggregates.record_threat_resolved(generation)
+    assert aggregates.get()['unresolved_threats'] == 0
+
+
+def test_single_flight_serves_the_old_snapshot_during_a_refresh(app_context, monkeypatch):
+    aggregates = DashboardAggregates(ttl=60)
+    aggregates.get()
+    aggregates.ttl = 0
+    entered, release = threading.Event(), threading.Event()
+    refresh = aggregates._refresh
+
+    def slow_refresh():
+        entered.set()
+        release.wait(10)
+        with app_context.app_context():
+            refresh()
+
+    monkeypatch.setattr(aggregates, '_refresh', slow_refresh)
+    refreshing = threading.Thread(target=aggregates.get)
+    refreshing.start()
+    try:
+        assert entered.wait(10)
+        assert aggregates.get()['total_events'] == 3
+        assert aggregates.refreshes == 1
+    finally:
+        release.set()
+        refreshing.join(10)
+    assert aggregates.refreshes == 2
+
+
+def test_unavailable_until_the_first_refresh_succeeds(app_context, aggregates, monkeypatch):
+    def failing_refresh():
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(aggregates, '_refresh', failing_refresh)
+    with pytest.raises(AggregatesUnavailable):
+        aggregates.get()
+
+    client = app_context.test_client()
+    response = client.get('/api/stats')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    response = client.get('/')
+    assert response.status_code == 503
+
+
+def test_api_stats_reports_staleness(app_context, aggregates):
+    stats = app_context.test_client().get('/api/stats').get_json()
+    assert stats['total_events'] == 3
+    assert {'computed_at', 'stale_seconds', 'ttl_seconds'} <= set(stats)
+
+
+def test_resolving_a_threat_updates_the_snapshot(app_context, aggregates):
+    client = app_context.test_client()
+    assert client.get('/api/stats').get_json()['unresolved_threats'] == 1
+    threat = ThreatDetection.query.filter_by(resolved=False).one()
+
+    assert client.post(f'/api/threats/{threat.id}/resolve').status_code == 200
+    assert client.get('/api/stats').get_json()['unresolved_threats'] == 0
+    assert client.post(f'/api/threats/{threat.id}/resolve').status_code == 200
+    assert aggregates.get()['unresolved_threats'] == 0
+    assert aggregates.refreshes == 1
@@ -0,0 +1,45 @@
+import encryption_benchmarks
+from encryption_benchmarks import _best_mean, find_regressions, host_differences
+
+
+def _report(cpu_count=1, **results):
+    return {'cpu_count': cpu_count, 'machine': 'x86_64', 'python': '3.11.7',
+            'results': {'grid_matrix': dict(results, benchmark='grid_matrix')}}
+
+
+def test_only_throughput_drops_beyond_threshold_regress():
+    baseline = _report(encrypt_mb_per_sec=100.0, decrypt_mb_per_sec=100.0, encrypt_p99_us=10.0)
+    report = _report(encrypt_mb_per_sec=80.0, decrypt_mb_per_sec=70.0, encrypt_p99_us=100.0)
+    regressions = find_regressions(report, baseline, 0.25)
+    assert [r['metric'] for r in regressions] == ['decrypt_mb_per_sec']
+    assert round(regressions[0]['change'], 2) == -0.30
+
+
+def test_metrics_missing_from_baseline_are_skipped():
+    report = _report(encrypt_mb_per_sec=1.0)
+    report['results']['key_rotation'] = {'benchmark': 'key_rotation', 'rotate_per_sec': 1.0}
+    assert find_regressions(report, _report(encrypt_mb_per_sec=1.0)) == []
+
+
+def test_host_differences_names_changed_fields():
+    assert host_differences(_report(), _report()) == {}
+    assert host_differences(_report(cpu_count=8), _report(cpu_count=1)) == {'cpu_count': (1, 8)}
+
+
+def test_best_mean_ignores_a_slow_run():
+    samples = [1.0] * 10 + [5.0] * 10 + [2.0] * 30
+    assert _best_mean(samples, 5) == 1.0
+    assert _best_mean([3.0], 5) == 3.0
+
+
+def test_grid_matrix_reports_every_cell(monkeypatch):
+    monkeypatch.setattr(encryption_benchmarks, 'MATRIX_PAYLOAD_SIZES', (64,))
+    monkeypatch.setattr(encryption_benchmarks, 'MATRIX_BATCH_SIZES', (1, 4))
+    monkeypatch.setattr(encryption_benchmarks, 'MATRIX_THREAD_COUNTS', (1, 2))
+    result = encryption_benchmarks.benchmark_grid_matrix(count=20)
+    for layers in encryption_benchmarks.MATRIX_LAYER_COUNTS:
+        for operation in ('encrypt', 'decrypt'):
+            prefix = f'{operation}_{layers}layer_64b'
+            assert result[f'{prefix}_mb_per_sec'] > 0
+            assert result[f'{prefix}_p50_us'] <= result[f'{prefix}_p99_us']
+    assert {'encrypt_many_batch4_records_per_sec', 'parallel_2threads_mb_per_sec'} <= set(result)
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import routes
+from app import db
+from models import SecurityLog, ThreatDetection
+from query_plan_check import check_query_plans
+
+BASE_TIME = datetime(2025, 1, 20, 12, 0, 0)
+
+
+@pytest.fixture
+def client(flask_app):
+    with flask_app.app_context():
+        # Inserted newest first, so id order and time order disagree
+        db.session.execute(db.insert(SecurityLog), [
+            {'event_type': 'encryption' if i % 2 else 'login', 'event_data': str(i),
+             'timestamp': BASE_TIME + timedelta(minutes=20 - i)}
+            for i in range(20)
+        ])
+        db.session.execute(db.insert(ThreatDetection), [
+            {'threat_type': 'probe' if i % 3 else 'intrusion', 'severity': 'high', 'source_ip': f"10.0.0.{i}",
+             'detected_at': BASE_TIME + timedelta(minutes=i // 2)}
+            for i in range(9)
+        ])
+        db.session.commit()
+    return flask_app.test_client()
+
+
+def _ndjson(response):
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_logs_stream_in_time_order(client):
+    rows = _ndjson(client.get('/api/export/logs'))
+    assert len(rows) == 20
+    assert [row['event_data'] for row in rows] == [str(i) for i in range(19, -1, -1)]
+    assert set(rows[0]) == {'id', 'event_type', 'event_data', 'result', 'timestamp'}
+
+
+def test_filters(client):
+    query = {'since': (BASE_TIME + timedelta(minutes=5)).isoformat(),
+             'until': (BASE_TIME + timedelta(minutes=15)).isoformat(), 'event_type': 'encryption'}
+    rows = _ndjson(client.get('/api/export/logs', query_string=query))
+    assert [row['event_data'] for row in rows] == ['15', '13', '11', '9', '7']
+    assert all(row['event_type'] == 'encryption' for row in rows)
+
+
+def test_threats_order_ties_by_id(client):
+    rows = _ndjson(client.get('/api/export/threats', query_string={'threat_type': 'probe'}))
+    keys = [(row['detected_at'], row['id']) for row in rows]
+    assert len(rows) == 6
+    assert keys == sorted(keys)
+    assert all(row['threat_type'] == 'probe' for row in rows)
+
+
+def test_csv(client):
+    response = client.get('/api/export/logs', query_string={'format': 'csv', 'event_type': 'login'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'].endswith('.csv')
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == ['id', 'event_type', 'event_data', 'result', 'timestamp']
+    assert [row[2] for row in rows[1:]] == [str(i) for i in range(18, -1, -2)]
+
+
+def test_empty_csv_has_only_the_header(client):
+    response = client.get('/api/export/logs', query_string={'format': 'csv', 'event_type': 'none'})
+    assert response.get_data(as_text=True).splitlines() == ['id,event_type,event_data,result,timestamp']
+
+
+def test_rows_are_written_in_batches(client, monkeypatch):
+    monkeypatch.setattr(routes, 'EXPORT_BATCH_SIZE', 3)
+    response = client.get('/api/export/logs', buffered=False)
+    chunks = [chunk for chunk in response.response if chunk]
+    response.close()
+    assert len(chunks) == 7
+    assert sum(chunk.count(b'\n') for chunk in chunks) == 20
+
+
+@pytest.mark.parametrize('path, query, status', [
+    ('/api/export/users', {}, 404),
+    ('/api/export/logs', {'format': 'xml'}, 400),
+    ('/api/export/logs', {'since': 'yesterday'}, 400),
+])
+def test_bad_requests(client, path, query, status):
+    assert client.get(path, query_string=query).status_code == status
+
+
+def test_listed_queries_search_indexes_without_sorting(flask_app):
+    with flask_app.app_context():
+        report = check_query_plans()
+    assert {name: result['plan'] for name, result in report.items() if not result['uses_index']} == {}
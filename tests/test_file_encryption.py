@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+import quantum_encryption_grid
+from quantum_encryption_grid import QuantumEncryptionGrid, _issued_views, _mapped_file
+
+CHUNK_SIZE = 64 * 1024
+
+
+@pytest.fixture(scope="module")
+def grid():
+    return QuantumEncryptionGrid()
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "plain.bin"
+    path.write_bytes(os.urandom(3 * CHUNK_SIZE + 123))
+    return path
+
+
+@pytest.mark.parametrize("size", [0, 1, CHUNK_SIZE, 3 * CHUNK_SIZE + 123])
+def test_file_round_trip(grid, tmp_path, size):
+    data = os.urandom(size)
+    (tmp_path / "plain.bin").write_bytes(data)
+    encrypted = grid.encrypt_file(str(tmp_path / "plain.bin"), str(tmp_path / "plain.qeg"),
+                                  workers=2, chunk_size=CHUNK_SIZE)
+    assert encrypted['status'] == 'file_encrypted'
+    decrypted = grid.decrypt_file(str(tmp_path / "plain.qeg"), str(tmp_path / "plain.out"),
+                                  encrypted['encryption_keys'], workers=2)
+    assert decrypted['status'] == 'file_decrypted'
+    assert (tmp_path / "plain.out").read_bytes() == data
+    assert sorted(os.listdir(tmp_path)) == ["plain.bin", "plain.out", "plain.qeg"]
+
+
+def test_same_source_and_destination_is_rejected(grid, source):
+    data = source.read_bytes()
+    result = grid.encrypt_file(str(source), str(source), chunk_size=CHUNK_SIZE)
+    assert result['status'] == 'encryption_error'
+    assert source.read_bytes() == data
+
+    link = source.with_name("link.bin")
+    os.link(source, link)
+    assert grid.encrypt_file(str(source), str(link), chunk_size=CHUNK_SIZE)['status'] == 'encryption_error'
+    assert grid.decrypt_file(str(source), str(link), [b"\x00" * 32])['status'] == 'decryption_error'
+    assert source.read_bytes() == data
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_failed_decrypt_keeps_existing_destination(grid, source, tmp_path, workers):
+    encrypted = grid.encrypt_file(str(source), str(tmp_path / "plain.qeg"), chunk_size=CHUNK_SIZE)
+    container = bytearray((tmp_path / "plain.qeg").read_bytes())
+    container[2 * CHUNK_SIZE] ^= 1
+    (tmp_path / "plain.qeg").write_bytes(bytes(container))
+    (tmp_path / "plain.out").write_bytes(b"previous contents")
+
+    result = grid.decrypt_file(str(tmp_path / "plain.qeg"), str(tmp_path / "plain.out"),
+                               encrypted['encryption_keys'], workers=workers)
+    assert result['status'] == 'decryption_error'
+    assert 'authentication' in result['error']
+    assert (tmp_path / "plain.out").read_bytes() == b"previous contents"
+    assert sorted(os.listdir(tmp_path)) == ["plain.bin", "plain.out", "plain.qeg"]
+
+
+def test_missing_source_leaves_no_destination(grid, tmp_path):
+    result = grid.encrypt_file(str(tmp_path / "missing.bin"), str(tmp_path / "out.qeg"))
+    assert result['status'] == 'encryption_error'
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_worker_failure_reports_its_own_error(grid, source, tmp_path, monkeypatch, workers):
+    def failing_chunk(layer_keys, chunk):
+        if len(chunk) < CHUNK_SIZE:
+            raise RuntimeError("layer failed")
+        return bytes(2 * quantum_encryption_grid.BLOCK_SIZE)
+
+    monkeypatch.setattr(quantum_encryption_grid, '_encrypt_chunk', failing_chunk)
+    result = grid.encrypt_file(str(source), str(tmp_path / "plain.qeg"), workers=workers, chunk_size=CHUNK_SIZE)
+    assert result['status'] == 'encryption_error'
+    assert result['error'] == "layer failed"
+    assert sorted(os.listdir(tmp_path)) == ["plain.bin"]
+
+
+def _inspect_chunk(chunk):
+    head = bytes(chunk[:4])
+    raise RuntimeError(f"bad chunk starting {head!r}")
+
+
+def test_mapping_closes_without_clearing_traceback_locals(source):
+    with pytest.raises(RuntimeError) as failure:
+        with _mapped_file(str(source)) as view, _issued_views() as issued:
+            issued.append(view[:CHUNK_SIZE])
+            _inspect_chunk(issued[-1])
+    frame = failure.value.__traceback__
+    while frame.tb_next is not None:
+        frame = frame.tb_next
+    assert frame.tb_frame.f_locals['head'] == source.read_bytes()[:4]
@@ -0,0 +1,93 @@
+import subprocess
+import sys
+
+import pytest
+
+from file_watermarking import UTF8_BOM, WATERMARK_BEGIN, read_watermark, read_watermark_head, stamp_file
+
+TIMESTAMP = "2025-01-20T12:00:00+00:00"
+BODY = b"value = '\xc3\xa9t\xc3\xa9'\nprint(value)\n"
+
+
+def _stamp(tmp_path, source, name="module.py", comment=b"#"):
+    path = tmp_path / name
+    path.write_bytes(source)
+    result = stamp_file(str(path), name, TIMESTAMP, comment)
+    assert result.status == 'stamped', result.error
+    return path, result
+
+
+def _lines(path):
+    return path.read_bytes().splitlines(keepends=True)
+
+
+def _runs(path):
+    return subprocess.run([sys.executable, str(path)], capture_output=True).returncode == 0
+
+
+def test_header_goes_on_top_of_plain_files(tmp_path):
+    path, result = _stamp(tmp_path, BODY)
+    assert _lines(path)[0] == b"# " + WATERMARK_BEGIN + b"\n"
+    assert path.read_bytes().endswith(BODY)
+    assert read_watermark(str(path)) == (result.watermark_signature, result.content_hash)
+    assert read_watermark_head(str(path)) == ('present', result.watermark_signature)
+    assert _runs(path)
+
+
+def test_utf8_bom_stays_at_byte_zero(tmp_path):
+    path, result = _stamp(tmp_path, UTF8_BOM + BODY)
+    data = path.read_bytes()
+    assert data.startswith(UTF8_BOM + b"# " + WATERMARK_BEGIN)
+    assert data.count(UTF8_BOM) == 1
+    assert read_watermark_head(str(path)) == ('present', result.watermark_signature)
+    assert _runs(path)
+
+
+def test_utf8_bom_before_non_python_comments(tmp_path):
+    path, _ = _stamp(tmp_path, UTF8_BOM + b"console.log(1);\n", name="app.js", comment=b"//")
+    assert path.read_bytes().startswith(UTF8_BOM + b"// " + WATERMARK_BEGIN)
+
+
+@pytest.mark.parametrize('preamble', [
+    [b"#!/usr/bin/env python3\n"],
+    [b"# -*- coding: latin-1 -*-\n"],
+    [b"#!/usr/bin/env python3\n", b"# -*- coding: latin-1 -*-\n"],
+    [b"# Module notes\n", b"# vim: set fileencoding=latin-1 :\n"],
+    [b"\n", b"# coding=latin-1\n"],
+    [UTF8_BOM, b"#!/usr/bin/env python3\n"],
+])
+def test_preamble_stays_above_the_header(tmp_path, preamble):
+    body = b"value = '\xe9t\xe9'\nprint(value)\n" if b"latin-1" in b"".join(preamble) else BODY
+    path, result = _stamp(tmp_path, b"".join(preamble) + body)
+    data = path.read_bytes()
+    assert data.startswith(b"".join(preamble) + b"# " + WATERMARK_BEGIN)
+    assert data.endswith(body)
+    assert read_watermark_head(str(path)) == ('present', result.watermark_signature)
+    assert _runs(path)
+
+
+def test_cookie_on_line_two_needs_a_comment_on_line_one(tmp_path):
+    # PEP 263 ignores a cookie below a code line, so it is ordinary body here
+    source = b"import sys\n# -*- coding: latin-1 -*-\n"
+    path, _ = _stamp(tmp_path, source)
+    assert _lines(path)[0] == b"# " + WATERMARK_BEGIN + b"\n"
+    assert path.read_bytes().endswith(source)
+
+
+def test_ordinary_leading_comment_is_body(tmp_path):
+    path, _ = _stamp(tmp_path, b"# Module notes\n" + BODY)
+    assert _lines(path)[0] == b"# " + WATERMARK_BEGIN + b"\n"
+
+
+@pytest.mark.parametrize('source', [
+    BODY,
+    UTF8_BOM + BODY,
+    b"# Module notes\n# coding: latin-1\nvalue = '\xe9'\n",
+])
+def test_restamping_replaces_the_header_in_place(tmp_path, source):
+    path, first = _stamp(tmp_path, source)
+    stamped = path.read_bytes()
+    second = stamp_file(str(path), "module.py", TIMESTAMP)
+    assert second.status == 'stamped'
+    assert second.content_hash == first.content_hash
+    assert path.read_bytes() == stamped
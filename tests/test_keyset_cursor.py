@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from models import SecurityLog, ThreatDetection
+from routes import MAX_PER_PAGE, _decode_cursor, _encode_cursor
+
+BASE_TIME = datetime(2025, 1, 20, 12, 0, 0)
+
+
+def _add_logs(flask_app, timestamps):
+    with flask_app.app_context():
+        db.session.execute(db.insert(SecurityLog), [
+            {'event_type': 'encryption', 'event_data': str(i), 'timestamp': timestamp}
+            for i, timestamp in enumerate(timestamps)
+        ])
+        db.session.commit()
+        return [(log.timestamp, log.id) for log in SecurityLog.query]
+
+
+def _walk(client, path, key, **params):
+    """Every row of a listing, following next_cursor, and the number of pages fetched"""
+    rows, pages, cursor = [], 0, None
+    while True:
+        query = dict(params, **({'cursor': cursor} if cursor else {}))
+        response = client.get(path, query_string=query)
+        assert response.status_code == 200
+        body = response.get_json()
+        rows += body[key]
+        pages += 1
+        cursor = body['next_cursor']
+        if cursor is None:
+            return rows, pages
+
+
+def test_cursor_round_trip():
+    timestamp = datetime(2025, 1, 20, 12, 0, 0, 123456)
+    cursor = _encode_cursor(timestamp, 42)
+    assert '=' not in cursor
+    assert _decode_cursor(cursor) == (timestamp, 42)
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', '', 'W10', 'WyJ4IiwxXQ', 'WzEsMiwzXQ'])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        _decode_cursor(cursor)
+
+
+def test_malformed_cursor_is_a_bad_request(flask_app):
+    client = flask_app.test_client()
+    for path in ('/api/logs', '/api/threats'):
+        response = client.get(path, query_string={'cursor': 'WyJ4IiwxXQ'})
+        assert response.status_code == 400
+
+
+def test_pages_cover_every_row_once_in_order(flask_app):
+    expected = _add_logs(flask_app, [BASE_TIME + timedelta(seconds=i % 7) for i in range(53)])
+    rows, pages = _walk(flask_app.test_client(), '/api/logs', 'logs', per_page=10)
+    assert pages == 6
+    assert [row['id'] for row in rows] == [row_id for _, row_id in sorted(expected, reverse=True)]
+
+
+def test_equal_timestamps_are_ordered_by_id(flask_app):
+    expected = _add_logs(flask_app, [BASE_TIME] * 25)
+    rows, pages = _walk(flask_app.test_client(), '/api/logs', 'logs', per_page=4)
+    assert pages == 7
+    assert [row['id'] for row in rows] == sorted((row_id for _, row_id in expected), reverse=True)
+
+
+def test_exact_multiple_of_page_size_has_no_empty_last_page(flask_app):
+    _add_logs(flask_app, [BASE_TIME + timedelta(minutes=i) for i in range(20)])
+    rows, pages = _walk(flask_app.test_client(), '/api/logs', 'logs', per_page=10)
+    assert len(rows) == 20
+    assert pages == 2
+
+
+def test_rows_added_while_paging_do_not_shift_later_pages(flask_app):
+    _add_logs(flask_app, [BASE_TIME + timedelta(minutes=i) for i in range(10)])
+    client = flask_app.test_client()
+    first = client.get('/api/logs', query_string={'per_page': 5}).get_json()
+    _add_logs(flask_app, [BASE_TIME + timedelta(hours=1)])
+    second = client.get('/api/logs', query_string={'per_page': 5, 'cursor': first['next_cursor']}).get_json()
+    assert len(second['logs']) == 5
+    assert not {row['id'] for row in first['logs']} & {row['id'] for row in second['logs']}
+    assert second['next_cursor'] is None
+
+
+@pytest.mark.parametrize('per_page, expected', [(0, 1), (-5, 1), (10 ** 6, MAX_PER_PAGE)])
+def test_per_page_is_clamped(flask_app, per_page, expected):
+    _add_logs(flask_app, [BASE_TIME + timedelta(seconds=i) for i in range(MAX_PER_PAGE + 1)])
+    body = flask_app.test_client().get('/api/logs', query_string={'per_page': per_page}).get_json()
+    assert len(body['logs']) == expected
+    assert body['next_cursor'] is not None
+
+
+def test_total_is_only_counted_when_asked_for(flask_app):
+    _add_logs(flask_app, [BASE_TIME] * 3)
+    client = flask_app.test_client()
+    assert client.get('/api/logs').get_json()['total'] is None
+    assert client.get('/api/logs', query_string={'include_total': 1}).get_json()['total'] == 3
+
+
+def test_threat_pages(flask_app):
+    with flask_app.app_context():
+        db.session.execute(db.insert(ThreatDetection), [
+            {'threat_type': 'probe', 'severity': 'low', 'detected_at': BASE_TIME + timedelta(seconds=i // 3)}
+            for i in range(14)
+        ])
+        db.session.commit()
+    rows, pages = _walk(flask_app.test_client(), '/api/threats', 'threats', per_page=5)
+    assert pages == 3
+    keys = [(row['detected_at'], row['id']) for row in rows]
+    assert len(set(keys)) == 14
+    assert keys == sorted(keys, reverse=True)
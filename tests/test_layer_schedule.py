@@ -0,0 +1,63 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from Crypto.Cipher import AES
+from Crypto.Util.Padding import unpad
+
+from quantum_encryption_grid import BLOCK_SIZE, CHAINED_CBC_LIMIT, QuantumEncryptionGrid, _ChainedCBC
+
+
+def _plain_decrypt(package):
+    """Reference decryption with a fresh CBC context per layer, as before the cached schedule"""
+    data = package['encrypted_data']
+    for key in reversed(package['encryption_keys']):
+        data = unpad(AES.new(key, AES.MODE_CBC, data[:BLOCK_SIZE]).decrypt(data[BLOCK_SIZE:]), BLOCK_SIZE)
+    return data
+
+
+@pytest.fixture
+def grid():
+    return QuantumEncryptionGrid()
+
+
+def test_chained_context_matches_cbc_under_each_iv():
+    key = os.urandom(16)
+    chained = _ChainedCBC(key)
+    for size in (16, 32, 16, 4096, 48):
+        iv, data = os.urandom(BLOCK_SIZE), os.urandom(size)
+        assert chained.encrypt(iv, data) == AES.new(key, AES.MODE_CBC, iv).encrypt(data)
+
+
+def test_layer_keys_are_derived_from_the_quantum_key(grid):
+    expected = [hashlib.sha256(grid.quantum_key + str(layer).encode()).digest()[:16]
+                for layer in range(grid.encryption_layers)]
+    assert grid.quantum_encrypt(b"x")['encryption_keys'] == expected
+
+
+@pytest.mark.parametrize("size", [0, 1, 15, 16, 100, CHAINED_CBC_LIMIT - 100, CHAINED_CBC_LIMIT, 70000])
+def test_ciphertext_is_standard_layered_cbc(grid, size):
+    data = os.urandom(size)
+    first, second = grid.quantum_encrypt(data), grid.quantum_encrypt(data)
+    assert first['encrypted_data'] != second['encrypted_data']
+    assert _plain_decrypt(first) == _plain_decrypt(second) == data
+
+
+def test_concurrent_encryption_on_one_grid(grid):
+    payloads = [os.urandom(n % 300) for n in range(400)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        packages = list(executor.map(grid.quantum_encrypt, payloads))
+    assert [_plain_decrypt(package) for package in packages] == payloads
+
+
+def test_rotation_and_layer_changes_rebuild_the_contexts(grid):
+    before = grid.quantum_encrypt(b"before")
+    grid.rotate_key()
+    grid.encryption_layers = 3
+    after = grid.quantum_encrypt(b"after")
+    assert len(after['encryption_keys']) == 3
+    assert set(after['encryption_keys']).isdisjoint(before['encryption_keys'])
+    assert _plain_decrypt(before) == b"before"
+    assert _plain_decrypt(after) == b"after"
+    assert grid.quantum_decrypt(before)['decrypted_data'] == "before"
@@ -0,0 +1,89 @@
+import os
+import struct
+
+import pytest
+
+from quantum_encryption_grid import (
+    ENVELOPE_HEADER, PROFILE_LAYERED_CBC, QuantumEncryptionGrid, QuantumEnvelope, decode_envelope_wire,
+    encode_envelope_wire
+)
+
+
+@pytest.fixture
+def grid():
+    return QuantumEncryptionGrid()
+
+
+@pytest.mark.parametrize("size", [0, 1, 15, 16, 100, 4096])
+@pytest.mark.parametrize("chunk_size", [32, 1024 * 1024])
+def test_round_trip(grid, size, chunk_size):
+    data = os.urandom(size)
+    envelope = grid.seal_envelope(data, chunk_size=chunk_size, workers=2)
+    assert grid.open_envelope(envelope, workers=2) == data
+
+
+def test_header_describes_payload(grid):
+    envelope = grid.seal_envelope(b"x" * 100, chunk_size=32)
+    parsed = QuantumEnvelope.parse(envelope)
+    assert parsed.profile == PROFILE_LAYERED_CBC
+    assert parsed.key_id == grid.key_id
+    assert parsed.layers == grid.encryption_layers
+    assert len(parsed.chunk_lengths) == 4
+    assert parsed.payload_length == sum(parsed.chunk_lengths) == len(envelope) - len(parsed.header)
+
+
+def test_wire_form_round_trip(grid):
+    result = grid.quantum_encrypt_wire("héllo wörld")
+    assert result['status'] == 'encryption_successful'
+    assert result['key_id'] == grid.key_id.hex()
+    assert set(result['envelope']) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+    assert grid.quantum_decrypt_wire(result['envelope'])['decrypted_data'] == "héllo wörld"
+
+
+def test_wire_encoding_is_unpadded_base64url():
+    for size in range(6):
+        data = os.urandom(size)
+        text = encode_envelope_wire(data)
+        assert "=" not in text
+        assert decode_envelope_wire(text) == data
+
+
+def test_opens_envelopes_from_earlier_keys(grid):
+    envelope = grid.seal_envelope(b"before rotation")
+    grid.rotate_key()
+    assert QuantumEnvelope.parse(grid.seal_envelope(b"after")).key_id != QuantumEnvelope.parse(envelope).key_id
+    assert grid.open_envelope(envelope) == b"before rotation"
+
+
+def test_unknown_key_id_is_rejected(grid):
+    envelope = grid.seal_envelope(b"data")
+    with pytest.raises(ValueError, match="Unknown key id"):
+        QuantumEncryptionGrid().open_envelope(envelope)
+
+
+def _with_header_field(envelope, index, value):
+    fields = list(ENVELOPE_HEADER.unpack_from(envelope))
+    fields[index] = value
+    return ENVELOPE_HEADER.pack(*fields) + envelope[ENVELOPE_HEADER.size:]
+
+
+@pytest.mark.parametrize("mutate, message", [
+    (lambda e: e[:ENVELOPE_HEADER.size - 1], "truncated"),
+    (lambda e: e[:-1], "does not match"),
+    (lambda e: e + b"\x00", "does not match"),
+    (lambda e: _with_header_field(e, 0, b"XXXX"), "Not a quantum envelope"),
+    (lambda e: _with_header_field(e, 1, 99), "Unsupported envelope version"),
+    (lambda e: _with_header_field(e, 6, 5), "truncated|does not match"),
+    (lambda e: e[:ENVELOPE_HEADER.size] + struct.pack("<I", struct.unpack_from("<I", e, ENVELOPE_HEADER.size)[0] + 16)
+     + e[ENVELOPE_HEADER.size + 4:], "does not match"),
+])
+def test_malformed_envelopes_are_rejected(grid, mutate, message):
+    envelope = grid.seal_envelope(b"y" * 100, chunk_size=32)
+    with pytest.raises(ValueError, match=message):
+        grid.open_envelope(mutate(envelope))
+
+
+def test_wire_errors_are_reported_not_raised(grid):
+    result = grid.quantum_decrypt_wire("not-an-envelope")
+    assert result['status'] == 'decryption_error'
+    assert result['data_protected'] is True
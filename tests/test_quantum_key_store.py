@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import stat
+
+import pytest
+
+import quantum_key_store
+from quantum_encryption_grid import QuantumEncryptionGrid
+from quantum_key_store import QuantumKeyStore, _key_store_from_environment
+
+MASTER = bytes(range(32))
+NEW_MASTER = bytes(range(32, 64))
+
+
+@pytest.fixture
+def instance(tmp_path, monkeypatch):
+    """Default store paths moved under tmp_path, with no key store configured"""
+    instance_path = tmp_path / "instance"
+    monkeypatch.setattr(quantum_key_store, 'INSTANCE_PATH', str(instance_path))
+    monkeypatch.setattr(quantum_key_store, 'DEFAULT_KEY_STORE', str(instance_path / "quantum_keys.db"))
+    monkeypatch.setattr(quantum_key_store, 'DEFAULT_MASTER_KEY_FILE', str(tmp_path / "quantum_master.key"))
+    for name in ('QUANTUM_KEY_STORE', 'QUANTUM_MASTER_KEY', 'QUANTUM_MASTER_KEY_FILE', 'QUANTUM_PREVIOUS_MASTER_KEYS'):
+        monkeypatch.delenv(name, raising=False)
+    return tmp_path
+
+
+def test_default_store_is_file_backed_and_shared(instance):
+    first = _key_store_from_environment()
+    package = QuantumEncryptionGrid(first).quantum_encrypt(b"survives a restart")
+
+    second = _key_store_from_environment()
+    assert second.db_path == quantum_key_store.DEFAULT_KEY_STORE
+    assert second.active_key_id == first.active_key_id
+    assert QuantumEncryptionGrid(second).quantum_decrypt(package)['decrypted_data'] == "survives a restart"
+    assert stat.S_IMODE(os.stat(instance / "quantum_master.key").st_mode) == 0o600
+
+
+def test_memory_store_is_explicit(instance, monkeypatch):
+    monkeypatch.setenv('QUANTUM_KEY_STORE', ':memory:')
+    assert _key_store_from_environment().db_path == ':memory:'
+    assert not (instance / "instance").exists()
+
+
+def test_explicit_store_needs_a_master_key(instance, monkeypatch):
+    monkeypatch.setenv('QUANTUM_KEY_STORE', str(instance / "keys.db"))
+    with pytest.raises(RuntimeError):
+        _key_store_from_environment()
+    monkeypatch.setenv('QUANTUM_MASTER_KEY_FILE', str(instance / "master.key"))
+    with pytest.raises(ValueError):
+        _key_store_from_environment()
+    monkeypatch.setenv('QUANTUM_MASTER_KEY', MASTER.hex())
+    assert _key_store_from_environment().master_key == MASTER
+
+
+def test_rotation_keeps_earlier_data_readable(tmp_path):
+    store = QuantumKeyStore(str(tmp_path / "keys.db"), MASTER)
+    grid = QuantumEncryptionGrid(store)
+    packages = []
+    for _ in range(3):
+        packages.append((grid.quantum_encrypt(f"epoch {grid.key_epoch}".encode()), grid.key_id))
+        grid.rotate_key()
+    assert len(store) == 4
+    assert len({key_id for _, key_id in packages} | {store.active_key_id}) == 4
+    for package, _ in packages:
+        assert grid.quantum_decrypt(package)['status'] == 'decryption_successful'
+
+
+def test_master_rotation_rewraps_without_touching_data(tmp_path):
+    path = str(tmp_path / "keys.db")
+    store = QuantumKeyStore(path, MASTER)
+    grid = QuantumEncryptionGrid(store)
+    old = grid.seal_envelope(b"old epoch")
+    grid.rotate_key()
+
+    store.rotate_master(NEW_MASTER)
+    assert store.get_key_store_status()['stale_wraps'] == 2
+    assert store.rewrap_all() == 2
+    assert store.get_key_store_status()['stale_wraps'] == 0
+
+    # Only the new master is needed once every key is re-wrapped
+    reopened = QuantumEncryptionGrid(QuantumKeyStore(path, NEW_MASTER))
+    assert reopened.open_envelope(old) == b"old epoch"
+    with pytest.raises(KeyError):
+        QuantumKeyStore(path, MASTER).get_key(store.active_key_id)
+
+
+def _rotate_in_process(path):
+    QuantumKeyStore(path, MASTER).rotate()
+
+
+def test_rotation_in_another_process_is_picked_up(tmp_path):
+    path = str(tmp_path / "keys.db")
+    store = QuantumKeyStore(path, MASTER, active_key_poll_interval=0)
+    grid = QuantumEncryptionGrid(store)
+    before = grid.key_id
+
+    context = multiprocessing.get_context('spawn')
+    worker = context.Process(target=_rotate_in_process, args=(path,))
+    worker.start()
+    worker.join(60)
+    assert worker.exitcode == 0
+
+    assert store.active_key_id != before
+    envelope = grid.seal_envelope(b"after rotation")
+    assert grid.key_id == store.active_key_id
+    assert QuantumEncryptionGrid(QuantumKeyStore(path, MASTER)).open_envelope(envelope) \
+        == b"after rotation"
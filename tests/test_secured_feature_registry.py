@@ -0,0 +1,52 @@
+from dataclasses import replace
+
+import pytest
+
+from enhanced_copyright_watermarking import CORE_FEATURES, EnhancedCopyrightWatermarkingSystem
+
+
+@pytest.fixture
+def registry():
+    return EnhancedCopyrightWatermarkingSystem(deterministic=True).secured_features
+
+
+def test_nothing_is_built_until_looked_up(registry):
+    assert len(registry) == len(CORE_FEATURES)
+    assert registry.cached_count == 0
+    name = CORE_FEATURES[1][0]
+    assert registry["QF-00002"] is registry[name]
+    assert registry.cached_count == 1
+
+
+def test_unknown_and_non_string_keys(registry):
+    assert "QF-00000" not in registry
+    assert f"QF-{len(CORE_FEATURES) + 1:05d}" not in registry
+    assert "no such feature" not in registry
+    assert 5 not in registry
+    assert None not in registry
+    assert registry.get(5) is None
+    with pytest.raises(KeyError):
+        registry["QF-99999"]
+    with pytest.raises(KeyError):
+        registry[None]
+    assert registry.cached_count == 0
+
+
+def test_list_style_access_still_works(registry):
+    assert registry[0].feature_id == "QF-00001"
+    assert registry[-1] is registry[len(registry) - 1]
+    assert [feature.feature_id for feature in registry[1:3]] == ["QF-00002", "QF-00003"]
+    assert registry[0] in registry
+    assert replace(registry[0], feature_name="renamed") not in registry
+    with pytest.raises(IndexError):
+        registry[len(registry)]
+
+
+def test_lru_is_bounded(registry):
+    registry.cache_size = 2
+    first = registry[0]
+    registry[1], registry[2]
+    assert registry.cached_count == 2
+    assert registry[0] is not first
+    assert registry[0].watermark.watermark_signature == first.watermark.watermark_signature
+    assert first in registry
@@ -0,0 +1,116 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from app import db
+from dashboard_aggregates import DashboardAggregates, dashboard_aggregates
+from models import SecurityLog
+from security_log_buffer import SecurityLogBuffer
+
+
+def _rows(count, event_type='ingest'):
+    return [{'event_type': event_type, 'event_data': str(i), 'result': None, 'timestamp': datetime.utcnow()}
+            for i in range(count)]
+
+
+def _stored(flask_app):
+    with flask_app.app_context():
+        return [log.event_data for log in SecurityLog.query.order_by(SecurityLog.id)]
+
+
+def _wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "buffer did not drain in time"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def make_buffer(flask_app):
+    buffers = []
+
+    def make(**options):
+        buffers.append(SecurityLogBuffer(flask_app, **options))
+        return buffers[-1]
+
+    yield make
+    for buffer in buffers:
+        buffer.close()
+
+
+def test_flush_writes_queued_rows_in_batches(flask_app, make_buffer):
+    buffer = make_buffer(batch_size=100, flush_interval=60)
+    assert buffer.add_many(_rows(250)) == 250
+    assert buffer.flush()
+    assert len(buffer) == 0
+    # The background thread may commit some of the batches, so only the contents are fixed
+    assert sorted(_stored(flask_app), key=int) == [str(i) for i in range(250)]
+    status = buffer.get_buffer_status()
+    assert status['flushed_events'] == 250
+    assert status['flushes'] == 3
+
+
+def test_background_thread_flushes_after_interval(flask_app, make_buffer):
+    buffer = make_buffer(batch_size=1000, flush_interval=0.05)
+    assert buffer.add('heartbeat', event_data='x')
+    _wait_for(lambda: buffer.flushed_events == 1)
+    assert _stored(flask_app) == ['x']
+
+
+def test_full_buffer_rejects_the_overflow(flask_app, make_buffer):
+    buffer = make_buffer(batch_size=1000, flush_interval=60, max_pending=5)
+    assert buffer.add_many(_rows(8)) == 5
+    assert buffer.add_many(_rows(1)) == 0
+    status = buffer.get_buffer_status()
+    assert (status['accepted_events'], status['rejected_events'], status['peak_queue_depth']) == (5, 4, 5)
+
+
+def test_close_flushes_and_stops_accepting(flask_app, make_buffer):
+    buffer = make_buffer(batch_size=1000, flush_interval=60)
+    buffer.add_many(_rows(7))
+    buffer.close()
+    assert len(_stored(flask_app)) == 7
+    assert buffer.add_many(_rows(1)) == 0
+    assert buffer.get_buffer_status()['buffer'] == 'closed'
+
+
+def test_failing_rows_are_isolated_and_dead_lettered(flask_app, make_buffer):
+    buffer = make_buffer(batch_size=64, flush_interval=0.001, max_retries=2)
+    rows = _rows(250)
+    # event_type is NOT NULL, so these two rows can never be written
+    rows[17]['event_type'] = None
+    rows[200]['event_type'] = None
+    buffer.add_many(rows)
+    _wait_for(lambda: buffer.flushed_events + buffer.dead_lettered_events == 250)
+    assert sorted(row['event_data'] for row in buffer.dead_letters) == ['17', '200']
+    assert sorted(_stored(flask_app), key=int) == [str(i) for i in range(250) if i not in (17, 200)]
+    status = buffer.get_buffer_status()
+    assert status['dead_lettered_events'] == 2
+    assert status['dead_letter_depth'] == 2
+    assert status['queue_depth'] == 0
+
+
+def test_flush_updates_the_dashboard_snapshot(flask_app, make_buffer):
+    with flask_app.app_context():
+        dashboard_aggregates._snapshot = None
+        before = dashboard_aggregates.get()['event_types'].get('ingest', 0)
+    buffer = make_buffer(batch_size=1000, flush_interval=60)
+    buffer.add_many(_rows(12))
+    assert buffer.flush()
+    with flask_app.app_context():
+        assert dashboard_aggregates.get()['event_types']['ingest'] == before + 12
+
+
+def test_deltas_from_before_a_refresh_are_dropped(flask_app):
+    aggregates = DashboardAggregates(ttl=60)
+    with flask_app.app_context():
+        aggregates.get()
+        generation = aggregates.generation
+        aggregates.record_events({'ingest': 3}, generation)
+        assert aggregates.get()['event_types']['ingest'] == 3
+        aggregates._refreshed_at = 0.0
+        aggregates.get()
+        # The write started before the refresh, so the refresh may already count it
+        aggregates.record_events({'ingest': 5}, generation)
+        assert aggregates.get()['event_types'].get('ingest', 0) == 0
@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from quantum_encryption_grid import (
+    ENVELOPE_HEADER, GCM_NONCE_SIZE, GCM_TAG_SIZE, PROFILE_AES_GCM, QuantumEncryptionGrid, QuantumEnvelope,
+    encode_envelope_wire
+)
+
+OVERHEAD = GCM_NONCE_SIZE + GCM_TAG_SIZE
+
+
+@pytest.fixture
+def grid():
+    return QuantumEncryptionGrid()
+
+
+@pytest.fixture
+def sealed(grid):
+    """A three-chunk AEAD envelope with equal-length chunks"""
+    return grid.seal_envelope(b"0123456789abcdef" * 6, chunk_size=32, security_level='aead')
+
+
+@pytest.mark.parametrize("size", [0, 1, 31, 32, 100, 4096])
+def test_aead_round_trip(grid, size):
+    data = os.urandom(size)
+    envelope = grid.seal_envelope(data, chunk_size=32, workers=2, security_level='aead')
+    assert grid.open_envelope(envelope, workers=2) == data
+
+
+def test_aead_is_one_layer_with_fixed_overhead(grid, sealed):
+    parsed = QuantumEnvelope.parse(sealed)
+    assert parsed.profile == PROFILE_AES_GCM
+    assert parsed.layers == 1
+    assert parsed.chunk_lengths == (32 + OVERHEAD,) * 3
+    assert len(sealed) - 96 == len(parsed.header) + 3 * OVERHEAD
+
+
+def _flip(envelope, offset):
+    return envelope[:offset] + bytes([envelope[offset] ^ 1]) + envelope[offset + 1:]
+
+
+def _with_header_field(envelope, index, value):
+    fields = list(ENVELOPE_HEADER.unpack_from(envelope))
+    fields[index] = value
+    return ENVELOPE_HEADER.pack(*fields) + envelope[ENVELOPE_HEADER.size:]
+
+
+def _swap_first_chunks(envelope):
+    parsed = QuantumEnvelope.parse(envelope)
+    first, second, *rest = [bytes(chunk) for chunk in parsed.chunks()]
+    return bytes(parsed.header) + second + first + b''.join(rest)
+
+
+@pytest.mark.parametrize("mutate, message", [
+    (lambda e: _flip(e, len(e) - GCM_TAG_SIZE - 1), "MAC check failed"),
+    (lambda e: _flip(e, len(e) - 1), "MAC check failed"),
+    (lambda e: _with_header_field(e, 5, 0), "MAC check failed"),
+    (_swap_first_chunks, "MAC check failed"),
+    (lambda e: _with_header_field(e, 2, 7), "Unsupported envelope profile 7"),
+])
+def test_tampered_aead_envelopes_are_rejected(grid, sealed, mutate, message):
+    with pytest.raises(ValueError, match=message):
+        grid.open_envelope(mutate(sealed))
+
+
+def test_short_aead_chunk_is_rejected(grid):
+    parsed = QuantumEnvelope.parse(grid.seal_envelope(b"x", security_level='aead'))
+    envelope = ENVELOPE_HEADER.pack(*ENVELOPE_HEADER.unpack_from(parsed.header)[:-1], OVERHEAD - 1) \
+        + (OVERHEAD - 1).to_bytes(4, 'little') + bytes(OVERHEAD - 1)
+    with pytest.raises(ValueError, match="invalid length"):
+        grid.open_envelope(envelope)
+
+
+def test_unknown_security_level(grid):
+    with pytest.raises(ValueError, match="Unknown security level"):
+        grid.seal_envelope(b"data", security_level='fast')
+    result = grid.quantum_encrypt_wire("data", security_level='fast')
+    assert result['status'] == 'encryption_error'
+    assert result['fallback_active'] is True
+
+
+@pytest.mark.parametrize("text", ["", "A", "not base64!", "QUVHRQ", "ünïcode"])
+def test_malformed_wire_text_is_reported(grid, text):
+    result = grid.quantum_decrypt_wire(text)
+    assert result['status'] == 'decryption_error'
+    assert result['data_protected'] is True
+
+
+def test_tampered_wire_envelope_is_reported(grid, sealed):
+    result = grid.quantum_decrypt_wire(encode_envelope_wire(_flip(sealed, len(sealed) - 1)))
+    assert result['status'] == 'decryption_error'
+    assert "MAC check failed" in result['error']
+
+
+@pytest.fixture
+def client(flask_app):
+    return flask_app.test_client()
+
+
+@pytest.mark.parametrize("security_level", ['maximum', 'aead'])
+def test_api_round_trip(client, security_level):
+    response = client.post('/api/encrypt', json={'data': "héllo", 'security_level': security_level})
+    assert response.status_code == 200
+    wire = response.get_json()['encrypted_data']
+    response = client.post('/api/decrypt', json={'encrypted_data': wire})
+    assert response.status_code == 200
+    assert response.get_json()['decrypted_data'] == "héllo"
+
+
+@pytest.mark.parametrize("security_level", ['fast', 1, None, ['aead']])
+def test_api_rejects_unknown_security_levels(client, security_level):
+    response = client.post('/api/encrypt', json={'data': "x", 'security_level': security_level})
+    assert response.status_code == 400
+    assert "security_level must be one of" in response.get_json()['error']
+
+
+def test_api_rejects_bad_wire_text(client):
+    response = client.post('/api/decrypt', json={'encrypted_data': "not an envelope"})
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
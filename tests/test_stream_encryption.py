@@ -0,0 +1,101 @@
+import io
+import os
+import tracemalloc
+
+import pytest
+
+from quantum_encryption_grid import QuantumEncryptionGrid
+
+
+class _TrickleReader:
+    """Returns at most step bytes per read, like a pipe or socket"""
+
+    def __init__(self, data, step=7):
+        self._buffer = io.BytesIO(data)
+        self._step = step
+
+    def read(self, size):
+        return self._buffer.read(min(size, self._step))
+
+
+class _NullWriter:
+    def write(self, data):
+        return len(data)
+
+
+@pytest.fixture
+def grid():
+    return QuantumEncryptionGrid()
+
+
+def _encrypt(grid, data, **options):
+    output = io.BytesIO()
+    result = grid.quantum_encrypt_stream(io.BytesIO(data), output, **options)
+    assert result['status'] == 'stream_encrypted', result
+    return output.getvalue(), result
+
+
+@pytest.mark.parametrize("size", [0, 1, 15, 16, 17, 1000, 4099])
+@pytest.mark.parametrize("chunk_size", [1, 16, 100, 1024 * 1024])
+def test_round_trip_across_chunk_boundaries(grid, size, chunk_size):
+    data = os.urandom(size)
+    ciphertext, result = _encrypt(grid, data, chunk_size=chunk_size)
+    assert (result['bytes_in'], result['bytes_out']) == (size, len(ciphertext))
+    output = io.BytesIO()
+    decrypted = grid.quantum_decrypt_stream(io.BytesIO(ciphertext), output, result['encryption_keys'],
+                                            chunk_size=chunk_size)
+    assert decrypted['status'] == 'stream_decrypted'
+    assert output.getvalue() == data
+
+
+def test_stream_output_is_quantum_encrypt_compatible(grid):
+    text = "stream → package " * 300
+    ciphertext, result = _encrypt(grid, text.encode(), chunk_size=64)
+    package = {'encrypted_data': ciphertext, 'encryption_keys': result['encryption_keys']}
+    assert grid.quantum_decrypt(package)['decrypted_data'] == text
+
+    package = grid.quantum_encrypt(text)
+    output = io.BytesIO()
+    grid.quantum_decrypt_stream(io.BytesIO(package['encrypted_data']), output, package['encryption_keys'])
+    assert output.getvalue().decode() == text
+
+
+def test_short_reads(grid):
+    data = os.urandom(5000)
+    output = io.BytesIO()
+    result = grid.quantum_encrypt_stream(_TrickleReader(data), output)
+    decrypted = io.BytesIO()
+    grid.quantum_decrypt_stream(_TrickleReader(output.getvalue(), 5), decrypted, result['encryption_keys'])
+    assert decrypted.getvalue() == data
+
+
+@pytest.mark.parametrize("damage", [
+    lambda c: c[:-1],
+    lambda c: c[:-16],
+    lambda c: c[:10],
+    lambda c: b"",
+])
+def test_truncated_streams_are_reported(grid, damage):
+    ciphertext, result = _encrypt(grid, os.urandom(300))
+    decrypted = grid.quantum_decrypt_stream(io.BytesIO(damage(ciphertext)), io.BytesIO(), result['encryption_keys'])
+    assert decrypted['status'] == 'decryption_error'
+    assert decrypted['data_protected'] is True
+
+
+def test_wrong_keys_are_reported(grid):
+    ciphertext, _ = _encrypt(grid, os.urandom(300))
+    other_keys = QuantumEncryptionGrid().quantum_encrypt(b"x")['encryption_keys']
+    decrypted = grid.quantum_decrypt_stream(io.BytesIO(ciphertext), io.BytesIO(), other_keys)
+    assert decrypted['status'] == 'decryption_error'
+
+
+def test_memory_stays_bounded_by_the_chunk(grid):
+    data = os.urandom(16 * 1024 * 1024)
+    tracemalloc.start()
+    try:
+        result = grid.quantum_encrypt_stream(io.BytesIO(data), _NullWriter(), chunk_size=64 * 1024)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert result['bytes_in'] == len(data)
+    assert peak < 2 * 1024 * 1024
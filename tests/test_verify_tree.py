@@ -0,0 +1,92 @@
+import shutil
+
+import pytest
+
+from file_watermarking import build_watermark_header, verify_tree, watermark_tree
+from watermark_manifest import WatermarkManifest
+from watermark_signature_index import SignatureIndex
+
+TIMESTAMP = "2025-01-20T12:00:00+00:00"
+
+
+@pytest.fixture
+def stamped(tmp_path):
+    """A stamped tree and its manifest"""
+    root = tmp_path / "src"
+    (root / "pkg").mkdir(parents=True)
+    for name in ('a.py', 'b.py', 'pkg/c.py'):
+        (root / name).write_bytes(f"NAME = {name!r}\n".encode())
+    (root / "d.js").write_bytes(b"export const d = 4;\n")
+    with WatermarkManifest(str(tmp_path / "manifest.db")) as manifest:
+        watermark_tree(str(root), workers=1, manifest=manifest)
+        yield root, manifest
+
+
+def _verify(stamped, **options):
+    root, manifest = stamped
+    return verify_tree(str(root), manifest, workers=1, **options)
+
+
+def test_freshly_stamped_tree_is_valid(stamped):
+    report = _verify(stamped)
+    assert (report['files_scanned'], report['files_valid']) == (4, 4)
+
+
+def test_pool_and_in_process_scans_agree(stamped):
+    root, manifest = stamped
+    (root / "b.py").write_bytes(b"stripped = True\n")
+    in_process = verify_tree(str(root), manifest, workers=1)
+    pooled = verify_tree(str(root), manifest, workers=2, batch_size=1)
+    for key in ('files_valid', 'files_missing', 'missing_paths'):
+        assert pooled[key] == in_process[key]
+
+
+def test_missing_and_empty_files(stamped):
+    root, _ = stamped
+    (root / "b.py").write_bytes(b"NAME = 'b.py'\n")
+    (root / "e.py").write_bytes(b"")
+    report = _verify(stamped)
+    assert sorted(report['missing_paths']) == ['b.py', 'e.py']
+    assert report['files_valid'] == 3
+
+
+def test_body_edits_need_a_deep_scan(stamped):
+    root, _ = stamped
+    path = root / "pkg/c.py"
+    path.write_bytes(path.read_bytes() + b"EDITED = True\n")
+    assert _verify(stamped)['files_valid'] == 4
+    report = _verify(stamped, deep=True)
+    assert report['tampered_paths'] == ['pkg/c.py']
+    assert report['deep_verification'] is True
+
+
+def test_rewritten_copied_and_malformed_signatures_are_tampered(stamped):
+    root, manifest = stamped
+    path = root / "a.py"
+    signature = manifest.get('a.py').watermark_signature.encode()
+    path.write_bytes(path.read_bytes().replace(signature, signature[::-1]))
+    shutil.copy(root / "b.py", root / "copy.py")
+    path = root / "pkg/c.py"
+    path.write_bytes(path.read_bytes().replace(manifest.get('pkg/c.py').watermark_signature.encode(), b"XYZ"))
+
+    report = _verify(stamped)
+    assert sorted(report['tampered_paths']) == ['a.py', 'copy.py', 'pkg/c.py']
+    assert report['files_valid'] == 2
+
+
+def test_headers_we_never_issued_are_foreign(stamped):
+    root, _ = stamped
+    (root / "vendored.py").write_bytes(build_watermark_header(b"#", TIMESTAMP, b"F" * 32) + b"x = 1\n")
+    report = _verify(stamped)
+    assert report['foreign_paths'] == ['vendored.py']
+
+
+def test_signature_index_answers_for_the_manifest(stamped):
+    root, manifest = stamped
+    index = SignatureIndex.build(manifest.iter_signatures())
+    shutil.copy(root / "a.py", root / "copy.py")
+    (root / "vendored.py").write_bytes(build_watermark_header(b"#", TIMESTAMP, b"F" * 32) + b"x = 1\n")
+    report = _verify(stamped, signature_index=index)
+    assert report['tampered_paths'] == ['copy.py']
+    assert report['foreign_paths'] == ['vendored.py']
+    assert report['files_valid'] == 4
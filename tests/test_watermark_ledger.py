@@ -0,0 +1,157 @@
+import multiprocessing
+
+import pytest
+
+from watermark_ledger import EMPTY_ROOT, WatermarkLedger, leaf_hash, node_hash, verify_inclusion
+
+TIMESTAMP = "2025-01-20T12:00:00+00:00"
+
+
+def _entries(start, stop):
+    return [(f"feature_{i}", TIMESTAMP, f"{i:032X}") for i in range(start, stop)]
+
+
+def _reference_root(leaves):
+    """RFC 6962 Merkle tree hash, computed directly"""
+    if not leaves:
+        return EMPTY_ROOT
+    if len(leaves) == 1:
+        return leaves[0]
+    split = 1 << ((len(leaves) - 1).bit_length() - 1)
+    return node_hash(_reference_root(leaves[:split]), _reference_root(leaves[split:]))
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = WatermarkLedger(str(tmp_path / "ledger.db"))
+    yield ledger
+    ledger.conn.close()
+
+
+def test_empty_ledger_root(ledger):
+    assert len(ledger) == 0
+    assert ledger.root() == EMPTY_ROOT.hex()
+
+
+def test_root_matches_reference_tree_at_every_size(ledger):
+    leaves = []
+    for entry in _entries(0, 40):
+        ledger.append_entries([entry])
+        leaves.append(leaf_hash(*entry))
+        assert ledger.root() == _reference_root(leaves).hex()
+
+
+def test_inclusion_proofs_verify_for_every_leaf(ledger):
+    entries = _entries(0, 23)
+    ledger.append_entries(entries)
+    root = ledger.root()
+    for index, entry in enumerate(entries):
+        proof = ledger.prove(entry[2])
+        assert proof['leaf_index'] == index
+        assert proof['tree_size'] == len(entries)
+        assert proof['merkle_root'] == root
+        assert verify_inclusion(leaf_hash(*entry), proof['proof'], root)
+
+
+def test_inclusion_proof_rejects_tampering(ledger):
+    entries = _entries(0, 11)
+    ledger.append_entries(entries)
+    proof = ledger.prove(entries[5][2])
+    root = proof['merkle_root']
+
+    altered_entry = (entries[5][0], entries[5][1], entries[6][2])
+    assert not verify_inclusion(leaf_hash(*altered_entry), proof['proof'], root)
+
+    side, sibling = proof['proof'][0]
+    flipped = format(int(sibling[0], 16) ^ 1, 'x') + sibling[1:]
+    assert not verify_inclusion(leaf_hash(*entries[5]), [(side, flipped)] + proof['proof'][1:], root)
+
+    swapped = [('right' if side == 'left' else 'left', sibling) for side, sibling in proof['proof']]
+    assert not verify_inclusion(leaf_hash(*entries[5]), swapped, root)
+
+
+def test_unknown_signature_has_no_proof(ledger):
+    ledger.append_entries(_entries(0, 3))
+    assert ledger.prove("F" * 32) is None
+
+
+def test_appends_are_consistent_with_earlier_roots(tmp_path):
+    """Every earlier root stays the Merkle root of a prefix of the grown ledger, across reopening"""
+    path = str(tmp_path / "ledger.db")
+    ledger = WatermarkLedger(path)
+    roots = {}
+    for start, stop in ((0, 1), (1, 6), (6, 17), (17, 33)):
+        ledger.append_entries(_entries(start, stop))
+        roots[stop] = ledger.root()
+    ledger.conn.close()
+
+    reopened = WatermarkLedger(path)
+    try:
+        assert len(reopened) == 33
+        assert reopened.root() == roots[33]
+        leaves = [leaf_hash(*entry) for entry in _entries(0, 33)]
+        for size, root in roots.items():
+            assert _reference_root(leaves[:size]).hex() == root
+
+        reopened.append_entries(_entries(33, 40))
+        old_proof = reopened.prove(_entries(0, 1)[0][2])
+        assert verify_inclusion(leaves[0], old_proof['proof'], reopened.root())
+    finally:
+        reopened.conn.close()
+
+
+def test_duplicate_signatures_are_skipped(ledger):
+    assert ledger.append_entries(_entries(0, 4)) == 4
+    root = ledger.root()
+    assert ledger.append_entries(_entries(2, 6) + _entries(5, 6)) == 2
+    assert len(ledger) == 6
+    assert ledger.root() != root
+
+
+def test_instances_sharing_a_database_interleave_appends(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    first, second = WatermarkLedger(path), WatermarkLedger(path)
+    try:
+        for start in range(0, 40, 5):
+            writer, reader = (first, second) if start % 10 else (second, first)
+            assert writer.append_entries(_entries(start, start + 5)) == 5
+            leaves = [leaf_hash(*entry) for entry in _entries(0, start + 5)]
+            assert len(reader) == start + 5
+            assert reader.root() == writer.root() == _reference_root(leaves).hex()
+            newest = reader.prove(_entries(start + 4, start + 5)[0][2])
+            assert newest['tree_size'] == start + 5
+            assert verify_inclusion(leaves[-1], newest['proof'], newest['merkle_root'])
+        # A signature one instance appended is a duplicate for the other
+        assert first.append_entries(_entries(0, 3)) == 0
+    finally:
+        first.conn.close()
+        second.conn.close()
+
+
+def _append_in_process(path, start, stop):
+    ledger = WatermarkLedger(path)
+    for index in range(start, stop):
+        ledger.append_entries(_entries(index, index + 1))
+    ledger.conn.close()
+
+
+def test_concurrent_processes_build_one_tree(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=_append_in_process, args=(path, start, start + 25))
+               for start in range(0, 100, 25)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    ledger = WatermarkLedger(path)
+    try:
+        rows = ledger.conn.execute(
+            'SELECT feature_name, creation_timestamp, watermark_signature FROM ledger_leaves ORDER BY leaf_index'
+        ).fetchall()
+        assert sorted(rows) == sorted(_entries(0, 100))
+        assert ledger.root() == _reference_root([leaf_hash(*row) for row in rows]).hex()
+    finally:
+        ledger.conn.close()
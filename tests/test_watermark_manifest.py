@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from file_watermarking import read_watermark, watermark_tree
+from watermark_manifest import WatermarkManifest
+
+SOURCES = {
+    'a.py': b"print('a')\n",
+    'b.js': b"console.log('b');\n",
+    'pkg/c.py': b"VALUE = 3\n",
+    'notes.txt': b"not source\n",
+    '__pycache__/d.py': b"skipped\n",
+}
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "src"
+    for name, content in SOURCES.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return root
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    with WatermarkManifest(str(tmp_path / "manifest.db")) as manifest:
+        yield manifest
+
+
+def test_first_run_stamps_and_records_every_source_file(tree, manifest):
+    report = watermark_tree(str(tree), workers=1, manifest=manifest)
+    assert (report['files_processed'], report['files_stamped']) == (3, 3)
+    entries = manifest.entries()
+    assert sorted(entries) == ['a.py', 'b.js', 'pkg/c.py']
+    for name, entry in entries.items():
+        path = tree / name
+        assert (entry.size, entry.mtime_ns) == (path.stat().st_size, path.stat().st_mtime_ns)
+        assert read_watermark(str(path), b"//" if name.endswith(".js") else b"#") \
+            == (entry.watermark_signature, entry.content_hash)
+    assert (tree / "notes.txt").read_bytes() == SOURCES['notes.txt']
+    assert (tree / "__pycache__/d.py").read_bytes() == SOURCES['__pycache__/d.py']
+
+
+def test_rerun_skips_unchanged_files(tree, manifest):
+    watermark_tree(str(tree), workers=1, manifest=manifest)
+    before = {path: (tree / path).read_bytes() for path in manifest.entries()}
+    report = watermark_tree(str(tree), workers=2, manifest=manifest)
+    assert (report['files_stamped'], report['files_unchanged']) == (0, 3)
+    assert {path: (tree / path).read_bytes() for path in before} == before
+
+
+def test_touched_file_keeps_its_signature(tree, manifest):
+    watermark_tree(str(tree), workers=1, manifest=manifest)
+    entry = manifest.get('a.py')
+    path = tree / "a.py"
+    os.utime(path, ns=(entry.mtime_ns + 10 ** 9, entry.mtime_ns + 10 ** 9))
+
+    report = watermark_tree(str(tree), workers=1, manifest=manifest)
+    assert report['files_stamped'] == 0
+    touched = manifest.get('a.py')
+    assert touched.mtime_ns == entry.mtime_ns + 10 ** 9
+    assert touched.watermark_signature == entry.watermark_signature
+
+
+def test_edited_file_is_resigned(tree, manifest):
+    watermark_tree(str(tree), workers=1, manifest=manifest)
+    entry = manifest.get('pkg/c.py')
+    path = tree / "pkg/c.py"
+    path.write_bytes(path.read_bytes() + b"OTHER = 4\n")
+
+    report = watermark_tree(str(tree), workers=1, manifest=manifest)
+    assert report['files_stamped'] == 1
+    resigned = manifest.get('pkg/c.py')
+    assert resigned.watermark_signature != entry.watermark_signature
+    assert read_watermark(str(path)) == (resigned.watermark_signature, resigned.content_hash)
+    assert path.read_bytes().count(b"BEGIN COPYRIGHT WATERMARK") == 1
+
+
+def test_deleted_files_are_pruned(tree, manifest):
+    watermark_tree(str(tree), workers=1, manifest=manifest)
+    (tree / "b.js").unlink()
+    report = watermark_tree(str(tree), workers=1, manifest=manifest)
+    assert report['manifest_entries_pruned'] == 1
+    assert sorted(manifest.entries()) == ['a.py', 'pkg/c.py']
+
+
+def test_manifest_survives_reopening(tree, tmp_path):
+    path = str(tmp_path / "manifest.db")
+    with WatermarkManifest(path) as manifest:
+        watermark_tree(str(tree), workers=1, manifest=manifest)
+    with WatermarkManifest(path) as manifest:
+        assert len(manifest) == 3
+        assert watermark_tree(str(tree), workers=1, manifest=manifest)['files_stamped'] == 0
+        watermark = manifest.watermark('a.py')
+        assert watermark.watermark_signature == manifest.get('a.py').watermark_signature
+        assert sorted(manifest.iter_signatures()) == sorted(w.watermark_signature for w in manifest.iter_watermarks())
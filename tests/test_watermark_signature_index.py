@@ -0,0 +1,78 @@
+import importlib
+import struct
+
+import pytest
+
+import watermark_signature_index
+from watermark_signature_index import HEADER_FORMAT, HEADER_SIZE, INDEX_MAGIC, INDEX_VERSION, SignatureIndex
+
+SIGNATURES = [f"{i * 7919:032X}" for i in range(1, 501)] + ["0" * 32]
+
+
+@pytest.fixture
+def saved(tmp_path):
+    path = tmp_path / "signatures.idx"
+    SignatureIndex.build(SIGNATURES).save(str(path))
+    return path
+
+
+def test_build_answers_exactly():
+    index = SignatureIndex.build(SIGNATURES)
+    assert len(index) == len(SIGNATURES)
+    assert all(signature in index for signature in SIGNATURES)
+    assert all(signature.lower() in index for signature in SIGNATURES[:10])
+    assert f"{10 ** 9:032X}" not in index
+    assert "not hex" not in index
+    assert "AB" not in index
+
+
+def test_saved_index_is_memory_mapped(saved):
+    index = SignatureIndex.load(str(saved))
+    try:
+        assert index.get_index_status()['memory_mapped']
+        assert all(signature in index for signature in SIGNATURES)
+        assert f"{10 ** 9:032X}" not in index
+    finally:
+        index.close()
+
+
+def _header(bloom_bits=64, slots=16, bloom_hashes=3):
+    return struct.pack(HEADER_FORMAT, INDEX_MAGIC, INDEX_VERSION, 0, bloom_hashes,
+                       bloom_bits, slots, 0).ljust(HEADER_SIZE, b"\x00")
+
+
+@pytest.mark.parametrize('content', [
+    b"",
+    INDEX_MAGIC,
+    b"x" * 100,
+    _header()[:HEADER_SIZE - 1],
+    _header(),
+    _header(bloom_bits=0),
+    _header(bloom_bits=60),
+    _header(slots=0),
+    _header(slots=24),
+    _header(bloom_hashes=0),
+])
+def test_damaged_files_raise_value_error(tmp_path, content):
+    path = tmp_path / "damaged.idx"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        SignatureIndex.load(str(path))
+
+
+def test_truncated_default_index_falls_back_to_empty(tmp_path, monkeypatch, saved):
+    damaged = tmp_path / "damaged.idx"
+    damaged.write_bytes(saved.read_bytes()[:HEADER_SIZE // 2])
+    monkeypatch.setenv("WATERMARK_SIGNATURE_INDEX", str(damaged))
+    try:
+        module = importlib.reload(watermark_signature_index)
+        assert len(module.signature_index) == 0
+        assert not module.signature_index.get_index_status()['memory_mapped']
+
+        monkeypatch.setenv("WATERMARK_SIGNATURE_INDEX", str(saved))
+        module = importlib.reload(watermark_signature_index)
+        assert SIGNATURES[3] in module.signature_index
+        module.signature_index.close()
+    finally:
+        monkeypatch.delenv("WATERMARK_SIGNATURE_INDEX")
+        importlib.reload(watermark_signature_index)
@@ -0,0 +1,63 @@
+from dataclasses import asdict, replace
+
+import pytest
+
+from enhanced_copyright_watermarking import EnhancedCopyrightWatermarkingSystem, WatermarkTable
+
+
+@pytest.fixture
+def system():
+    return EnhancedCopyrightWatermarkingSystem(deterministic=True)
+
+
+def test_batch_rows_round_trip(system):
+    batch = system.create_watermarks([f"feature-{i}" for i in range(50)])
+    table = WatermarkTable.for_system(system)
+    table.extend_batch(batch)
+    assert len(table) == 50
+    assert [asdict(row) for row in table] == [asdict(row) for row in batch]
+    assert list(table.to_dicts()) == [asdict(row) for row in batch]
+    assert table[-1] == batch.watermark(49)
+    assert table.signature_digest(3) == bytes.fromhex(batch.watermark_signatures[3])
+
+
+def test_timestamps_are_stored_once(system):
+    table = WatermarkTable.for_system(system)
+    first = system.create_watermarks(["a", "b"])
+    table.extend_batch(first)
+    table.extend_batch(replace(first, feature_names=["c", "d"]))
+    table.append_watermark(first.watermark(0))
+    assert len(table) == 5
+    assert table._timestamps == [first.creation_timestamp]
+
+
+def test_rejected_batch_leaves_table_unchanged(system):
+    table = WatermarkTable.for_system(system)
+    table.extend_batch(system.create_watermarks(["kept"]))
+    batch = system.create_watermarks(["x", "y", "z"])
+    batch.watermark_signatures[2] = batch.watermark_signatures[2][:30]
+    with pytest.raises(ValueError):
+        table.extend_batch(batch)
+    assert len(table) == 1
+    assert len(table._digests) == WatermarkTable.DIGEST_SIZE
+    assert len(table._timestamp_ids) == 1
+    assert [row.feature_name for row in table] == ["kept"]
+
+
+def test_foreign_attribution_is_rejected(system):
+    table = WatermarkTable.for_system(system)
+    batch = replace(system.create_watermarks(["x"]), copyright_owner="Someone Else")
+    with pytest.raises(ValueError):
+        table.extend_batch(batch)
+    with pytest.raises(ValueError):
+        table.append_watermark(batch.watermark(0))
+    assert len(table) == 0
+
+
+def test_index_bounds(system):
+    table = WatermarkTable.for_system(system)
+    table.extend_batch(system.create_watermarks(["only"]))
+    with pytest.raises(IndexError):
+        table[1]
+    with pytest.raises(IndexError):
+        table.signature(-2)
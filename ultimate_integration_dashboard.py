@@ -25,6 +25,11 @@ try:
 except ImportError:
     free_apis = None
 
+try:
+    from watermark_signature_index import signature_index
+except ImportError:
+    signature_index = None
+
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "ultimate-integration-2025")
 
@@ -585,6 +590,23 @@ def api_development_status():
             'timestamp': datetime.now().isoformat()
         })
 
+@app.route('/api/watermark/verify/<signature>')
+def api_watermark_verify(signature):
+    if signature_index is None:
+        return jsonify({'error': 'Signature index unavailable'}), 503
+    return jsonify({
+        'watermark_signature': signature.upper(),
+        'issued_by_owner': signature in signature_index,
+        'copyright_owner': copyright_watermarking.owner,
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/api/watermark/index/status')
+def api_watermark_index_status():
+    if signature_index is None:
+        return jsonify({'error': 'Signature index unavailable'}), 503
+    return jsonify(signature_index.get_index_status())
+
 @app.route('/api/crystal/matrix')
 def api_crystal_matrix():
     return jsonify({
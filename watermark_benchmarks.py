@@ -0,0 +1,119 @@
+# Watermark Benchmarks - Copyright Watermarking Throughput
+# Copyright (c) 2025 Ervin Remus Radosavlevici
+# Contact: radosavlevici210@icloud.com
+# BLOCKED: replit-agent, radosavlevici21, main-branch-thieves
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from enhanced_copyright_watermarking import EnhancedCopyrightWatermarkingSystem, WatermarkTable
+
+
+def _feature_names(count):
+    """Generate synthetic asset names for benchmarking"""
+    return [f"Quantum Asset {i:07d}" for i in range(count)]
+
+
+def benchmark_batch_signing(count=100000, system=None):
+    """Compare per-feature watermarking against the batch signing API"""
+    system = system or EnhancedCopyrightWatermarkingSystem()
+    names = _feature_names(count)
+
+    start = time.perf_counter()
+    for name in names:
+        system._create_watermark(name)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = system.create_watermarks(names)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'benchmark': 'batch_signing',
+        'watermarks': len(batch),
+        'per_feature_seconds': loop_seconds,
+        'per_feature_watermarks_per_sec': count / loop_seconds,
+        'batch_seconds': batch_seconds,
+        'batch_watermarks_per_sec': count / batch_seconds,
+        'speedup': loop_seconds / batch_seconds
+    }
+
+
+def _traced_bytes(build):
+    """Bytes still allocated by the object that build() returns"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return current
+
+
+def benchmark_watermark_memory(count=100000, system=None):
+    """Compare memory held by slotted watermark objects and a WatermarkTable"""
+    system = system or EnhancedCopyrightWatermarkingSystem()
+    names = _feature_names(count)
+
+    def build_objects():
+        return [system._create_watermark(name) for name in names]
+
+    def build_table():
+        table = WatermarkTable.for_system(system)
+        for name in names:
+            table.append_watermark(system._create_watermark(name))
+        return table
+
+    object_bytes = _traced_bytes(build_objects)
+    table_bytes = _traced_bytes(build_table)
+
+    return {
+        'benchmark': 'watermark_memory',
+        'watermarks': count,
+        'object_bytes': object_bytes,
+        'object_bytes_per_watermark': object_bytes / count,
+        'table_bytes': table_bytes,
+        'table_bytes_per_watermark': table_bytes / count,
+        'reduction': object_bytes / table_bytes
+    }
+
+
+BENCHMARKS = {
+    'batch_signing': benchmark_batch_signing,
+    'watermark_memory': benchmark_watermark_memory,
+}
+
+
+def _print_result(result):
+    print(f"[{result['benchmark']}]")
+    for key, value in result.items():
+        if key == 'benchmark':
+            continue
+        if isinstance(value, float):
+            print(f"  {key}: {value:,.3f}")
+        else:
+            print(f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copyright watermarking benchmarks")
+    parser.add_argument('benchmarks', nargs='*',
+                        help=f"benchmarks to run: {', '.join(sorted(BENCHMARKS))} (default: all)")
+    parser.add_argument('--count', type=int, default=100000,
+                        help="number of watermarks per benchmark")
+    args = parser.parse_args()
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    print("="*80)
+    print("COPYRIGHT WATERMARKING BENCHMARKS")
+    print("="*80)
+    for name in args.benchmarks or sorted(BENCHMARKS):
+        _print_result(BENCHMARKS[name](args.count))
+    print("="*80)
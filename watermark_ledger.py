@@ -0,0 +1,295 @@
+# Watermark Ledger - Append-Only Merkle Ledger of Issued Signatures
+# Copyright (c) 2025 Ervin Remus Radosavlevici
+# Contact: radosavlevici210@icloud.com
+# BLOCKED: replit-agent, radosavlevici21, main-branch-thieves
+
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from enhanced_copyright_watermarking import CopyrightWatermark, WatermarkBatch
+
+# RFC 6962 domain separation between leaves and interior nodes
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+
+def leaf_hash(feature_name: str, creation_timestamp: str, watermark_signature: str) -> bytes:
+    """Hash of a single ledger entry"""
+    data = f"{feature_name}|{creation_timestamp}|{watermark_signature}".encode()
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def verify_inclusion(entry_hash: bytes, proof: List[Tuple[str, str]], root: str) -> bool:
+    """Check an inclusion proof of (side, hex hash) steps against a hex Merkle root"""
+    current = entry_hash
+    for side, sibling_hex in proof:
+        sibling = bytes.fromhex(sibling_hex)
+        current = node_hash(sibling, current) if side == 'left' else node_hash(current, sibling)
+    return current.hex() == root
+
+
+class WatermarkLedger:
+    """
+    Append-only Merkle ledger of issued watermark signatures
+    Every complete subtree node is stored, so appends touch O(log n) nodes,
+    the root is folded from at most log n peaks and inclusion proofs are
+    O(log n) point lookups. Several instances, in one or more processes, can
+    share a database: each re-reads the tree size before using its cached
+    peaks, and appends hold the write lock while they extend the tree
+    """
+
+    def __init__(self, db_path: str = 'watermark_ledger.db'):
+        self.db_path = db_path
+        self.copyright = "© 2025 Ervin Remus Radosavlevici"
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS ledger_leaves (
+                leaf_index INTEGER PRIMARY KEY,
+                feature_name TEXT NOT NULL,
+                creation_timestamp TEXT NOT NULL,
+                watermark_signature TEXT NOT NULL UNIQUE,
+                leaf_hash BLOB NOT NULL
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS ledger_nodes (
+                level INTEGER NOT NULL,
+                node_index INTEGER NOT NULL,
+                hash BLOB NOT NULL,
+                PRIMARY KEY (level, node_index)
+            ) WITHOUT ROWID
+        ''')
+        self.conn.commit()
+
+        self.size = 0
+        self._peaks: Dict[int, bytes] = {}
+        self._root: Optional[bytes] = None
+        with self._lock:
+            self._sync_locked()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sync_locked()
+            return self.size
+
+    @staticmethod
+    def _peak_positions(size: int) -> List[Tuple[int, int]]:
+        """(level, node_index) of each perfect subtree, largest first"""
+        positions = []
+        start = 0
+        for level in range(size.bit_length() - 1, -1, -1):
+            if size & (1 << level):
+                positions.append((level, start >> level))
+                start += 1 << level
+        return positions
+
+    def _node(self, level: int, index: int) -> bytes:
+        row = self.conn.execute('SELECT hash FROM ledger_nodes WHERE level = ? AND node_index = ?',
+                                (level, index)).fetchone()
+        if row is None:
+            raise LookupError(f"ledger node ({level}, {index}) is missing")
+        return row[0]
+
+    def _load_peaks(self) -> Dict[int, bytes]:
+        return {level: self._node(level, index) for level, index in self._peak_positions(self.size)}
+
+    def _sync_locked(self):
+        """Catch up with leaves appended through other connections; nodes never change once written"""
+        size = self.conn.execute('SELECT COALESCE(MAX(leaf_index) + 1, 0) FROM ledger_leaves').fetchone()[0]
+        if size != self.size:
+            self.size = size
+            self._peaks = self._load_peaks()
+            self._root = None
+
+    def _fold_peaks(self, levels: List[int]) -> bytes:
+        """Combine peaks right to left: H(P1, H(P2, ... Pk))"""
+        accumulator = self._peaks[levels[-1]]
+        for level in reversed(levels[:-1]):
+            accumulator = node_hash(self._peaks[level], accumulator)
+        return accumulator
+
+    def _root_locked(self) -> str:
+        if self._root is None:
+            levels = sorted(self._peaks, reverse=True)
+            self._root = self._fold_peaks(levels) if levels else EMPTY_ROOT
+        return self._root.hex()
+
+    def root(self) -> str:
+        """Current Merkle root as hex"""
+        with self._lock:
+            self._sync_locked()
+            return self._root_locked()
+
+    def _existing_signatures(self, signatures: List[str]) -> set:
+        existing = set()
+        for offset in range(0, len(signatures), 500):
+            chunk = signatures[offset:offset + 500]
+            placeholders = ",".join("?" * len(chunk))
+            cursor = self.conn.execute(
+                f'SELECT watermark_signature FROM ledger_leaves WHERE watermark_signature IN ({placeholders})',
+                chunk)
+            existing.update(row[0] for row in cursor)
+        return existing
+
+    def append_entries(self, entries: Iterable[Tuple[str, str, str]]) -> int:
+        """
+        Append (feature_name, creation_timestamp, watermark_signature) entries in one transaction
+        Signatures already in the ledger are skipped; returns the number appended
+        """
+        entries = list(entries)
+        with self._lock:
+            # Take the write lock before reading the tree so no other writer extends it meanwhile
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                appended = self._append_locked(entries)
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                self._sync_locked()
+                raise
+            return appended
+
+    def _append_locked(self, entries: List[Tuple[str, str, str]]) -> int:
+        self._sync_locked()
+        existing = self._existing_signatures([entry[2] for entry in entries])
+        leaf_rows = []
+        node_rows = []
+        peaks = dict(self._peaks)
+        size = self.size
+        for feature_name, creation_timestamp, signature in entries:
+            if signature in existing:
+                continue
+            existing.add(signature)
+
+            current = leaf_hash(feature_name, creation_timestamp, signature)
+            leaf_rows.append((size, feature_name, creation_timestamp, signature, current))
+            level, index = 0, size
+            node_rows.append((level, index, current))
+            # Binary-counter carry: merge with the equal-sized peak on the left
+            while index & 1:
+                current = node_hash(peaks.pop(level), current)
+                level, index = level + 1, index >> 1
+                node_rows.append((level, index, current))
+            peaks[level] = current
+            size += 1
+
+        if leaf_rows:
+            self.conn.executemany('''
+                INSERT INTO ledger_leaves
+                    (leaf_index, feature_name, creation_timestamp, watermark_signature, leaf_hash)
+                VALUES (?, ?, ?, ?, ?)
+            ''', leaf_rows)
+            self.conn.executemany(
+                'INSERT INTO ledger_nodes (level, node_index, hash) VALUES (?, ?, ?)', node_rows)
+            self._peaks = peaks
+            self.size = size
+            self._root = None
+        return len(leaf_rows)
+
+    def append(self, watermark: CopyrightWatermark) -> int:
+        return self.append_many([watermark])
+
+    def append_many(self, watermarks: Iterable[CopyrightWatermark]) -> int:
+        return self.append_entries(
+            (w.feature_name, w.creation_timestamp, w.watermark_signature) for w in watermarks)
+
+    def append_batch(self, batch: WatermarkBatch) -> int:
+        return self.append_entries(
+            (name, batch.creation_timestamp, signature)
+            for name, signature in zip(batch.feature_names, batch.watermark_signatures))
+
+    def iter_signatures(self) -> Iterator[str]:
+        for row in self.conn.execute('SELECT watermark_signature FROM ledger_leaves ORDER BY leaf_index'):
+            yield row[0]
+
+    def prove(self, watermark_signature: str) -> Optional[Dict]:
+        """Inclusion proof for an issued signature against the current root"""
+        with self._lock:
+            row = self.conn.execute('''
+                SELECT leaf_index, feature_name, creation_timestamp, leaf_hash
+                FROM ledger_leaves WHERE watermark_signature = ?
+            ''', (watermark_signature,)).fetchone()
+            if row is None:
+                return None
+            leaf_index, feature_name, creation_timestamp, entry_hash = row
+            # Read after the leaf, so the tree already covers it
+            self._sync_locked()
+
+            proof = []
+            start = 0
+            levels = sorted(self._peaks, reverse=True)
+            for position, peak_level in enumerate(levels):
+                if leaf_index < start + (1 << peak_level):
+                    break
+                start += 1 << peak_level
+
+            # Path inside the perfect subtree holding the leaf
+            index = leaf_index
+            for level in range(peak_level):
+                sibling = index ^ 1
+                proof.append(('left' if sibling < index else 'right', self._node(level, sibling).hex()))
+                index >>= 1
+
+            # Smaller peaks to the right fold into one sibling, larger peaks join from the left
+            smaller = levels[position + 1:]
+            if smaller:
+                proof.append(('right', self._fold_peaks(smaller).hex()))
+            for level in reversed(levels[:position]):
+                proof.append(('left', self._peaks[level].hex()))
+            tree_size = self.size
+            merkle_root = self._root_locked()
+
+        return {
+            'watermark_signature': watermark_signature,
+            'feature_name': feature_name,
+            'creation_timestamp': creation_timestamp,
+            'leaf_index': leaf_index,
+            'leaf_hash': entry_hash.hex(),
+            'tree_size': tree_size,
+            'proof': proof,
+            'merkle_root': merkle_root
+        }
+
+    def get_ledger_status(self):
+        with self._lock:
+            self._sync_locked()
+            tree_size, merkle_root, peaks = self.size, self._root_locked(), len(self._peaks)
+        return {
+            'ledger': 'operational',
+            'tree_size': tree_size,
+            'merkle_root': merkle_root,
+            'peaks': peaks,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'copyright': self.copyright
+        }
+
+
+_default_ledger: Optional[WatermarkLedger] = None
+_default_ledger_lock = threading.Lock()
+
+
+def get_watermark_ledger() -> WatermarkLedger:
+    """Global ledger at WATERMARK_LEDGER_DB (default watermark_ledger.db), opened on first use"""
+    global _default_ledger
+    with _default_ledger_lock:
+        if _default_ledger is None:
+            _default_ledger = WatermarkLedger(os.environ.get("WATERMARK_LEDGER_DB", "watermark_ledger.db"))
+        return _default_ledger
+
+
+def __getattr__(name: str):
+    # Importing the module must not create the database file; the global ledger opens on first access
+    if name == 'watermark_ledger':
+        return get_watermark_ledger()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,118 @@
+# Watermark Manifest - Incremental Stamping Index
+# Copyright (c) 2025 Ervin Remus Radosavlevici
+# Contact: radosavlevici210@icloud.com
+# BLOCKED: replit-agent, radosavlevici21, main-branch-thieves
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, Optional
+
+from enhanced_copyright_watermarking import CopyrightWatermark, copyright_watermarking
+
+
+@dataclass(slots=True)
+class ManifestEntry:
+    """Last known state of a watermarked file"""
+    mtime_ns: int
+    size: int
+    content_hash: str
+    watermark_signature: str
+    watermarked_at: str
+
+
+class WatermarkManifest:
+    """
+    Persistent SQLite manifest of watermarked files
+    Keyed by tree-relative path so re-runs can skip files whose size and
+    mtime are unchanged since their signature was issued
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS watermarked_files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                watermark_signature TEXT NOT NULL,
+                watermarked_at TEXT NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM watermarked_files').fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, path: str) -> Optional[ManifestEntry]:
+        row = self.conn.execute('''
+            SELECT mtime_ns, size, content_hash, watermark_signature, watermarked_at
+            FROM watermarked_files WHERE path = ?
+        ''', (path,)).fetchone()
+        return ManifestEntry(*row) if row else None
+
+    def entries(self) -> Dict[str, ManifestEntry]:
+        """Load the whole manifest for a tree run"""
+        cursor = self.conn.execute('''
+            SELECT path, mtime_ns, size, content_hash, watermark_signature, watermarked_at
+            FROM watermarked_files
+        ''')
+        return {row[0]: ManifestEntry(*row[1:]) for row in cursor}
+
+    def record_many(self, rows: Iterable[tuple]):
+        """Upsert (path, mtime_ns, size, content_hash, watermark_signature, watermarked_at) rows"""
+        with self.conn:
+            self.conn.executemany('''
+                INSERT OR REPLACE INTO watermarked_files
+                    (path, mtime_ns, size, content_hash, watermark_signature, watermarked_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+
+    def iter_signatures(self) -> Iterator[str]:
+        for row in self.conn.execute('SELECT watermark_signature FROM watermarked_files'):
+            yield row[0]
+
+    def prune(self, seen_paths: set) -> int:
+        """Drop entries for files no longer present in the tree"""
+        stale = [(path,) for path, in self.conn.execute('SELECT path FROM watermarked_files')
+                 if path not in seen_paths]
+        with self.conn:
+            self.conn.executemany('DELETE FROM watermarked_files WHERE path = ?', stale)
+        return len(stale)
+
+    def watermark(self, path: str, system=None) -> Optional[CopyrightWatermark]:
+        """Issued watermark for a file as a CopyrightWatermark record"""
+        entry = self.get(path)
+        if entry is None:
+            return None
+        return self._to_watermark(path, entry, system or copyright_watermarking)
+
+    def iter_watermarks(self, system=None) -> Iterator[CopyrightWatermark]:
+        system = system or copyright_watermarking
+        for path, entry in self.entries().items():
+            yield self._to_watermark(path, entry, system)
+
+    @staticmethod
+    def _to_watermark(path: str, entry: ManifestEntry, system) -> CopyrightWatermark:
+        return CopyrightWatermark(
+            feature_name=path,
+            copyright_owner=system.owner,
+            contact_email=system.contact,
+            orcid=system.orcid,
+            creation_timestamp=entry.watermarked_at,
+            watermark_signature=entry.watermark_signature,
+            security_level="MAXIMUM",
+            legal_protection=True
+        )
@@ -0,0 +1,234 @@
+# Watermark Signature Index - Bloom-Fronted Lookup of Issued Signatures
+# Copyright (c) 2025 Ervin Remus Radosavlevici
+# Contact: radosavlevici210@icloud.com
+# BLOCKED: replit-agent, radosavlevici21, main-branch-thieves
+
+import os
+import math
+import mmap
+import struct
+import logging
+import tempfile
+from typing import Iterable, Optional, Union
+
+INDEX_MAGIC = b"WMSIDX1\x00"
+INDEX_VERSION = 1
+# magic, version, flags, bloom hash count, bloom bits, table slots, signature count
+HEADER_FORMAT = "<8sHHIQQQ"
+HEADER_SIZE = 64
+DIGEST_SIZE = 16
+ZERO_DIGEST = bytes(DIGEST_SIZE)
+FLAG_HAS_ZERO_DIGEST = 1
+
+
+def _signature_digest(signature: Union[str, bytes]) -> Optional[bytes]:
+    """16-byte digest of a 32-character hex signature, or None if malformed"""
+    if isinstance(signature, (bytes, bytearray, memoryview)):
+        digest = bytes(signature)
+    else:
+        try:
+            digest = bytes.fromhex(signature)
+        except ValueError:
+            return None
+    return digest if len(digest) == DIGEST_SIZE else None
+
+
+class SignatureIndex:
+    """
+    Membership index of issued watermark signatures
+    A Bloom filter answers most foreign lookups from a few bits; an
+    open-addressing table of 16-byte digests makes every answer exact.
+    The persisted form is memory-mapped, so loading costs no parsing
+    """
+
+    def __init__(self, bloom, table, count: int, bloom_hashes: int, flags: int = 0, mapping=None):
+        self._bloom = bloom
+        self._table = table
+        self._bloom_bits = len(bloom) * 8
+        self._slot_mask = len(table) // DIGEST_SIZE - 1
+        self._mapping = mapping
+        self.count = count
+        self.bloom_hashes = bloom_hashes
+        self.flags = flags
+
+    @classmethod
+    def build(cls, signatures: Iterable[Union[str, bytes]], false_positive_rate: float = 0.001,
+              load_factor: float = 0.5) -> "SignatureIndex":
+        """Build an in-memory index sized for the given Bloom false-positive rate"""
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be between 0 and 1")
+        digests = set()
+        for signature in signatures:
+            digest = _signature_digest(signature)
+            if digest is not None:
+                digests.add(digest)
+
+        count = len(digests)
+        bloom_bits = max(64, math.ceil(-count * math.log(false_positive_rate) / math.log(2) ** 2))
+        bloom_bits = (bloom_bits + 63) // 64 * 64
+        bloom_hashes = max(1, round(bloom_bits / max(count, 1) * math.log(2)))
+        slots = 16
+        while slots * load_factor < count:
+            slots *= 2
+
+        index = cls(bytearray(bloom_bits // 8), bytearray(slots * DIGEST_SIZE), 0, bloom_hashes)
+        for digest in digests:
+            index._insert(digest)
+        return index
+
+    @classmethod
+    def load(cls, path: str) -> "SignatureIndex":
+        """Memory-map a saved index; raises ValueError if the file is not a complete index"""
+        with open(path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(mapping) < HEADER_SIZE:
+                raise ValueError(f"{path} is truncated")
+            magic, version, flags, bloom_hashes, bloom_bits, slots, count = \
+                struct.unpack_from(HEADER_FORMAT, mapping)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                raise ValueError(f"{path} is not a version {INDEX_VERSION} signature index")
+            # Bloom bits fill whole bytes and table slots are a power of two, as build() sizes them
+            if not bloom_bits or bloom_bits % 8 or not bloom_hashes or not slots or slots & (slots - 1):
+                raise ValueError(f"{path} has a malformed header")
+            bloom_end = HEADER_SIZE + bloom_bits // 8
+            table_end = bloom_end + slots * DIGEST_SIZE
+            if len(mapping) < table_end:
+                raise ValueError(f"{path} is truncated")
+        except BaseException:
+            mapping.close()
+            raise
+        view = memoryview(mapping)
+        return cls(view[HEADER_SIZE:bloom_end], view[bloom_end:table_end], count, bloom_hashes, flags, mapping)
+
+    def save(self, path: str):
+        """Atomically write the index in its memory-mappable form"""
+        header = struct.pack(HEADER_FORMAT, INDEX_MAGIC, INDEX_VERSION, self.flags, self.bloom_hashes,
+                             self._bloom_bits, self._slot_mask + 1, self.count)
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile('wb', dir=directory, prefix=".idx-", delete=False) as f:
+            f.write(header.ljust(HEADER_SIZE, b"\x00"))
+            f.write(self._bloom)
+            f.write(self._table)
+            tmp_path = f.name
+        os.replace(tmp_path, path)
+
+    def close(self):
+        if self._mapping is not None:
+            self._bloom.release()
+            self._table.release()
+            self._mapping.close()
+            self._mapping = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, signature: Union[str, bytes]) -> bool:
+        digest = _signature_digest(signature)
+        if digest is None or not self._bloom_check(digest):
+            return False
+        if digest == ZERO_DIGEST:
+            return bool(self.flags & FLAG_HAS_ZERO_DIGEST)
+        return self._find_slot(digest) is not None
+
+    def might_contain(self, signature: Union[str, bytes]) -> bool:
+        """Bloom-only check: never a false negative, false positives at the configured rate"""
+        digest = _signature_digest(signature)
+        return digest is not None and self._bloom_check(digest)
+
+    def expected_false_positive_rate(self) -> float:
+        if self.count == 0:
+            return 0.0
+        return (1 - math.exp(-self.bloom_hashes * self.count / self._bloom_bits)) ** self.bloom_hashes
+
+    def _bloom_positions(self, digest: bytes):
+        # Signatures are already uniform hash output, so double hashing over the digest suffices
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.bloom_hashes):
+            yield (h1 + i * h2) % self._bloom_bits
+
+    def _bloom_check(self, digest: bytes) -> bool:
+        bloom = self._bloom
+        for position in self._bloom_positions(digest):
+            if not bloom[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def _find_slot(self, digest: bytes) -> Optional[int]:
+        table = self._table
+        slot = int.from_bytes(digest[4:12], 'big') & self._slot_mask
+        while True:
+            offset = slot * DIGEST_SIZE
+            entry = table[offset:offset + DIGEST_SIZE]
+            if entry == digest:
+                return slot
+            if entry == ZERO_DIGEST:
+                return None
+            slot = (slot + 1) & self._slot_mask
+
+    def _insert(self, digest: bytes):
+        for position in self._bloom_positions(digest):
+            self._bloom[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+        if digest == ZERO_DIGEST:
+            self.flags |= FLAG_HAS_ZERO_DIGEST
+            return
+        slot = int.from_bytes(digest[4:12], 'big') & self._slot_mask
+        while self._table[slot * DIGEST_SIZE:(slot + 1) * DIGEST_SIZE] != ZERO_DIGEST:
+            slot = (slot + 1) & self._slot_mask
+        self._table[slot * DIGEST_SIZE:(slot + 1) * DIGEST_SIZE] = digest
+
+    def get_index_status(self):
+        return {
+            'signatures': self.count,
+            'bloom_bits': self._bloom_bits,
+            'bloom_hashes': self.bloom_hashes,
+            'expected_false_positive_rate': self.expected_false_positive_rate(),
+            'table_slots': self._slot_mask + 1,
+            'memory_mapped': self._mapping is not None
+        }
+
+
+def _load_default_index() -> SignatureIndex:
+    """Map the deployed index if present, otherwise start empty"""
+    path = os.environ.get("WATERMARK_SIGNATURE_INDEX", "watermark_signatures.idx")
+    if os.path.exists(path):
+        try:
+            return SignatureIndex.load(path)
+        except (OSError, ValueError) as e:
+            logging.error(f"Signature index unavailable: {e}")
+    return SignatureIndex.build([])
+
+
+# Initialize global signature index
+signature_index = _load_default_index()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the issued watermark signature index")
+    parser.add_argument('output', help="index file to write")
+    parser.add_argument('--manifest', action='append', default=[], help="WatermarkManifest database")
+    parser.add_argument('--ledger', action='append', default=[], help="WatermarkLedger database")
+    parser.add_argument('--false-positive-rate', type=float, default=0.001)
+    args = parser.parse_args()
+
+    def iter_signatures():
+        from watermark_manifest import WatermarkManifest
+        from watermark_ledger import WatermarkLedger
+        for path in args.manifest:
+            with WatermarkManifest(path) as manifest:
+                yield from manifest.iter_signatures()
+        for path in args.ledger:
+            yield from WatermarkLedger(path).iter_signatures()
+
+    index = SignatureIndex.build(iter_signatures(), args.false_positive_rate)
+    index.save(args.output)
+    print("="*80)
+    print("WATERMARK SIGNATURE INDEX")
+    print("="*80)
+    for key, value in index.get_index_status().items():
+        print(f"{key}: {value}")
+    print("="*80)